@@ -11,7 +11,7 @@ import pandas as pd
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.models.question_generator import QuestionGenerator
-from src.pipelines.predict_similarity import find_similar_questions
+from src.models.similarity_index import SimilarityIndex
 
 
 # Sayfa yapılandırması
@@ -69,6 +69,15 @@ def load_generator():
     return generator
 
 
+@st.cache_resource(max_entries=1)
+def load_similarity_index(model_dir: str = "models/baseline", version: tuple = ()):
+    """Benzerlik indeksini oturumlar arasında paylaşılmak üzere bir kez yükle.
+    
+    version (SimilarityIndex.version) değişince, yani model yeniden eğitilince yeniden yüklenir.
+    """
+    return SimilarityIndex.load(Path(model_dir))
+
+
 @st.cache_data
 def load_questions():
     """Mevcut soruları yükle (önce yeniden işlenmiş temiz soruları dene)."""
@@ -247,25 +256,16 @@ def main():
                         if not (model_dir / "vectorizer.joblib").exists():
                             st.error("❌ Benzerlik modeli bulunamadı!")
                         else:
-                            # Benzer soruları bul (Streamlit için özel versiyon)
-                            import joblib
-                            from sklearn.metrics.pairwise import cosine_similarity
-                            
-                            vectorizer = joblib.load(model_dir / "vectorizer.joblib")
-                            question_vectors = joblib.load(model_dir / "question_vectors.joblib")
-                            
-                            with (model_dir / "questions.json").open("r", encoding="utf-8") as f:
-                                all_questions = json.load(f)
-                            
-                            question_vector = vectorizer.transform([question_input])
-                            similarities = cosine_similarity(question_vector, question_vectors).flatten()
-                            top_indices = similarities.argsort()[-top_k:][::-1]
+                            # Benzer soruları bul (indeks önbellekte, yalnızca puanlama yapılır)
+                            hits = load_similarity_index(
+                                str(model_dir), SimilarityIndex.version(model_dir)
+                            ).search(question_input, k=top_k)
                             
-                            st.success(f"✅ {len(top_indices)} benzer soru bulundu!")
+                            st.success(f"✅ {len(hits)} benzer soru bulundu!")
                             
-                            for i, idx in enumerate(top_indices, 1):
-                                sim_score = similarities[idx]
-                                q = all_questions[idx]
+                            for i, hit in enumerate(hits, 1):
+                                sim_score = hit.score
+                                q = hit.question
                                 
                                 st.markdown(f"""
                                 <div class="question-card">
@@ -8,6 +8,7 @@ from pathlib import Path
 # Proje root'unu path'e ekle
 sys.path.insert(0, str(Path(__file__).parent))
 
+from src.data.manifest import IngestManifest, config_hash
 from src.data.process_karekok_pdf import process_karekok_pdf
 from rich import print
 
@@ -23,6 +24,12 @@ if __name__ == "__main__":
         raw_dir / "karekoks.pdf"
     ]
     
+    # --force: manifest'i yok say, tüm dosyaları yeniden işle
+    force = "--force" in sys.argv[1:]
+    manifest = IngestManifest(interim_dir / "ingest_manifest.json")
+    options = {"use_ocr": True, "use_text_extraction": True}
+    options_hash = config_hash(options)
+    
     all_questions = []
     
     for pdf_path in pdf_files:
@@ -30,17 +37,24 @@ if __name__ == "__main__":
             print(f"[yellow]Uyarı:[/yellow] Dosya bulunamadı: {pdf_path}")
             continue
         
-        print(f"\n[bold cyan]Kareköklü İfadeler PDF İşleme:[/bold cyan] {pdf_path.name}\n")
-        
         # Her dosya için ayrı output
         output_path = interim_dir / f"{pdf_path.stem}_questions.json"
+        manifest_key = IngestManifest.make_key("process_karekok", "karekok", pdf_path)
         
-        process_karekok_pdf(
-            pdf_path=pdf_path,
-            output_path=output_path,
-            use_ocr=True,  # Şekilli sorular için OCR açık
-            use_text_extraction=True  # Hızlı metin çıkarma da açık
-        )
+        if not force and manifest.is_fresh(manifest_key, pdf_path, options_hash):
+            print(f"\n[dim]Değişmedi, atlanıyor:[/dim] {pdf_path.name} (saklanan çıktı: {output_path.name})")
+        else:
+            print(f"\n[bold cyan]Kareköklü İfadeler PDF İşleme:[/bold cyan] {pdf_path.name}\n")
+            
+            process_karekok_pdf(
+                pdf_path=pdf_path,
+                output_path=output_path,
+                use_ocr=options["use_ocr"],  # Şekilli sorular için OCR açık
+                use_text_extraction=options["use_text_extraction"]  # Hızlı metin çıkarma da açık
+            )
+            if output_path.exists():
+                manifest.record(manifest_key, pdf_path, options_hash, output_path)
+                manifest.save()
         
         # İşlenen soruları yükle
         if output_path.exists():
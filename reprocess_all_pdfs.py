@@ -7,6 +7,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.data.improved_pdf_extractor import reprocess_pdf
+from src.data.manifest import IngestManifest, config_hash
 from rich import print
 
 if __name__ == "__main__":
@@ -15,7 +16,12 @@ if __name__ == "__main__":
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Tüm PDF dosyalarını bul
-    pdf_files = list(raw_dir.glob("*.pdf"))
+    pdf_files = sorted(raw_dir.glob("*.pdf"))
+    
+    # --force: manifest'i yok say, tüm dosyaları yeniden işle
+    force = "--force" in sys.argv[1:]
+    manifest = IngestManifest(Path("data/interim/ingest_manifest.json"))
+    options_hash = config_hash({"save_images": True})
     
     print(f"[bold cyan]Yeniden İşleme Başlatılıyor[/bold cyan]\n")
     print(f"[dim]Bulunan PDF:[/dim] {len(pdf_files)}\n")
@@ -23,13 +29,19 @@ if __name__ == "__main__":
     all_questions = []
     
     for pdf_path in pdf_files:
-        print(f"\n{'='*60}")
-        print(f"[bold]İşleniyor:[/bold] {pdf_path.name}")
-        print(f"{'='*60}\n")
-        
         output_path = output_dir / f"{pdf_path.stem}_reprocessed.json"
+        manifest_key = IngestManifest.make_key("reprocess_all_pdfs", "reprocessed", pdf_path)
         
-        reprocess_pdf(pdf_path, output_path, save_images=True)
+        if not force and manifest.is_fresh(manifest_key, pdf_path, options_hash):
+            print(f"[dim]Değişmedi, atlanıyor:[/dim] {pdf_path.name}")
+        else:
+            print(f"\n{'='*60}")
+            print(f"[bold]İşleniyor:[/bold] {pdf_path.name}")
+            print(f"{'='*60}\n")
+            
+            reprocess_pdf(pdf_path, output_path, save_images=True)
+            manifest.record(manifest_key, pdf_path, options_hash, output_path)
+            manifest.save()
         
         # Sonuçları yükle
         import json
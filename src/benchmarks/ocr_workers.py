@@ -0,0 +1,100 @@
+"""Sayfa-paralel OCR benchmark'ı: işçi sayısına göre sayfa/saniye."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from rich import print
+from rich.table import Table
+
+from src.data.pdf_ocr_extractor import extract_pages_as_images, ocr_pages
+
+
+def benchmark_ocr_workers(
+    pdf_path: Path,
+    worker_counts: List[int],
+    dpi: int = 400,
+    max_pages: int = 0,
+    repeats: int = 1
+) -> None:
+    """Aynı sayfaları farklı işçi sayılarıyla OCR'lar ve verimi raporlar."""
+    print(f"[bold cyan]OCR işçi benchmark'ı:[/bold cyan] {pdf_path.name} (DPI: {dpi})")
+    
+    # Render süresi ölçüme dahil edilmesin diye sayfalar önceden alınır
+    page_images = extract_pages_as_images(pdf_path, dpi=dpi)
+    if max_pages > 0:
+        page_images = page_images[:max_pages]
+    if not page_images:
+        print("[red]Hata:[/red] Sayfa görseli alınamadı.")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("İşçi", justify="right")
+    table.add_column("Süre (sn)", justify="right")
+    table.add_column("Sayfa/sn", justify="right")
+    table.add_column("Hızlanma", justify="right")
+    
+    baseline = None
+    reference_texts = None
+    for workers in worker_counts:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            # Önbellek atlanır; aksi halde ilk ayardan sonrası SQLite okumasını ölçerdi
+            texts = ocr_pages(page_images, lang="tur", max_workers=workers, use_cache=False)
+            best = min(best, time.perf_counter() - start)
+        
+        # Paralel çalıştırma, sıralı çalıştırmayla aynı sayfa sırasını vermeli
+        if reference_texts is None:
+            reference_texts = texts
+        elif texts != reference_texts:
+            print(f"[yellow]Uyarı:[/yellow] {workers} işçi ile sayfa çıktıları farklı")
+        
+        baseline = baseline or best
+        table.add_row(
+            str(workers),
+            f"{best:.2f}",
+            f"{len(page_images) / best:.2f}",
+            f"{baseline / best:.2f}x"
+        )
+    
+    print()
+    print(table)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sayfa-paralel OCR benchmark'ı")
+    parser.add_argument(
+        "--pdf",
+        default="data/raw/lgs_meb_koklu/karekokcikmis.pdf",
+        help="Benchmark için PDF dosyası"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Denenecek işçi sayıları (ilki referans alınır)"
+    )
+    parser.add_argument("--dpi", type=int, default=400, help="Render DPI değeri")
+    parser.add_argument("--max-pages", type=int, default=0, help="En fazla sayfa (0 = tümü)")
+    parser.add_argument("--repeats", type=int, default=1, help="Her ayar için tekrar sayısı")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    benchmark_ocr_workers(
+        Path(args.pdf),
+        worker_counts=args.workers,
+        dpi=args.dpi,
+        max_pages=args.max_pages,
+        repeats=args.repeats
+    )
+
+
+if __name__ == "__main__":
+    main()
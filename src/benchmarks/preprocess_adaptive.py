@@ -0,0 +1,122 @@
+"""Uyarlamalı ve klasik OCR ön işlemesini süre ve OCR metin uyumu açısından karşılaştırır."""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from rich import print
+from rich.table import Table
+
+from src.data.ocr_backend import get_ocr_backend
+from src.data.ocr_preprocess import PreprocessParams, PreprocessPipeline
+from src.data.pdf_ocr_extractor import OCR_CONFIG, iter_pages_as_images
+
+
+def load_sample_pages(raw_dir: Path, dpi: int, pages_per_pdf: int) -> List[Tuple[str, np.ndarray]]:
+    """data/raw altındaki PDF'lerin ilk sayfalarını gri tonlamalı olarak yükler."""
+    samples = []
+    for pdf_path in sorted(raw_dir.glob("*.pdf")):
+        pages = range(1, pages_per_pdf + 1)
+        for page_num, image in iter_pages_as_images(pdf_path, dpi=dpi, pages=pages):
+            gray = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+            samples.append((f"{pdf_path.stem}:p{page_num}", gray))
+    return samples
+
+
+def benchmark_preprocess(
+    raw_dir: Path,
+    dpi: int = 400,
+    pages_per_pdf: int = 2,
+    max_width: int = 0,
+    run_ocr: bool = True
+) -> None:
+    """Her sayfa için iki hattın süresini ve OCR çıktılarının benzerliğini raporlar."""
+    samples = load_sample_pages(raw_dir, dpi, pages_per_pdf)
+    if not samples:
+        print(f"[red]Hata:[/red] {raw_dir} altında sayfa bulunamadı.")
+        return
+    
+    backend = get_ocr_backend() if run_ocr else None
+    params = PreprocessParams()
+    classic_pipeline = PreprocessPipeline(params, mode="classic")
+    adaptive_pipeline = PreprocessPipeline(params, mode="adaptive", max_width=max_width or None)
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Sayfa")
+    table.add_column("Klasik (sn)", justify="right")
+    table.add_column("Uyarlamalı (sn)", justify="right")
+    table.add_column("Yol")
+    table.add_column("Metin uyumu", justify="right")
+    
+    total_classic = total_adaptive = 0.0
+    ratios = []
+    for label, gray in samples:
+        start = time.perf_counter()
+        classic = classic_pipeline.run(gray, copy=True)
+        classic_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        adaptive = adaptive_pipeline.run(gray, copy=True)
+        path = adaptive_pipeline.last_path
+        adaptive_time = time.perf_counter() - start
+        
+        total_classic += classic_time
+        total_adaptive += adaptive_time
+        
+        agreement = "-"
+        if backend is not None:
+            classic_text = backend.image_to_string(classic, lang="tur", config=OCR_CONFIG)
+            adaptive_text = backend.image_to_string(adaptive, lang="tur", config=OCR_CONFIG)
+            ratio = difflib.SequenceMatcher(None, classic_text, adaptive_text).ratio()
+            ratios.append(ratio)
+            agreement = f"{ratio:.3f}"
+        
+        table.add_row(label, f"{classic_time:.3f}", f"{adaptive_time:.3f}", path, agreement)
+    
+    print(table)
+    print(f"\n[bold]Toplam ön işleme:[/bold] klasik {total_classic:.2f} sn, uyarlamalı {total_adaptive:.2f} sn "
+          f"({total_classic / max(total_adaptive, 1e-9):.1f}x)")
+    if ratios:
+        print(f"[bold]Ortalama OCR metin uyumu:[/bold] {sum(ratios) / len(ratios):.3f}")
+    
+    # Adım başına ortalama süreler
+    steps = Table(show_header=True, header_style="bold magenta")
+    steps.add_column("Adım")
+    steps.add_column("Klasik (ms)", justify="right")
+    steps.add_column("Uyarlamalı (ms)", justify="right")
+    classic_steps = classic_pipeline.timing_report()
+    adaptive_steps = adaptive_pipeline.timing_report()
+    for step in PreprocessPipeline.STEPS:
+        steps.add_row(step, f"{classic_steps[step]:.1f}", f"{adaptive_steps[step]:.1f}")
+    print(steps)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Uyarlamalı OCR ön işleme benchmark'ı")
+    parser.add_argument("--raw-dir", default="data/raw/lgs_meb_koklu", help="PDF klasörü")
+    parser.add_argument("--dpi", type=int, default=400, help="Render DPI değeri")
+    parser.add_argument("--pages-per-pdf", type=int, default=2, help="PDF başına sayfa sayısı")
+    parser.add_argument("--max-width", type=int, default=0, help="Ağır filtrelerden önce küçültme genişliği (0 = kapalı)")
+    parser.add_argument("--no-ocr", action="store_true", help="Sadece ön işleme süresini ölç")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    benchmark_preprocess(
+        Path(args.raw_dir),
+        dpi=args.dpi,
+        pages_per_pdf=args.pages_per_pdf,
+        max_width=args.max_width,
+        run_ocr=not args.no_ocr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Akışlı soru bölücüyü eski satır satır uygulamalarla karşılaştıran mikro benchmark (satır/sn)."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from rich import print
+from rich.table import Table
+
+from src.data.pdf_extractor import extract_text_from_pdf
+from src.data.question_segmenter import iter_page_lines, iter_question_segments, iter_questions
+
+
+# --- Eski uygulamalar (referans) ------------------------------------------
+
+def legacy_find_math_questions(text: str) -> List[dict]:
+    """Eski pdf_extractor.find_math_questions (karşılaştırma için)."""
+    questions = []
+    lines = text.split("\n")
+    
+    current_question = None
+    question_number = None
+    
+    for i, line in enumerate(lines):
+        line_stripped = line.strip()
+        if not line_stripped:
+            continue
+        
+        # Soru numarası arıyoruz (örn: "15.", "15)", "Soru 15:", "15-")
+        question_match = re.match(r"^\s*(\d+)[\.\)\-\s]+", line_stripped)
+        if question_match:
+            # Önceki soruyu kaydet
+            if current_question and current_question.get("raw_text"):
+                questions.append(current_question)
+            
+            # Yeni soru başlat
+            question_number = question_match.group(1)
+            question_text = re.sub(r"^\s*\d+[\.\)\-\s]+", "", line_stripped)
+            current_question = {
+                "question_number": question_number,
+                "raw_text": question_text,
+                "options": [],
+                "full_text": question_text
+            }
+            continue
+        
+        # Seçenekleri bul (A), B), C), D) veya A., B., C., D.)
+        option_match = re.match(r"^\s*([A-D])[\.\)]\s*(.+)", line_stripped)
+        if option_match and current_question:
+            option_letter = option_match.group(1)
+            option_text = option_match.group(2)
+            current_question["options"].append(f"{option_letter}) {option_text}")
+            current_question["full_text"] += " " + line_stripped
+            continue
+        
+        # Soru metnini genişlet (seçenek değilse)
+        if current_question:
+            # Seçenek başlangıcı değilse soru metnine ekle
+            if not re.match(r"^\s*[A-D][\.\)]", line_stripped):
+                current_question["raw_text"] += " " + line_stripped
+                current_question["full_text"] += " " + line_stripped
+    
+    # Son soruyu ekle
+    if current_question and current_question.get("raw_text"):
+        questions.append(current_question)
+    
+    return questions
+
+
+def legacy_find_questions_in_text(text: str, page_num: int) -> List[dict]:
+    """Eski pdf_ocr_extractor.find_questions_in_text (karşılaştırma için)."""
+    questions = []
+    lines = text.split("\n")
+    
+    current_question = None
+    question_number = None
+    
+    for line in lines:
+        line_stripped = line.strip()
+        if not line_stripped or len(line_stripped) < 3:
+            continue
+        
+        # Soru numarası ara (örn: "15.", "15)", "15-", "Soru 15")
+        question_match = re.match(r"^\s*(\d+)[\.\)\-\s]+", line_stripped)
+        if question_match:
+            # Önceki soruyu kaydet
+            if current_question and current_question.get("raw_text"):
+                questions.append(current_question)
+            
+            # Yeni soru başlat
+            question_number = question_match.group(1)
+            question_text = re.sub(r"^\s*\d+[\.\)\-\s]+", "", line_stripped)
+            current_question = {
+                "question_number": question_number,
+                "raw_text": question_text,
+                "options": [],
+                "full_text": question_text,
+                "page": page_num
+            }
+            continue
+        
+        # Seçenekleri bul (A), B), C), D))
+        option_match = re.match(r"^\s*([A-D])[\.\)]\s*(.+)", line_stripped)
+        if option_match and current_question:
+            option_letter = option_match.group(1)
+            option_text = option_match.group(2)
+            current_question["options"].append(f"{option_letter}) {option_text}")
+            current_question["full_text"] += " " + line_stripped
+            continue
+        
+        # Soru metnini genişlet
+        if current_question:
+            if not re.match(r"^\s*[A-D][\.\)]", line_stripped):
+                current_question["raw_text"] += " " + line_stripped
+                current_question["full_text"] += " " + line_stripped
+    
+    # Son soruyu ekle
+    if current_question and current_question.get("raw_text"):
+        questions.append(current_question)
+    
+    return questions
+
+
+def legacy_question_segments(text: str) -> List[Tuple[str, List[str]]]:
+    """Eski improved_pdf_extractor sınır bulma + numara eşleme döngüsü (karşılaştırma için)."""
+    boundaries = []
+    lines = text.split('\n')
+    
+    current_start = None
+    question_pattern = re.compile(r'^\s*(\d+)[\.\)\-\s]+', re.MULTILINE)
+    
+    for i, line in enumerate(lines):
+        # Soru numarası bulundu
+        match = question_pattern.match(line)
+        if match:
+            # Önceki soruyu kaydet
+            if current_start is not None:
+                boundaries.append((current_start, i))
+            current_start = i
+    
+    # Son soruyu ekle
+    if current_start is not None:
+        boundaries.append((current_start, len(lines)))
+    
+    segments = []
+    for start_idx, end_idx in boundaries:
+        question_lines = lines[start_idx:end_idx]
+        num_match = re.match(r'^\s*(\d+)[\.\)\-\s]+', question_lines[0])
+        if num_match:
+            segments.append((num_match.group(1), question_lines))
+    return segments
+
+
+# --- Benchmark --------------------------------------------------------------
+
+def synthetic_text(questions: int = 2000, seed: int = 0) -> str:
+    """Gerçek PDF yoksa kullanılacak, soru/seçenek/gürültü satırları içeren metin."""
+    rng = random.Random(seed)
+    lines = []
+    for number in range(1, questions + 1):
+        if number % 20 == 1:
+            lines.append(f"--- Sayfa {number // 20 + 1} ---")
+        lines.append(f"{number}. √{rng.randint(2, 99)} ifadesinin değeri hangi iki tam sayı arasındadır?")
+        for _ in range(rng.randint(0, 3)):
+            lines.append("Buna göre aşağıdakilerden hangisi doğrudur ve işlem sonucu kaçtır")
+        if rng.random() < 0.1:
+            lines.append("")
+            lines.append("ab")
+        for letter in "ABCD":
+            lines.append(f"{letter}) {rng.randint(1, 20)} ve {rng.randint(21, 40)}")
+    return "\n".join(lines)
+
+
+def load_corpus(raw_dir: Path) -> str:
+    texts = [extract_text_from_pdf(pdf_path) for pdf_path in sorted(raw_dir.glob("*.pdf"))]
+    return "\n".join(text for text in texts if text)
+
+
+def _strip_page(records: List[Dict]) -> List[Dict]:
+    return [{k: v for k, v in r.items() if k != "page"} for r in records]
+
+
+def benchmark_segmenter(text: str, repeats: int = 5) -> None:
+    """Üç eski uygulamayı yeni bölücüyle aynı metin üzerinde karşılaştırır."""
+    line_count = text.count("\n") + 1
+    print(f"[bold cyan]Soru bölücü benchmark'ı:[/bold cyan] {line_count} satır, {repeats} tekrar")
+
+    cases: List[Tuple[str, Callable[[], object], Callable[[], object], Callable[[object, object], bool]]] = [
+        (
+            "find_math_questions",
+            lambda: legacy_find_math_questions(text),
+            lambda: list(iter_questions(iter_page_lines(text))),
+            lambda old, new: old == _strip_page(new),
+        ),
+        (
+            "find_questions_in_text",
+            lambda: legacy_find_questions_in_text(text, 1),
+            lambda: list(iter_questions(iter_page_lines(text, 1), min_line_length=3)),
+            lambda old, new: old == new,
+        ),
+        (
+            "find_question_boundaries",
+            lambda: legacy_question_segments(text),
+            lambda: [(s.number, s.lines) for s in iter_question_segments(iter_page_lines(text, 1))],
+            lambda old, new: old == new,
+        ),
+    ]
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Çağrı yeri")
+    table.add_column("Eski (satır/sn)", justify="right")
+    table.add_column("Yeni (satır/sn)", justify="right")
+    table.add_column("Hızlanma", justify="right")
+    table.add_column("Aynı çıktı", justify="center")
+
+    for name, old_fn, new_fn, same in cases:
+        timings = []
+        outputs = []
+        for fn in (old_fn, new_fn):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+            outputs.append(result)
+        table.add_row(
+            name,
+            f"{line_count / timings[0]:,.0f}",
+            f"{line_count / timings[1]:,.0f}",
+            f"{timings[0] / timings[1]:.2f}x",
+            "✓" if same(*outputs) else "[red]✗[/red]",
+        )
+
+    print()
+    print(table)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Akışlı soru bölücü benchmark'ı")
+    parser.add_argument(
+        "--raw-dir",
+        default="data/raw/lgs_meb_koklu",
+        help="Metin katmanı kullanılacak PDF klasörü (boşsa sentetik metin)"
+    )
+    parser.add_argument("--synthetic", action="store_true", help="PDF yerine sentetik metin kullan")
+    parser.add_argument("--repeats", type=int, default=5, help="Her uygulama için tekrar sayısı")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    text = "" if args.synthetic else load_corpus(Path(args.raw_dir))
+    if not text:
+        text = synthetic_text()
+    benchmark_segmenter(text, repeats=args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""ANN benzerlik araması benchmark'ı: n_probe başına recall@k ve gecikme (tam aramaya karşı)."""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import List
+
+from rich import print
+
+from src.models.ann_index import DEFAULT_COMPONENTS, AnnIndex
+from src.models.similarity_index import SimilarityIndex, ann_report, print_ann_report
+
+
+def benchmark_similarity_ann(
+    model_dir: Path,
+    n_probes: List[int],
+    queries: int = 200,
+    k: int = 5,
+    build: bool = False,
+    n_components: int = DEFAULT_COMPONENTS,
+    seed: int = 42
+) -> None:
+    """Model dizinindeki indeksi (ya da build=True ise bellekte kurulanı) korpustan örneklenen sorgularla ölçer."""
+    index = SimilarityIndex.load(model_dir)
+    if index.ann is None or build:
+        print(f"[bold cyan]ANN indeksi bellekte kuruluyor:[/bold cyan] {len(index)} soru, {n_components} boyut")
+        ann = AnnIndex.build(index.vectors, n_components=n_components, seed=seed)
+        index = SimilarityIndex(index.vectorizer, index.vectors, index.questions, ann=ann)
+
+    texts = [q.get("full_text") or q.get("raw_text") or q.get("question_text") or "" for q in index.questions]
+    sample = random.Random(seed).sample(texts, min(queries, len(texts)))
+    print(
+        f"[bold cyan]ANN benchmark'ı:[/bold cyan] {len(index)} soru, {index.ann.n_lists} liste, "
+        f"{len(sample)} sorgu, k={k}"
+    )
+    print()
+    print_ann_report(ann_report(index, sample, k=k, n_probes=n_probes), k=k)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ANN benzerlik araması benchmark'ı")
+    parser.add_argument("--model-dir", default="models/baseline", help="Model dizini")
+    parser.add_argument(
+        "--n-probes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="Denenecek n_probe değerleri"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Örnek sorgu sayısı")
+    parser.add_argument("--k", type=int, default=5, help="recall@k için k")
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Kayıtlı ANN indeksi yerine bellekte yeni indeks kur (küçük korpuslarda da)"
+    )
+    parser.add_argument("--n-components", type=int, default=DEFAULT_COMPONENTS, help="LSA boyutu (--build ile)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    benchmark_similarity_ann(
+        Path(args.model_dir),
+        n_probes=args.n_probes,
+        queries=args.queries,
+        k=args.k,
+        build=args.build,
+        n_components=args.n_components
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Öğrenilmiş (cid:NN) -> Unicode tabloları: bozuk gömülü fontları OCR'sız çözmek için.
+
+pdfplumber, ToUnicode eşlemesi olmayan glifleri "(cid:NN)" olarak döndürür.
+Birkaç sayfada pdfplumber karakterleri (font + cid) OCR kelimeleriyle konumdan
+hizalanıp oylanır; yeterli oy toplayan eşlemeler kalıcı tabloya yazılır ve
+sonraki sayfalarda/PDF'lerde metin katmanı hızında çözülür.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from rich import print
+
+from src.utils.io import read_json
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+CID_TOKEN = re.compile(r"\(cid:(\d+)\)")
+
+DEFAULT_TABLE_PATH = Path("data/interim/cache/cid_tables.json")
+
+# Bir eşlemenin kabulü için gereken en az oy ve çoğunluk oranı
+MIN_VOTES = 2
+MIN_AGREEMENT = 0.6
+# Font bilgisi olmayan metinde bir cid'in çözülmesi için onu aynı karaktere çözen en az font sayısı
+MIN_FONTLESS_FONTS = 2
+# Tamamı cid olan (kontrol harfi içermeyen) kelimeler için OCR güven eşiği
+MIN_BLIND_CONFIDENCE = 80.0
+
+
+def base_font_name(fontname: str) -> str:
+    """"ABCDEF+TimesNewRoman" gibi alt küme önekini atar."""
+    return fontname.split("+", 1)[1] if "+" in fontname else fontname
+
+
+class CidTable:
+    """Font başına cid -> karakter oylarını tutan kalıcı tablo.
+
+    Oylar hem tam font adı hem de alt küme öneki atılmış taban ad altında
+    biriktirilir. Aynı fontun farklı alt kümeleri aynı glif numaralarını
+    kullanıyorsa taban ad diğer PDF'lere taşınır; kullanmıyorsa oylar
+    çelişir ve çoğunluk eşiği eşlemeyi kabul etmez.
+
+    `voted` oy vermiş (PDF sha256, sayfa) çiftlerini tutar; OCR önbelleği
+    aynı kelimeleri yeniden döndürdüğünden aynı sayfa ikinci kez oylanmaz,
+    aksi halde her çalıştırma aynı gözlemleri yeniden sayardı.
+
+    Paralel ingest süreçleri aynı dosyayı paylaşır: save() yalnızca bu
+    süreçte eklenen oyları diskteki güncel tabloya kilit altında ekler ve
+    dosyayı geçici dosya + yeniden adlandırmayla atomik olarak yazar.
+    """
+
+    def __init__(self, path: Path = DEFAULT_TABLE_PATH):
+        self.path = Path(path)
+        self.votes: Dict[str, Dict[str, Counter]] = {}
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+        self._fontless: Optional[Dict[str, str]] = None
+        self.voted: Set[str] = set()
+        # Son kayıttan bu yana bu süreçte eklenen oylar (save() diskteki tabloya ekler)
+        self._pending_votes: Dict[str, Dict[str, Counter]] = {}
+        self._pending_voted: Set[str] = set()
+        if self.path.exists():
+            try:
+                self.votes, self.voted = self._read(self.path)
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] cid tablosu okunamadı, boş tabloyla devam ediliyor: {e}")
+
+    @staticmethod
+    def _read(path: Path) -> Tuple[Dict[str, Dict[str, Counter]], Set[str]]:
+        data = read_json(path)
+        votes = {
+            font: {cid: Counter(chars) for cid, chars in cids.items()}
+            for font, cids in data.get("fonts", {}).items()
+        }
+        return votes, set(data.get("voted", []))
+
+    @staticmethod
+    def page_key(pdf_hash: str, page_num: int) -> str:
+        return f"{pdf_hash}:{page_num}"
+
+    def has_voted(self, pdf_hash: str, page_num: int) -> bool:
+        return self.page_key(pdf_hash, page_num) in self.voted
+
+    def mark_voted(self, pdf_hash: str, page_num: int) -> None:
+        key = self.page_key(pdf_hash, page_num)
+        self.voted.add(key)
+        self._pending_voted.add(key)
+
+    def add_vote(self, fontname: str, cid: str, char: str) -> None:
+        for font in {fontname, base_font_name(fontname)}:
+            self.votes.setdefault(font, {}).setdefault(cid, Counter())[char] += 1
+            self._pending_votes.setdefault(font, {}).setdefault(cid, Counter())[char] += 1
+            self._resolved.pop((font, cid), None)
+        self._fontless = None
+
+    def _resolve(self, font: str, cid: str) -> Optional[str]:
+        key = (font, cid)
+        if key not in self._resolved:
+            counts = self.votes.get(font, {}).get(cid)
+            char = None
+            if counts:
+                best, best_votes = counts.most_common(1)[0]
+                if best_votes >= MIN_VOTES and best_votes / sum(counts.values()) >= MIN_AGREEMENT:
+                    char = best
+            self._resolved[key] = char
+        return self._resolved[key]
+
+    def lookup(self, fontname: str, cid: str) -> Optional[str]:
+        """Önce tam font adıyla, yoksa taban adla eşlemeyi arar."""
+        return self._resolve(fontname, cid) or self._resolve(base_font_name(fontname), cid)
+
+    def fontless_map(self) -> Dict[str, str]:
+        """Font bilgisi olmayan metinler için güvenle çözülebilen cid'ler.
+
+        cid numaralandırması fonta özgü olduğundan bir cid yalnızca en az
+        MIN_FONTLESS_FONTS farklı (taban adlı) fontta oylanmışsa ve oy veren
+        her font aynı karaktere çözülüyorsa eşlenir; çözülemeyen ya da farklı
+        karaktere çözülen tek bir font bile eşlemeyi düşürür.
+        """
+        if self._fontless is not None:
+            return self._fontless
+        candidates: Dict[str, List[Optional[str]]] = {}
+        for font, cids in self.votes.items():
+            # Oylar tam ad ve taban ad altında çift tutulur; her font bir kez sayılsın
+            if base_font_name(font) != font:
+                continue
+            for cid in cids:
+                candidates.setdefault(cid, []).append(self._resolve(font, cid))
+        self._fontless = {
+            cid: chars[0]
+            for cid, chars in candidates.items()
+            if len(chars) >= MIN_FONTLESS_FONTS and chars[0] is not None and len(set(chars)) == 1
+        }
+        return self._fontless
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Tablo dosyasına özel kilit (fcntl yoksa kilitsiz; yazım yine atomiktir)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with self.path.with_suffix(".lock").open("w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Bu süreçte eklenen oyları diskteki güncel tabloyla birleştirip atomik yazar."""
+        with self._locked():
+            votes, voted = {}, set()
+            if self.path.exists():
+                try:
+                    votes, voted = self._read(self.path)
+                except Exception as e:
+                    print(f"[yellow]Uyarı:[/yellow] cid tablosu okunamadı, yalnızca bellekteki tablo yazılacak: {e}")
+                    votes, voted = self.votes, set(self.voted)
+                    self._pending_votes = {}
+            for font, cids in self._pending_votes.items():
+                for cid, counts in cids.items():
+                    votes.setdefault(font, {}).setdefault(cid, Counter()).update(counts)
+            voted |= self._pending_voted
+
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(
+                    {
+                        "fonts": {font: {cid: dict(c) for cid, c in cids.items()} for font, cids in votes.items()},
+                        "voted": sorted(voted),
+                    },
+                    handle,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            os.replace(tmp_path, self.path)
+
+        # Diğer süreçlerin eklediği oylar da artık bu tabloda
+        self.votes, self.voted = votes, voted
+        self._pending_votes, self._pending_voted = {}, set()
+        self._resolved.clear()
+        self._fontless = None
+
+
+_DEFAULT_TABLE: Optional[CidTable] = None
+
+
+def get_cid_table(path: Optional[Path] = None) -> CidTable:
+    """Süreç genelinde paylaşılan cid tablosunu döndürür."""
+    global _DEFAULT_TABLE
+    if _DEFAULT_TABLE is None or (path is not None and Path(path) != _DEFAULT_TABLE.path):
+        _DEFAULT_TABLE = CidTable(path or DEFAULT_TABLE_PATH)
+    return _DEFAULT_TABLE
+
+
+def decode_page_chars(page, table: Optional[CidTable] = None) -> int:
+    """Sayfa karakterlerindeki (pdfplumber sayfası ya da ParsedPage) cid'leri yerinde çözer.
+
+    page.chars önbelleklenmiş nesneleri döndürdüğü için sonraki
+    `page.extract_text()` / `extract_words()` çağrıları çözülmüş metni görür;
+    ParsedPage için türetilmiş metni de sıfırlayan `ParsedPage.decode_cids` kullanılmalı.
+    Çözülen karakter sayısını döndürür.
+    """
+    table = table or get_cid_table()
+    if not table.votes:
+        return 0
+    decoded = 0
+    for char in page.chars:
+        match = CID_TOKEN.fullmatch(char.get("text", ""))
+        if not match:
+            continue
+        value = table.lookup(char.get("fontname", ""), match.group(1))
+        if value is not None:
+            char["text"] = value
+            decoded += 1
+    return decoded
+
+
+def decode_cid_text(text: str, table: Optional[CidTable] = None) -> str:
+    """Düz metindeki (cid:NN) belirteçlerini font bilgisi olmadan çözülebildiği kadar çözer."""
+    if not text or "(cid:" not in text:
+        return text
+    mapping = (table or get_cid_table()).fontless_map()
+    if not mapping:
+        return text
+    return CID_TOKEN.sub(lambda m: mapping.get(m.group(1), m.group(0)), text)
+
+
+def align_page_votes(
+    chars: List[dict],
+    words: List[dict],
+    scale_x: float,
+    scale_y: float
+) -> List[Tuple[str, str, str]]:
+    """pdfplumber karakterlerini OCR kelime kutularıyla hizalar; (font, cid, karakter) oyları üretir.
+
+    scale_x/scale_y PDF noktasını OCR görseli pikseline çevirir. Bir kelimedeki
+    karakter sayısı OCR kelimesinin uzunluğuna eşitse birebir eşlenir; cid
+    olmayan karakterlerden biri OCR ile uyuşmuyorsa hizalama güvenilmez sayılır.
+    """
+    votes: List[Tuple[str, str, str]] = []
+    for word in words:
+        ocr_text = str(word.get("text", "")).strip()
+        if not ocr_text or "width" not in word:
+            continue
+        x0, x1 = word["left"] / scale_x, (word["left"] + word["width"]) / scale_x
+        top, bottom = word["top"] / scale_y, (word["top"] + word["height"]) / scale_y
+
+        inside = sorted(
+            (
+                c for c in chars
+                if x0 <= (c["x0"] + c["x1"]) / 2 <= x1 and top <= (c["top"] + c["bottom"]) / 2 <= bottom
+                and c.get("text", "").strip()
+            ),
+            key=lambda c: c["x0"],
+        )
+        if len(inside) != len(ocr_text):
+            continue
+
+        pending: List[Tuple[str, str, str]] = []
+        consistent = True
+        checked = 0
+        for char, ocr_char in zip(inside, ocr_text):
+            match = CID_TOKEN.fullmatch(char["text"])
+            if match:
+                pending.append((char.get("fontname", ""), match.group(1), ocr_char))
+            elif char["text"].casefold() == ocr_char.casefold():
+                checked += 1
+            else:
+                consistent = False
+                break
+        if not consistent or not pending:
+            continue
+        if checked == 0 and float(word.get("conf", -1)) < MIN_BLIND_CONFIDENCE:
+            continue
+        votes.extend(pending)
+    return votes
+
+
+def learn_cid_table(
+    pdf_path: Path,
+    table: Optional[CidTable] = None,
+    max_pages: int = 3,
+    dpi: int = 300,
+    lang: str = "tur"
+) -> int:
+    """cid yoğunluğu en yüksek birkaç sayfayı OCR'layıp tabloyu günceller ve kaydeder.
+
+    Sayfalardaki tüm cid'ler zaten çözülebiliyorsa ya da sayfa daha önce
+    oylanmışsa (tablodaki `voted`) OCR yapılmaz. Eklenen oy sayısını döndürür.
+    """
+    # OCR bağımlılıkları yalnızca öğrenme sırasında gerekir (parsed_pdf de bu modülü içe aktarır)
+    from src.data.page_cache import file_sha256, get_page_cache
+    from src.data.parsed_pdf import get_parsed_pdf
+    from src.data.pdf_ocr_extractor import TESSERACT_AVAILABLE, ocr_page_data
+
+    table = table or get_cid_table()
+    if not TESSERACT_AVAILABLE:
+        return 0
+
+    added = 0
+    newly_voted = 0
+    try:
+        pdf_hash = file_sha256(pdf_path)
+        pdf = get_parsed_pdf(pdf_path)
+        unresolved: List[Tuple[int, int]] = []
+        for page in pdf.pages:
+            if table.has_voted(pdf_hash, page.page_number):
+                continue
+            count = 0
+            for char in page.chars:
+                match = CID_TOKEN.fullmatch(char.get("text", ""))
+                if match and table.lookup(char.get("fontname", ""), match.group(1)) is None:
+                    count += 1
+            if count:
+                unresolved.append((count, page.page_number))
+        if not unresolved:
+            return 0
+
+        for _, page_num in sorted(unresolved, reverse=True)[:max_pages]:
+            page = pdf.page(page_num)
+            image = get_page_cache().get_page(pdf_path, page_num, dpi=dpi)
+            if image is None:
+                continue
+            _, words = ocr_page_data(image, lang=lang)
+            votes = align_page_votes(
+                page.chars, words, image.width / float(page.width), image.height / float(page.height)
+            )
+            for fontname, cid, char in votes:
+                table.add_vote(fontname, cid, char)
+            table.mark_voted(pdf_hash, page_num)
+            newly_voted += 1
+            added += len(votes)
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] cid tablosu öğrenilemedi ({pdf_path.name}): {e}")
+        return added
+
+    if newly_voted:
+        table.save()
+    if added:
+        print(f"   [dim]cid tablosu:[/dim] {pdf_path.name} üzerinden {added} oy eklendi")
+    return added
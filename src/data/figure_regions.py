@@ -0,0 +1,247 @@
+"""Şekil/tablo bölgesi tespiti: OCR'ı tüm sayfa yerine yalnızca metin katmanı olmayan alanlara uygular."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from rich import print
+
+from src.data.improved_pdf_extractor import BBox, crop_question_image, find_question_regions
+from src.data.page_cache import get_page_cache
+from src.data.parsed_pdf import get_parsed_pdf
+from src.data.pdf_ocr_extractor import ocr_images
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+# Bölge boyut eşikleri (PDF noktası); daha küçükleri çizgi/süs kabul edilir
+MIN_REGION_SIDE = 15.0
+MIN_REGION_AREA = 1500.0
+# Sayfanın bu oranından büyük bölgeler (sayfa çerçevesi, arka plan) şekil sayılmaz
+MAX_PAGE_COVERAGE = 0.75
+# Kontur tespiti için sayfa görselinin küçültüleceği genişlik (piksel)
+DETECTION_WIDTH = 1000
+# Mürekkep sayılacak gri seviye üst sınırı
+INK_THRESHOLD = 200
+
+
+@dataclass
+class FigureRegion:
+    """Sayfadaki tek bir şekil/tablo bölgesi (koordinatlar PDF noktası cinsinden)."""
+
+    page: int
+    bbox: BBox
+    kinds: List[str] = field(default_factory=list)
+    question_number: Optional[str] = None
+    text: str = ""
+
+    @property
+    def area(self) -> float:
+        x0, top, x1, bottom = self.bbox
+        return max(0.0, x1 - x0) * max(0.0, bottom - top)
+
+
+def _large_enough(bbox: BBox) -> bool:
+    x0, top, x1, bottom = bbox
+    width, height = x1 - x0, bottom - top
+    return min(width, height) >= MIN_REGION_SIDE and width * height >= MIN_REGION_AREA
+
+
+def _page_sized(region: FigureRegion, page_size: Tuple[float, float]) -> bool:
+    return region.area > MAX_PAGE_COVERAGE * page_size[0] * page_size[1]
+
+
+def _overlaps(a: BBox, b: BBox, gap: float) -> bool:
+    return not (
+        a[2] + gap < b[0] or b[2] + gap < a[0] or a[3] + gap < b[1] or b[3] + gap < a[1]
+    )
+
+
+def merge_regions(regions: List[FigureRegion], gap: float = 4.0) -> List[FigureRegion]:
+    """Üst üste binen ya da `gap` kadar yakın bölgeleri birleştirir."""
+    merged: List[FigureRegion] = []
+    for region in sorted(regions, key=lambda r: (r.bbox[1], r.bbox[0])):
+        current = region
+        changed = True
+        # Yeni birleşim daha önce ayrı duran bölgelere de değebilir
+        while changed:
+            changed = False
+            for other in merged:
+                if _overlaps(current.bbox, other.bbox, gap):
+                    merged.remove(other)
+                    current = FigureRegion(
+                        page=current.page,
+                        bbox=(
+                            min(current.bbox[0], other.bbox[0]),
+                            min(current.bbox[1], other.bbox[1]),
+                            max(current.bbox[2], other.bbox[2]),
+                            max(current.bbox[3], other.bbox[3]),
+                        ),
+                        kinds=sorted(set(current.kinds) | set(other.kinds)),
+                    )
+                    changed = True
+                    break
+        merged.append(current)
+    return merged
+
+
+def _pdf_object_regions(page, page_num: int) -> List[FigureRegion]:
+    """pdfplumber görselleri ve dikdörtgenlerinden (tablo/çerçeve) aday bölgeler."""
+    regions = [
+        FigureRegion(page_num, (img["x0"], img["top"], img["x1"], img["bottom"]), ["image"])
+        for img in page.images
+    ]
+    # Tablo hücreleri tek tek küçüktür; önce birleştirilip sonra boyut süzgecinden geçer
+    cells = [
+        FigureRegion(page_num, (rect["x0"], rect["top"], rect["x1"], rect["bottom"]), ["table"])
+        for rect in page.rects
+    ]
+    regions.extend(merge_regions(cells, gap=1.0))
+    return regions
+
+
+def _untexted_ink_regions(
+    page_image: Image.Image,
+    words: List[dict],
+    page_size: Tuple[float, float],
+    page_num: int,
+) -> List[FigureRegion]:
+    """Metin katmanındaki kelimeler maskelendikten sonra kalan mürekkep kümeleri.
+
+    Vektörel çizimler, görsel olarak gömülmüş seçenekler ve fontu metin katmanına
+    yansımamış yazılar bu yolla bulunur. İşlem küçültülmüş bir kopyada yapılır.
+    """
+    scale = min(1.0, DETECTION_WIDTH / page_image.width)
+    gray_image = page_image.convert("L")
+    if scale < 1.0:
+        gray_image = gray_image.resize(
+            (DETECTION_WIDTH, max(1, int(page_image.height * scale))), Image.BILINEAR
+        )
+    gray = np.asarray(gray_image)
+    ink = np.where(gray < INK_THRESHOLD, 255, 0).astype(np.uint8)
+
+    px_per_pt_x = gray.shape[1] / page_size[0]
+    px_per_pt_y = gray.shape[0] / page_size[1]
+    pad = 1.5
+    for word in words:
+        x0 = max(0, int((word["x0"] - pad) * px_per_pt_x))
+        x1 = int((word["x1"] + pad) * px_per_pt_x) + 1
+        y0 = max(0, int((word["top"] - pad) * px_per_pt_y))
+        y1 = int((word["bottom"] + pad) * px_per_pt_y) + 1
+        ink[y0:y1, x0:x1] = 0
+
+    ink = cv2.dilate(ink, np.ones((5, 5), dtype=np.uint8), iterations=2)
+    contours, _ = cv2.findContours(ink, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        bbox = (x / px_per_pt_x, y / px_per_pt_y, (x + w) / px_per_pt_x, (y + h) / px_per_pt_y)
+        regions.append(FigureRegion(page_num, bbox, ["no_text"]))
+    return regions
+
+
+def detect_figure_regions(
+    page,
+    page_num: int,
+    page_image: Optional[Image.Image] = None
+) -> List[FigureRegion]:
+    """Bir sayfadaki (pdfplumber ya da ParsedPage) şekil, tablo ve metin katmanı olmayan bölgeleri bulur.
+
+    page_image verilmişse (ve OpenCV kuruluysa) kontur analizi de yapılır.
+    Bölgeler, içlerine düştükleri sorunun numarasıyla etiketlenir.
+    """
+    words = page.extract_words(keep_blank_chars=False, use_text_flow=False)
+    page_size = (float(page.width), float(page.height))
+
+    candidates = _pdf_object_regions(page, page_num)
+    if page_image is not None and CV2_AVAILABLE:
+        candidates.extend(_untexted_ink_regions(page_image, words, page_size, page_num))
+
+    # Sayfa boyu çerçeveler birleştirmeden önce atılır; aksi halde içlerindeki
+    # tüm şekilleri tek bir sayfa büyüklüğünde bölgeye yutarlar
+    candidates = [r for r in candidates if not _page_sized(r, page_size)]
+    regions = [
+        r for r in merge_regions(candidates)
+        if _large_enough(r.bbox) and not _page_sized(r, page_size)
+    ]
+
+    question_regions = find_question_regions(page)
+    for region in regions:
+        center_x = (region.bbox[0] + region.bbox[2]) / 2
+        center_y = (region.bbox[1] + region.bbox[3]) / 2
+        for number, (x0, top, x1, bottom) in question_regions.items():
+            if x0 - 1 <= center_x <= x1 + 1 and top - 1 <= center_y <= bottom + 1:
+                region.question_number = number
+                break
+    return regions
+
+
+def extract_figure_texts(
+    pdf_path: Path,
+    pages: Optional[Iterable[int]] = None,
+    dpi: int = 300,
+    lang: str = "tur"
+) -> List[FigureRegion]:
+    """Verilen sayfalardaki şekil bölgelerini bulur ve yalnızca bu bölgeleri OCR'lar.
+
+    Kırpıntılar `ocr_images` ile toplu (ve önbellekli) işlenir. OCR'a giden
+    piksel oranı raporlanır. Metin bulunan bölgeler döndürülür.
+    """
+    page_filter = set(pages) if pages is not None else None
+    cache = get_page_cache()
+    regions: List[FigureRegion] = []
+    crops: List[Image.Image] = []
+    page_pixels = 0
+
+    try:
+        pdf = get_parsed_pdf(pdf_path)
+        for page_num, page in enumerate(pdf.pages, 1):
+            if page_filter is not None and page_num not in page_filter:
+                continue
+            page_image = cache.get_page(pdf_path, page_num, dpi=dpi)
+            page_regions = detect_figure_regions(page, page_num, page_image)
+            if page_image is None or not page_regions:
+                continue
+            page_pixels += page_image.width * page_image.height
+            page_size = (float(page.width), float(page.height))
+            for region in page_regions:
+                regions.append(region)
+                crops.append(crop_question_image(page_image, region.bbox, page_size, padding=4.0))
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] Şekil bölgeleri çıkarılamadı ({pdf_path.name}): {e}")
+        return []
+
+    if not crops:
+        return []
+
+    crop_pixels = sum(crop.width * crop.height for crop in crops)
+    print(
+        f"   [dim]Şekil bölgeleri:[/dim] {len(crops)} bölge, "
+        f"sayfa piksellerinin %{100 * crop_pixels / max(page_pixels, 1):.0f}'i OCR'lanıyor"
+    )
+
+    for region, text in zip(regions, ocr_images(crops, lang=lang)):
+        region.text = text
+    return [region for region in regions if region.text]
+
+
+def figure_texts_by_question(regions: List[FigureRegion]) -> Dict[Tuple[int, str], List[FigureRegion]]:
+    """Bölgeleri (sayfa, soru numarası) çiftine göre gruplar (soruya düşmeyenler atlanır).
+
+    Kitapçıklarda numaralama test/bölüm başında yeniden başladığı için
+    numara tek başına soruyu belirlemez.
+    """
+    grouped: Dict[Tuple[int, str], List[FigureRegion]] = {}
+    for region in regions:
+        if region.question_number:
+            grouped.setdefault((region.page, region.question_number), []).append(region)
+    return grouped
@@ -4,71 +4,112 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import cv2
 import numpy as np
 from PIL import Image
 from rich import print
 
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+from src.data.ocr_backend import PYTESSERACT_AVAILABLE, TESSEROCR_AVAILABLE, get_ocr_backend
+from src.data.ocr_cache import bytes_digest, get_ocr_cache, make_cache_key
+from src.data.ocr_preprocess import PreprocessParams, PreprocessPipeline
+
+TESSERACT_AVAILABLE = PYTESSERACT_AVAILABLE or TESSEROCR_AVAILABLE
+if not TESSERACT_AVAILABLE:
     print("[yellow]Uyarı:[/yellow] pytesseract bulunamadı. OCR özelliği devre dışı.")
 
+OCR_CONFIG = "--psm 6"  # Tek blok metin varsayımı
+# Görsel dosyaları için paylaşılan ön işleme hattı (tamponlar iş parçacığı başına)
+IMAGE_PIPELINE = PreprocessPipeline(PreprocessParams(clahe_clip=2.0))
+# Ön işleme parametreleri değişirse önbellek anahtarı da değişsin diye sürüm etiketi
+PREPROCESS_VERSION = IMAGE_PIPELINE.version
+# Toplu görsel OCR'da tek arka uç çağrısına verilen (ön işlenmiş) görsel sayısı
+IMAGE_BATCH_SIZE = 32
+
+
+def preprocess_image(image_path: Path, mode: str = "adaptive") -> np.ndarray:
+    """Görseli OCR için ön işleme (gürültü azaltma, kontrast artırma).
+    
+    mode="adaptive" gürültü/kontrast tahminine göre yol seçer, "classic" tam zinciri uygular.
+    Görsel doğrudan gri tonlamalı okunur; dönen dizi hattın tamponudur.
+    """
+    pipeline = IMAGE_PIPELINE
+    if mode != pipeline.mode:
+        pipeline = PreprocessPipeline(pipeline.params, mode=mode)
+    return pipeline.run(image_path)
+
 
-def preprocess_image(image_path: Path) -> np.ndarray:
-    """Görseli OCR için ön işleme (gürültü azaltma, kontrast artırma)."""
-    img = cv2.imread(str(image_path))
-    if img is None:
-        raise ValueError(f"Görsel yüklenemedi: {image_path}")
+def extract_texts_from_images(
+    image_paths: List[Path],
+    lang: str = "tur",
+    use_cache: bool = True
+) -> List[str]:
+    """Çok sayıda görsel dosyasını toplu OCR'lar (sonuçlar dosya içeriği hash'iyle önbelleklenir).
     
-    # Gri tonlamaya çevir
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    Önbellekte olmayan görseller IMAGE_BATCH_SIZE'lık gruplarla tek bir arka uç
+    çağrısına verilir; böylece tesseract CLI arka ucunda görsel başına ayrı
+    süreç başlatılmaz. Okunamayan ya da OCR'lanamayan görseller için "" döner.
+    """
+    if not TESSERACT_AVAILABLE or not image_paths:
+        return [""] * len(image_paths)
     
-    # Gürültü azaltma
-    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+    cache = get_ocr_cache() if use_cache else None
+    texts: List[Optional[str]] = [None] * len(image_paths)
+    keys: List[Optional[str]] = [None] * len(image_paths)
     
-    # Kontrast artırma (CLAHE)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(denoised)
+    if cache is not None:
+        for idx, image_path in enumerate(image_paths):
+            try:
+                keys[idx] = make_cache_key(
+                    bytes_digest(image_path.read_bytes()),
+                    lang=lang,
+                    config=OCR_CONFIG,
+                    preprocess=PREPROCESS_VERSION
+                )
+            except Exception as e:
+                print(f"[red]Hata:[/red] {image_path.name} okunamadı: {e}")
+                texts[idx] = ""
+                continue
+            cached = cache.get(keys[idx])
+            if cached is not None:
+                texts[idx] = cached[0]
     
-    # Eşikleme (thresholding)
-    _, thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    missing = [idx for idx, text in enumerate(texts) if text is None]
+    for start in range(0, len(missing), IMAGE_BATCH_SIZE):
+        chunk = missing[start:start + IMAGE_BATCH_SIZE]
+        batch_idx = []
+        batch = []
+        for idx in chunk:
+            try:
+                # Hattın dönen dizisi paylaşılan tampondur; toplu çağrı için kopyalanır
+                batch.append(preprocess_image(image_paths[idx]).copy())
+                batch_idx.append(idx)
+            except Exception as e:
+                print(f"[red]Hata:[/red] {image_paths[idx].name} ön işlenemedi: {e}")
+                texts[idx] = ""
+        if not batch:
+            continue
+        try:
+            results = get_ocr_backend().image_to_string_batch(batch, lang=lang, config=OCR_CONFIG)
+        except Exception as e:
+            print(f"[red]Hata:[/red] Toplu görsel OCR hatası: {e}")
+            results = [""] * len(batch)
+        for idx, text in zip(batch_idx, results):
+            texts[idx] = text.strip()
+            if cache is not None and keys[idx] is not None:
+                cache.put(keys[idx], texts[idx])
     
-    return thresh
+    return [text or "" for text in texts]
 
 
-def extract_text_from_image(image_path: Path, lang: str = "tur") -> str:
-    """Görselden Türkçe metin çıkarır."""
-    if not TESSERACT_AVAILABLE:
-        return ""
-    
-    try:
-        # Ön işleme
-        processed_img = preprocess_image(image_path)
-        
-        # OCR (Türkçe dil desteği)
-        # Tesseract Türkçe dil paketi yüklü olmalı: tesseract-lang
-        text = pytesseract.image_to_string(
-            processed_img,
-            lang=lang,
-            config="--psm 6"  # Tek blok metin varsayımı
-        )
-        
-        return text.strip()
-    except Exception as e:
-        print(f"[red]Hata:[/red] {image_path.name} OCR hatası: {e}")
-        return ""
+def extract_text_from_image(image_path: Path, lang: str = "tur", use_cache: bool = True) -> str:
+    """Görselden Türkçe metin çıkarır (sonuçlar dosya içeriği hash'iyle önbelleklenir)."""
+    return extract_texts_from_images([image_path], lang=lang, use_cache=use_cache)[0]
 
 
-def extract_question_from_image(image_path: Path) -> Optional[dict]:
-    """Görselden soru metnini çıkarır ve yapılandırır."""
-    print(f"[cyan]Görsel işleniyor:[/cyan] {image_path.name}")
-    
-    text = extract_text_from_image(image_path)
+def parse_image_question(image_path: Path, text: str) -> Optional[dict]:
+    """Görselin OCR metnini soru yapısına çevirir (metin boşsa None)."""
     if not text:
         return None
     
@@ -91,3 +132,15 @@ def extract_question_from_image(image_path: Path) -> Optional[dict]:
     
     return question_data
 
+
+def extract_questions_from_images(image_paths: List[Path]) -> List[Optional[dict]]:
+    """Görsel dosyalarından soruları toplu OCR ile çıkarır (girdi sırasıyla; metin yoksa None)."""
+    print(f"[cyan]Görseller işleniyor:[/cyan] {len(image_paths)} dosya")
+    texts = extract_texts_from_images(image_paths)
+    return [parse_image_question(path, text) for path, text in zip(image_paths, texts)]
+
+
+def extract_question_from_image(image_path: Path) -> Optional[dict]:
+    """Görselden soru metnini çıkarır ve yapılandırır."""
+    print(f"[cyan]Görsel işleniyor:[/cyan] {image_path.name}")
+    return parse_image_question(image_path, extract_text_from_image(image_path))
@@ -13,6 +13,7 @@ from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from src.data.cid_decoder import decode_cid_text
 from src.utils.io import read_json, write_json
 
 
@@ -21,6 +22,9 @@ def clean_encoding_better(text: str, preserve_content: bool = True) -> str:
     if not text:
         return ""
     
+    # Öğrenilmiş font tablosuyla çözülebilen (cid:XX) belirteçlerini önce çöz
+    text = decode_cid_text(text)
+    
     # (cid:...) karakterlerini kaldır (ama metni koru)
     # Önce (cid:XX) formatını kaldır - sadece bu karakterleri kaldır, metni koru
     cleaned = re.sub(r'\(cid:\d+\)', '', text)
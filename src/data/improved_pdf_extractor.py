@@ -6,15 +6,13 @@ import re
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
-import pdfplumber
 from rich import print
 from PIL import Image
 
-try:
-    from pdf2image import convert_from_path
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
+from src.data.page_cache import PDF2IMAGE_AVAILABLE, get_page_cache
+from src.data.cid_decoder import CID_TOKEN
+from src.data.parsed_pdf import get_parsed_pdf
+from src.data.question_segmenter import iter_page_lines, iter_question_segments
 
 try:
     import pytesseract
@@ -24,16 +22,116 @@ except ImportError:
 
 
 def extract_page_as_image(pdf_path: Path, page_num: int, dpi: int = 400) -> Optional[Image.Image]:
-    """Belirli bir sayfayı görsel olarak çıkar."""
+    """Belirli bir sayfayı görsel olarak çıkar (paylaşılan sayfa önbelleği üzerinden)."""
     if not PDF2IMAGE_AVAILABLE:
         return None
     
-    try:
-        images = convert_from_path(str(pdf_path), dpi=dpi, first_page=page_num, last_page=page_num)
-        return images[0] if images else None
-    except Exception as e:
-        print(f"[yellow]Uyarı:[/yellow] Sayfa {page_num} görsel çıkarılamadı: {e}")
-        return None
+    return get_page_cache().get_page(pdf_path, page_num, dpi=dpi)
+
+
+QUESTION_START_WORD = re.compile(r'^(\d+)[\.\)\-]?$|^(\d+)[\.\)\-](?!\d)')
+
+BBox = Tuple[float, float, float, float]
+
+
+def find_question_regions(page, line_tolerance: float = 3.0) -> Dict[str, BBox]:
+    """pdfplumber kelime koordinatlarından her sorunun sayfa bölgesini bul.
+    
+    Bölge, soru numarası satırından bir sonraki sorunun başlangıcına kadar uzanır
+    (iki sütunlu sayfalarda kendi sütunu içinde) ve bu aralıktaki görselleri kapsar.
+    Koordinatlar PDF noktası cinsinden (x0, top, x1, bottom) döner.
+    """
+    words = page.extract_words(keep_blank_chars=False, use_text_flow=False)
+    if not words:
+        return {}
+    
+    width, height = float(page.width), float(page.height)
+    mid_x = width / 2
+    
+    # Kelimeleri satırlara grupla (aynı 'top' değerine yakın olanlar)
+    lines: List[List[dict]] = []
+    for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        if lines and abs(lines[-1][0]["top"] - word["top"]) <= line_tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    
+    # Satır/sütun başındaki soru numaralarını bul
+    starts = []
+    for line in lines:
+        line.sort(key=lambda w: w["x0"])
+        for idx, word in enumerate(line):
+            # Sadece satır başı ya da sağ sütunun ilk kelimesi soru başlangıcı olabilir
+            is_column_start = idx == 0 or (word["x0"] >= mid_x and line[idx - 1]["x1"] < mid_x)
+            if not is_column_start:
+                continue
+            match = QUESTION_START_WORD.match(word["text"])
+            if match and (len(word["text"]) > len(match.group(1) or "") or idx + 1 < len(line)):
+                number = match.group(1) or match.group(2)
+                column = 1 if word["x0"] >= mid_x else 0
+                starts.append((column, word["top"], number, word))
+    
+    if not starts:
+        return {}
+    
+    two_columns = any(column == 1 for column, *_ in starts)
+    starts.sort(key=lambda s: (s[0], s[1]))
+    
+    regions: Dict[str, BBox] = {}
+    for i, (column, top, number, word) in enumerate(starts):
+        if two_columns:
+            x0, x1 = (0.0, mid_x) if column == 0 else (mid_x, width)
+        else:
+            x0, x1 = 0.0, width
+        
+        next_same_column = starts[i + 1] if i + 1 < len(starts) and starts[i + 1][0] == column else None
+        bottom = next_same_column[1] - 1 if next_same_column else height
+        
+        # Bu aralıktaki kelimelerin gerçek kapladığı alanı al
+        span_words = [
+            w for w in words
+            if top - 1 <= w["top"] < bottom and w["x0"] >= x0 - 1 and w["x1"] <= x1 + 1
+        ]
+        if span_words:
+            x0 = max(x0, min(w["x0"] for w in span_words))
+            x1 = min(x1, max(w["x1"] for w in span_words))
+            text_bottom = max(w["bottom"] for w in span_words)
+        else:
+            text_bottom = top
+        
+        # Aralığa düşen görselleri (şekil, grafik) kapsa
+        for img in page.images:
+            img_center_y = (img["top"] + img["bottom"]) / 2
+            img_center_x = (img["x0"] + img["x1"]) / 2
+            in_column = not two_columns or (img_center_x >= mid_x) == (column == 1)
+            if top <= img_center_y < bottom and in_column:
+                x0 = min(x0, img["x0"])
+                x1 = max(x1, img["x1"])
+                text_bottom = max(text_bottom, img["bottom"])
+        
+        # Aynı numara sayfada tekrar ederse ilk bulunanı koru
+        regions.setdefault(number, (x0, top, x1, min(text_bottom, bottom)))
+    
+    return regions
+
+
+def crop_question_image(
+    page_image: Image.Image,
+    region: BBox,
+    page_size: Tuple[float, float],
+    padding: float = 6.0,
+) -> Image.Image:
+    """PDF noktası cinsinden bölgeyi render edilmiş sayfa görselinden kırp."""
+    scale_x = page_image.width / page_size[0]
+    scale_y = page_image.height / page_size[1]
+    x0, top, x1, bottom = region
+    box = (
+        max(0, int((x0 - padding) * scale_x)),
+        max(0, int((top - padding) * scale_y)),
+        min(page_image.width, int((x1 + padding) * scale_x)),
+        min(page_image.height, int((bottom + padding) * scale_y)),
+    )
+    return page_image.crop(box)
 
 
 def save_question_image(image: Image.Image, output_dir: Path, question_id: str) -> Path:
@@ -44,28 +142,11 @@ def save_question_image(image: Image.Image, output_dir: Path, question_id: str)
     return image_path
 
 
-def find_question_boundaries(text: str) -> List[Tuple[int, int]]:
-    """Metinde soru sınırlarını bul (daha akıllı algoritma)."""
-    boundaries = []
-    lines = text.split('\n')
-    
-    current_start = None
-    question_pattern = re.compile(r'^\s*(\d+)[\.\)\-\s]+', re.MULTILINE)
-    
-    for i, line in enumerate(lines):
-        # Soru numarası bulundu
-        match = question_pattern.match(line)
-        if match:
-            # Önceki soruyu kaydet
-            if current_start is not None:
-                boundaries.append((current_start, i))
-            current_start = i
-    
-    # Son soruyu ekle
-    if current_start is not None:
-        boundaries.append((current_start, len(lines)))
-    
-    return boundaries
+# Seçenek desenleri: soru işaretinden sonraki kısa seçenekler ve genel seçenek listesi
+SHORT_OPTION_PATTERN = re.compile(r'([A-D])[\.\)]\s*([^A-D]{0,50}?)(?=[A-D][\.\)]|$)', re.DOTALL)
+OPTION_PATTERN = re.compile(r'([A-D])[\.\)]\s*([^A-D]+?)(?=[A-D][\.\)]|$)', re.DOTALL)
+OPTION_MARK = re.compile(r'[A-D][\.\)]')
+WHITESPACE = re.compile(r'\s+')
 
 
 def parse_single_question(text_lines: List[str], question_num: str) -> Optional[Dict]:
@@ -91,8 +172,7 @@ def parse_single_question(text_lines: List[str], question_num: str) -> Optional[
         
         # İlk 4 seçeneği bul (sonraki soruya geçmeden)
         options = []
-        option_pattern = re.compile(r'([A-D])[\.\)]\s*([^A-D]{0,50}?)(?=[A-D][\.\)]|$)', re.DOTALL)
-        option_matches = list(option_pattern.finditer(after_first_q))
+        option_matches = list(SHORT_OPTION_PATTERN.finditer(after_first_q))
         
         # Eğer 4'ten fazla seçenek varsa, muhtemelen birleşmiş sorular var
         # Sadece ilk 4 seçeneği al
@@ -111,15 +191,14 @@ def parse_single_question(text_lines: List[str], question_num: str) -> Optional[
             return None
     else:
         # Soru işareti yoksa, ilk seçeneğe kadar al
-        first_option = re.search(r'[A-D][\.\)]', full_text)
+        first_option = OPTION_MARK.search(full_text)
         if first_option:
             question_text = full_text[:first_option.start()].strip()
             options_text = full_text[first_option.start():].strip()
             
             # Seçenekleri parse et
             options = []
-            option_pattern = re.compile(r'([A-D])[\.\)]\s*([^A-D]+?)(?=[A-D][\.\)]|$)', re.DOTALL)
-            for match in option_pattern.finditer(options_text):
+            for match in OPTION_PATTERN.finditer(options_text):
                 letter = match.group(1)
                 content = match.group(2).strip()
                 if len(content) < 100:
@@ -137,10 +216,8 @@ def parse_single_question(text_lines: List[str], question_num: str) -> Optional[
         return None
     
     # Encoding sorunlarını temizle
-    question_text = re.sub(r'\(cid:\d+\)', '', question_text)
-    question_text = re.sub(r'\s+', ' ', question_text).strip()
-    full_clean_text = re.sub(r'\(cid:\d+\)', '', full_clean_text)
-    full_clean_text = re.sub(r'\s+', ' ', full_clean_text).strip()
+    question_text = WHITESPACE.sub(' ', CID_TOKEN.sub('', question_text)).strip()
+    full_clean_text = WHITESPACE.sub(' ', CID_TOKEN.sub('', full_clean_text)).strip()
     
     return {
         "question_number": question_num,
@@ -158,55 +235,55 @@ def extract_questions_improved(pdf_path: Path, save_images: bool = True) -> List
     all_questions = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f"[dim]Toplam sayfa:[/dim] {total_pages}\n")
+        pdf = get_parsed_pdf(pdf_path)
+        total_pages = len(pdf.pages)
+        print(f"[dim]Toplam sayfa:[/dim] {total_pages}\n")
+        
+        for page_num, page in enumerate(pdf.pages, 1):
+            print(f"[dim]Sayfa {page_num}/{total_pages} işleniyor...[/dim]", end="\r")
             
-            for page_num, page in enumerate(pdf.pages, 1):
-                print(f"[dim]Sayfa {page_num}/{total_pages} işleniyor...[/dim]", end="\r")
-                
-                # Metin çıkar
-                text = page.extract_text()
-                if not text or len(text.strip()) < 20:
-                    continue
-                
-                # Soru sınırlarını bul
-                lines = text.split('\n')
-                boundaries = find_question_boundaries(text)
-                
-                # Her soruyu parse et
-                for start_idx, end_idx in boundaries:
-                    question_lines = lines[start_idx:end_idx]
-                    
-                    # Soru numarasını bul
-                    first_line = question_lines[0] if question_lines else ""
-                    num_match = re.match(r'^\s*(\d+)[\.\)\-\s]+', first_line)
-                    if not num_match:
-                        continue
-                    
-                    question_num = num_match.group(1)
-                    
-                    # Soruyu parse et
-                    question_data = parse_single_question(question_lines, question_num)
-                    
-                    if question_data and question_data.get("has_options"):
-                        # Görsel çıkar (eğer isteniyorsa)
-                        if save_images and PDF2IMAGE_AVAILABLE:
-                            page_image = extract_page_as_image(pdf_path, page_num, dpi=400)
-                            if page_image:
-                                # Soru görselini kaydet
-                                question_id = f"{pdf_path.stem}_p{page_num}_q{question_num}"
-                                image_dir = Path("data/extracted_images")
-                                image_path = save_question_image(page_image, image_dir, question_id)
-                                question_data["image_path"] = str(image_path)
-                                question_data["has_image"] = True
-                        
-                        question_data["source_file"] = pdf_path.name
-                        question_data["page"] = page_num
-                        all_questions.append(question_data)
+            # Metin çıkar (öğrenilmiş cid tablosuyla çözülebilen glifler dahil)
+            page.decode_cids()
+            text = page.extract_text()
+            if not text or len(text.strip()) < 20:
+                continue
             
-            print(f"\n[green]✓ Toplam {len(all_questions)} soru çıkarıldı[/green]")
+            page_image = None
+            regions = find_question_regions(page) if save_images and PDF2IMAGE_AVAILABLE else {}
             
+            # Soru sınırlarını bul ve her soruyu parse et
+            for segment in iter_question_segments(iter_page_lines(text, page_num)):
+                question_num = segment.number
+                question_data = parse_single_question(segment.lines, question_num)
+                
+                if question_data and question_data.get("has_options"):
+                    # Görsel çıkar (eğer isteniyorsa)
+                    if save_images and PDF2IMAGE_AVAILABLE:
+                        # Sayfa, bu sayfadaki tüm sorular için yalnızca bir kez alınır
+                        if page_image is None:
+                            page_image = extract_page_as_image(pdf_path, page_num, dpi=400)
+                        if page_image:
+                            # Sadece sorunun bölgesini kaydet (bölge bulunamazsa tüm sayfa)
+                            region = regions.get(question_num)
+                            if region:
+                                question_image = crop_question_image(
+                                    page_image, region, (float(page.width), float(page.height))
+                                )
+                                question_data["image_bbox"] = [round(v, 1) for v in region]
+                            else:
+                                question_image = page_image
+                            question_id = f"{pdf_path.stem}_p{page_num}_q{question_num}"
+                            image_dir = Path("data/extracted_images")
+                            image_path = save_question_image(question_image, image_dir, question_id)
+                            question_data["image_path"] = str(image_path)
+                            question_data["has_image"] = True
+                    
+                    question_data["source_file"] = pdf_path.name
+                    question_data["page"] = page_num
+                    all_questions.append(question_data)
+        
+        print(f"\n[green]✓ Toplam {len(all_questions)} soru çıkarıldı[/green]")
+        
     except Exception as e:
         print(f"[red]Hata:[/red] {pdf_path.name} işlenirken hata: {e}")
     
@@ -2,16 +2,22 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import pathlib
-from dataclasses import dataclass
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 from rich import print
 
-from src.data.image_ocr import extract_question_from_image
+from src.data.image_ocr import extract_question_from_image, extract_questions_from_images
+from src.data.manifest import IngestManifest
+from src.data.page_cache import DEFAULT_MAX_DISK_BYTES, set_page_cache_limit
+from src.data.page_prefilter import prefilter_pages
 from src.data.pdf_extractor import extract_questions_from_pdf
 from src.data.process_karekok_pdf import process_karekok_pdf
-from src.utils.io import ensure_dir, read_yaml, write_json
+from src.data.source_plan import plan_sources, print_plan, source_config_hash, uses_ocr
+from src.utils.io import ensure_dir, read_json, read_yaml, write_json
 
 
 @dataclass
@@ -28,6 +34,9 @@ class IngestConfig:
     interim_data_dir: pathlib.Path
     processed_data_dir: pathlib.Path
     sources: List[SourceSpec]
+    workers: int = 1
+    # Sayfa görseli disk önbelleğinin bütçesi (0 = disk önbelleği kapalı)
+    page_cache_max_bytes: int = DEFAULT_MAX_DISK_BYTES
 
     @classmethod
     def from_dict(cls, data: dict) -> "IngestConfig":
@@ -44,112 +53,315 @@ class IngestConfig:
                 )
                 for src in data.get("sources", [])
             ],
+            workers=int(data.get("ingest", {}).get("workers", 1)),
+            page_cache_max_bytes=int(
+                data.get("ingest", {}).get("page_cache_max_mb", DEFAULT_MAX_DISK_BYTES // (1024 * 1024))
+            ) * 1024 * 1024,
         )
 
 
+@dataclass
+class FileResult:
+    """Tek dosyanın ingest sonucu ve sayfa ön filtresi istatistikleri."""
+
+    questions: List[dict] = field(default_factory=list)
+    pages_total: int = 0
+    pages_skipped: int = 0
+
+
+# Süreç havuzundaki işçilerde OCR iş parçacığı sayısı (_init_pool_worker ayarlar)
+_POOL_OCR_WORKERS: Optional[int] = None
+
+
+def ingest_file(
+    source: SourceSpec,
+    file: pathlib.Path,
+    interim_dir: pathlib.Path,
+    ocr_workers: Optional[int] = None
+) -> FileResult:
+    """Tek bir dosyadan soruları çıkarır (süreç havuzunda bağımsız çalışabilir).
+    
+    topic_filter tanımlı PDF kaynaklarında (metadata.page_prefilter false değilse)
+    konu dışı sayfalar segmentasyondan önce atlanır. ocr_workers verilmezse OCR
+    iş parçacığı sayısı default_ocr_workers() ile belirlenir.
+    """
+    print(f"  • {file.name} ({source.type}) -> işleniyor...")
+    result = FileResult()
+    questions: List[dict] = []
+    
+    if source.type == "pdf":
+        # Özel dosya: karekokcikmis.pdf için OCR destekli işleme
+        if uses_ocr(source, file):
+            print(f"  [bold yellow]Özel işleme:[/bold yellow] OCR destekli işleme aktif")
+            output_file = interim_dir / f"{file.stem}_questions.json"
+            process_karekok_pdf(
+                pdf_path=file,
+                output_path=output_file,
+                use_ocr=True,
+                use_text_extraction=True,
+                ocr_workers=ocr_workers
+            )
+            # JSON'dan soruları yükle
+            try:
+                with output_file.open("r", encoding="utf-8") as f:
+                    questions = json.load(f)
+            except Exception as e:
+                print(f"[red]Hata:[/red] JSON yüklenemedi: {e}")
+        else:
+            # Normal PDF işleme (tam kitapçıklarda yalnızca konuyla ilgili sayfalar)
+            pages = None
+            if source.metadata.get("topic_filter") and source.metadata.get("page_prefilter", True):
+                prefilter = prefilter_pages(file)
+                if prefilter.total_pages:
+                    pages = prefilter.kept_pages
+                    result.pages_total = prefilter.total_pages
+                    result.pages_skipped = prefilter.skipped_pages
+                    print(
+                        f"    [dim]Ön filtre:[/dim] {prefilter.total_pages} sayfadan "
+                        f"{prefilter.skipped_pages} konu dışı sayfa atlandı"
+                    )
+            if pages == []:
+                # Hiçbir sayfa konuyla ilgili değil; metin çıkarmaya gerek yok
+                questions = []
+            else:
+                questions = extract_questions_from_pdf(file, filter_keywords=True, pages=pages)
+            # Her soruya metadata ekle
+            for q in questions:
+                q["source_file"] = file.name
+                q["source_type"] = "pdf"
+                q["source_name"] = source.name
+    
+    elif source.type == "json":
+        # JSON dosyasından soruları oku
+        try:
+            with file.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+                if isinstance(data, list):
+                    questions = data
+                elif isinstance(data, dict) and "questions" in data:
+                    questions = data["questions"]
+                else:
+                    questions = [data]
+                
+                for q in questions:
+                    q["source_file"] = file.name
+                    q["source_type"] = "json"
+                    q["source_name"] = source.name
+        except Exception as e:
+            print(f"[red]Hata:[/red] {file.name} okunamadı: {e}")
+    
+    elif source.type == "image":
+        # Görsel dosyalarından OCR ile çıkar
+        return _image_file_result(source, file, extract_question_from_image(file))
+    
+    result.questions = questions
+    return result
+
+
+def _image_file_result(source: SourceSpec, file: pathlib.Path, question_data: Optional[dict]) -> FileResult:
+    result = FileResult()
+    if question_data:
+        question_data["source_file"] = file.name
+        question_data["source_type"] = "image"
+        question_data["source_name"] = source.name
+        result.questions = [question_data]
+    return result
+
+
+def _ingest_image_tasks(tasks: List[Tuple[SourceSpec, pathlib.Path, pathlib.Path]]) -> List[Optional[FileResult]]:
+    """Görsel dosyası görevlerini tek toplu OCR çağrısıyla işler (hata durumunda hepsi None)."""
+    try:
+        question_list = extract_questions_from_images([file for _, file, _ in tasks])
+    except Exception as e:
+        print(f"[red]Hata:[/red] Görsel dosyaları işlenemedi: {e}")
+        return [None] * len(tasks)
+    return [
+        _image_file_result(source, file, question_data)
+        for (source, file, _), question_data in zip(tasks, question_list)
+    ]
+
+
+def _ingest_task(task: Tuple[SourceSpec, pathlib.Path, pathlib.Path]) -> Optional[FileResult]:
+    """Süreç havuzu için tek argümanlı sarmalayıcı (hata durumunda None döner)."""
+    source, file, interim_dir = task
+    try:
+        return ingest_file(source, file, interim_dir, ocr_workers=_POOL_OCR_WORKERS)
+    except Exception as e:
+        print(f"[red]Hata:[/red] {file.name} işlenemedi: {e}")
+        return None
+
+
+def _init_pool_worker(ocr_workers: int, page_cache_max_bytes: int) -> None:
+    """Havuz süreci başlatıcısı: süreç × OCR iş parçacığı sayısı çekirdek sayısını aşmasın."""
+    global _POOL_OCR_WORKERS
+    _POOL_OCR_WORKERS = ocr_workers
+    # spawn ile başlayan süreçler üst sürecin ayarını devralmaz
+    set_page_cache_limit(page_cache_max_bytes)
+    # tesseract'ın kendi OpenMP iş parçacıkları da katlanmasın (CLI alt süreçleri ortamı devralır)
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _task_output_path(task: Tuple[SourceSpec, pathlib.Path, pathlib.Path]) -> pathlib.Path:
+    """Dosya başına saklanan ingest çıktısının yolu."""
+    source, file, interim_dir = task
+    return interim_dir / "ingest_outputs" / f"{source.name}__{file.stem}.json"
+
+
+def run_tasks(
+    tasks: List[Tuple[SourceSpec, pathlib.Path, pathlib.Path]],
+    workers: int = 1,
+    manifest: Optional[IngestManifest] = None,
+    page_cache_max_bytes: int = DEFAULT_MAX_DISK_BYTES
+) -> List[List[dict]]:
+    """Dosya görevlerini çalıştırır; sonuçlar her zaman görev sırasıyla döner.
+    
+    manifest verilirse, içeriği/sürümü/ayarı değişmemiş dosyaların saklanan
+    çıktıları yeniden kullanılır ve yalnızca yeni ya da değişen dosyalar işlenir.
+    """
+    results: List[Optional[List[dict]]] = [None] * len(tasks)
+    pending: List[int] = []
+    pages_total = 0
+    pages_skipped = 0
+    
+    for idx, task in enumerate(tasks):
+        source, file, _ = task
+        if manifest is not None:
+            key = IngestManifest.make_key("ingest", source.name, file)
+            if manifest.is_fresh(key, file, source_config_hash(source)):
+                try:
+                    results[idx] = read_json(manifest.output_path(key))
+                    pages_total += manifest.entries[key].get("pages_total", 0)
+                    pages_skipped += manifest.entries[key].get("pages_skipped", 0)
+                    continue
+                except Exception as e:
+                    print(f"[yellow]Uyarı:[/yellow] {file.name} için saklanan çıktı okunamadı: {e}")
+        pending.append(idx)
+    
+    if manifest is not None:
+        print(
+            f"[bold cyan]Manifest:[/bold cyan] {len(tasks) - len(pending)} dosya değişmemiş (atlandı), "
+            f"{len(pending)} dosya işlenecek"
+        )
+    
+    # Görsel dosyaları tek tek değil toplu OCR'lanır (görsel başına tesseract süreci açılmasın)
+    image_pending = [idx for idx in pending if tasks[idx][0].type == "image"]
+    other_pending = [idx for idx in pending if tasks[idx][0].type != "image"]
+    outputs: Dict[int, Optional[FileResult]] = {}
+    if image_pending:
+        outputs.update(zip(image_pending, _ingest_image_tasks([tasks[idx] for idx in image_pending])))
+    
+    pending_tasks = [tasks[idx] for idx in other_pending]
+    if workers <= 1 or len(pending_tasks) <= 1:
+        outputs.update(zip(other_pending, (_ingest_task(task) for task in pending_tasks)))
+    else:
+        workers = min(workers, len(pending_tasks))
+        ocr_workers = max(1, (os.cpu_count() or 1) // workers)
+        print(
+            f"[bold cyan]Paralel ingest:[/bold cyan] {len(pending_tasks)} dosya, {workers} işçi süreç "
+            f"(süreç başına {ocr_workers} OCR iş parçacığı)"
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_pool_worker,
+            initargs=(ocr_workers, page_cache_max_bytes)
+        ) as executor:
+            # map() girdi sırasını korur -> çıktı deterministik
+            outputs.update(zip(other_pending, executor.map(_ingest_task, pending_tasks)))
+    
+    for idx in pending:
+        file_result = outputs.get(idx)
+        # Hatalı dosyalar manifest'e yazılmaz, bir sonraki çalıştırmada yeniden denenir
+        if file_result is None:
+            continue
+        results[idx] = file_result.questions
+        pages_total += file_result.pages_total
+        pages_skipped += file_result.pages_skipped
+        if manifest is not None:
+            source, file, _ = tasks[idx]
+            output_path = _task_output_path(tasks[idx])
+            write_json(file_result.questions, output_path)
+            manifest.record(
+                IngestManifest.make_key("ingest", source.name, file),
+                file,
+                source_config_hash(source),
+                output_path,
+                question_count=len(file_result.questions),
+                pages_total=file_result.pages_total,
+                pages_skipped=file_result.pages_skipped
+            )
+    
+    if manifest is not None:
+        manifest.save()
+    
+    if pages_total:
+        print(
+            f"[bold cyan]Sayfa ön filtresi:[/bold cyan] {pages_total} sayfadan {pages_skipped} konu dışı "
+            f"sayfa atlandı (%{100 * pages_skipped / pages_total:.0f})"
+        )
+    
+    return [questions or [] for questions in results]
+
+
 def ingest_source(
     source: SourceSpec, 
     raw_dir: pathlib.Path, 
-    interim_dir: pathlib.Path
+    interim_dir: pathlib.Path,
+    workers: int = 1
 ) -> List[dict]:
     """Bir veri kaynağından soruları çıkarır ve yapılandırır."""
     print(f"[bold cyan]Kaynak taranıyor:[/bold cyan] {source.name}")
-    candidate_files = list(raw_dir.glob(source.pattern))
-    if not candidate_files:
-        print(f"[yellow]Uyarı:[/yellow] {source.pattern} kalıbı için dosya bulunamadı.")
+    plan = plan_sources([source], raw_dir)
+    if not plan.files:
+        print(f"[yellow]Uyarı:[/yellow] {source.pattern} kalıbı için işlenecek dosya bulunamadı.")
         return []
 
+    tasks = plan.tasks(interim_dir)
     all_questions = []
-    
-    for file in candidate_files:
-        print(f"  • {file.name} ({source.type}) -> işleniyor...")
-        
-        if source.type == "pdf":
-            # Özel dosya: karekokcikmis.pdf için OCR destekli işleme
-            if "karekok" in file.name.lower() and source.metadata.get("use_ocr", False):
-                print(f"  [bold yellow]Özel işleme:[/bold yellow] OCR destekli işleme aktif")
-                output_file = interim_dir / f"{file.stem}_questions.json"
-                process_karekok_pdf(
-                    pdf_path=file,
-                    output_path=output_file,
-                    use_ocr=True,
-                    use_text_extraction=True
-                )
-                # JSON'dan soruları yükle
-                try:
-                    import json
-                    with output_file.open("r", encoding="utf-8") as f:
-                        questions = json.load(f)
-                    all_questions.extend(questions)
-                except Exception as e:
-                    print(f"[red]Hata:[/red] JSON yüklenemedi: {e}")
-            else:
-                # Normal PDF işleme
-                questions = extract_questions_from_pdf(file, filter_keywords=True)
-                # Her soruya metadata ekle
-                for q in questions:
-                    q["source_file"] = file.name
-                    q["source_type"] = "pdf"
-                    q["source_name"] = source.name
-                all_questions.extend(questions)
-        
-        elif source.type == "json":
-            # JSON dosyasından soruları oku
-            try:
-                with file.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        questions = data
-                    elif isinstance(data, dict) and "questions" in data:
-                        questions = data["questions"]
-                    else:
-                        questions = [data]
-                    
-                    for q in questions:
-                        q["source_file"] = file.name
-                        q["source_type"] = "json"
-                        q["source_name"] = source.name
-                    all_questions.extend(questions)
-            except Exception as e:
-                print(f"[red]Hata:[/red] {file.name} okunamadı: {e}")
-        
-        elif source.type == "image":
-            # Görsel dosyalarından OCR ile çıkar
-            question_data = extract_question_from_image(file)
-            if question_data:
-                question_data["source_file"] = file.name
-                question_data["source_type"] = "image"
-                question_data["source_name"] = source.name
-                all_questions.append(question_data)
+    for questions in run_tasks(tasks, workers=workers):
+        all_questions.extend(questions)
     
     return all_questions
 
 
-def run_ingest(cfg: IngestConfig) -> None:
-    """Ana ingest pipeline'ı çalıştırır."""
+def run_ingest(cfg: IngestConfig, force: bool = False, plan_only: bool = False) -> None:
+    """Ana ingest pipeline'ı çalıştırır (force=True ise manifest yok sayılır).
+    
+    Önce tüm kaynak kalıpları çözülüp her dosya tek bir kaynağa atanır ve plan
+    yazdırılır; plan_only=True ise hiçbir dosya işlenmeden burada durulur.
+    """
     ensure_dir(cfg.raw_data_dir)
     ensure_dir(cfg.interim_data_dir)
     ensure_dir(cfg.processed_data_dir)
+    set_page_cache_limit(cfg.page_cache_max_bytes)
 
-    all_questions = []
-    
-    # Her kaynaktan soruları çıkar
-    for source in cfg.sources:
-        questions = ingest_source(source, cfg.raw_data_dir, cfg.interim_data_dir)
-        all_questions.extend(questions)
-    
-    # Görsel klasöründen de soruları çıkar
+    sources = list(cfg.sources)
+    # Görsel klasörü: hiçbir kaynağın sahiplenmediği görseller için yedek kaynak.
+    # Eşit kalıplarda yapılandırmadaki kaynak kazanır (ör. görsel_sorular);
+    # source_name bu durumda "manual_images" olmaz
     images_dir = cfg.raw_data_dir / "images"
     if images_dir.exists():
-        print(f"[bold cyan]Görsel klasörü taranıyor:[/bold cyan] {images_dir}")
-        image_files = list(images_dir.glob("*.jpg")) + list(images_dir.glob("*.png")) + list(images_dir.glob("*.jpeg"))
-        for img_file in image_files:
-            question_data = extract_question_from_image(img_file)
-            if question_data:
-                question_data["source_file"] = img_file.name
-                question_data["source_type"] = "image"
-                question_data["source_name"] = "manual_images"
-                all_questions.append(question_data)
+        sources.append(
+            SourceSpec(name="manual_images", type="image", pattern="images/*.{jpg,png,jpeg}", metadata={})
+        )
+    
+    manifest = IngestManifest(cfg.interim_data_dir / "ingest_manifest.json")
+    if force:
+        manifest.entries = {}
+    
+    # Tüm kaynak kalıplarını çöz, her dosyayı tek kaynağa ata ve planı göster
+    print(f"[bold cyan]Kaynaklar taranıyor:[/bold cyan] {len(sources)} kaynak")
+    plan = plan_sources(sources, cfg.raw_data_dir, manifest=manifest)
+    print_plan(plan, workers=cfg.workers)
+    if plan_only:
+        return
+    
+    # Dosyaları (gerekirse paralel) işle ve sonuçları görev sırasıyla birleştir
+    tasks = plan.tasks(cfg.interim_data_dir)
+    all_questions = []
+    for questions in run_tasks(
+        tasks, workers=cfg.workers, manifest=manifest, page_cache_max_bytes=cfg.page_cache_max_bytes
+    ):
+        all_questions.extend(questions)
     
     # Soruları JSON olarak kaydet
     if all_questions:
@@ -163,6 +375,22 @@ def run_ingest(cfg: IngestConfig) -> None:
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="LGS kareköklü ifadeler veri ingest pipeline'ı")
     parser.add_argument("--config", required=True, help="YAML yapılandırma dosyasının yolu")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Paralel işçi süreç sayısı (varsayılan: yapılandırmadaki ingest.workers)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Manifest'i yok say ve tüm dosyaları yeniden işle"
+    )
+    parser.add_argument(
+        "--plan-only",
+        action="store_true",
+        help="Yalnızca iş planını (dosya-kaynak ataması ve tahmini maliyet) yazdır"
+    )
     return parser.parse_args()
 
 
@@ -170,7 +398,9 @@ def main() -> None:
     args = parse_args()
     config_dict = read_yaml(args.config)
     cfg = IngestConfig.from_dict(config_dict)
-    run_ingest(cfg)
+    if args.workers is not None:
+        cfg.workers = args.workers
+    run_ingest(cfg, force=args.force, plan_only=args.plan_only)
 
 
 if __name__ == "__main__":
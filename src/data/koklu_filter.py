@@ -3,79 +3,117 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+# Sinyaller (is_koklu_question'ın eski anahtar kelime/desen listelerinin sadeleştirilmiş hali):
+# "kareköklü", "kök içinde" vb. tüm kelimeler "kök" içerdiği ve tüm kök desenleri
+# "√" içerdiği için her grup tek bir alternasyona indirgenir.
+# keyword ve extraction küçük harfe çevrilmiş metinde, diğerleri özgün metinde aranır.
+SIGNAL_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "keyword": re.compile(r"kök|irrasyonel|√"),
+    "sqrt_symbol": re.compile(r"√"),
+    # Parantez içi ayırıcıyı (\x00) aşmamalı; bkz. _batch_search
+    "sqrt_pattern": re.compile(r"√\s*(?:\d|\([^)\x00]+\)|[a-zA-Z])|\d\s*√"),
+    "sqrt_operation": re.compile(r"√\s*\d+\s*(?:[+\-*/:])\s*√\s*\d"),
+    "extraction": re.compile(r"dışına|sadeleştir|en sade"),
+}
+LOWERCASE_SIGNALS = frozenset({"keyword", "extraction"})
+
+# Sınıflandırma için tüm sinyallerin birleşimi (küçük harfli metinde tek tarama)
+KOKLU_PATTERN = re.compile(r"kök|irrasyonel|√|dışına|sadeleştir|en sade")
+MIN_TEXT_LENGTH = 10
+
+_SEPARATOR = "\x00"
 
 
 def is_koklu_question(text: str) -> bool:
     """Bir metnin kareköklü ifadeler sorusu olup olmadığını kontrol eder."""
-    if not text or len(text.strip()) < 10:
+    if not text or len(text.strip()) < MIN_TEXT_LENGTH:
         return False
-    
-    text_lower = text.lower()
-    
-    # Anahtar kelimeler
-    keywords = [
-        "kök", "kareköklü", "karekök", "irrasyonel",
-        "√", "kök içinde", "kök dışına", "kök dışına çıkarma",
-        "kök içine alma", "kök içine", "kök dışına çıkarma"
-    ]
-    
-    # Anahtar kelime kontrolü
-    has_keyword = any(kw in text_lower for kw in keywords)
-    
-    # √ sembolü kontrolü (farklı Unicode varyasyonları)
-    sqrt_symbols = ["√", "√", "√", "√", "√"]
-    has_sqrt_symbol = any(symbol in text for symbol in sqrt_symbols)
-    
-    # Kök içinde sayı pattern'i (örn: √48, √12, √(a+b))
-    sqrt_patterns = [
-        r'√\s*\d+',  # √48, √12
-        r'√\s*\([^)]+\)',  # √(a+b)
-        r'√\s*[a-zA-Z]',  # √a, √x
-        r'\d+\s*√',  # 3√, 5√
-        r'√\s*\d+\s*[+\-*/]\s*√',  # √48 + √12
-    ]
-    
-    has_sqrt_pattern = any(re.search(pattern, text) for pattern in sqrt_patterns)
-    
-    # Kök işlemleri (toplama, çıkarma, çarpma, bölme)
-    sqrt_operations = [
-        r'√\s*\d+\s*[+\-]\s*√\s*\d+',  # √48 + √12
-        r'√\s*\d+\s*[*/]\s*√\s*\d+',  # √48 * √12
-        r'√\s*\d+\s*:\s*√\s*\d+',  # √48 : √12
-    ]
-    
-    has_sqrt_operation = any(re.search(pattern, text) for pattern in sqrt_operations)
-    
-    # Kök dışına çıkarma ifadeleri
-    extraction_keywords = [
-        "dışına çıkarma", "dışına çıkar", "dışına", 
-        "sadeleştir", "sadeleştirme", "en sade"
-    ]
-    has_extraction = any(kw in text_lower for kw in extraction_keywords)
-    
-    # En az bir kriter sağlanmalı
-    return (
-        has_keyword or 
-        has_sqrt_symbol or 
-        has_sqrt_pattern or 
-        has_sqrt_operation or 
-        has_extraction
+    return KOKLU_PATTERN.search(text.lower()) is not None
+
+
+def koklu_signals(text: str) -> Dict[str, bool]:
+    """Tek metin için sinyal dökümü (hangi kriter(ler) eşleşti)."""
+    text = text or ""
+    lowered = text.lower()
+    return {
+        name: pattern.search(lowered if name in LOWERCASE_SIGNALS else text) is not None
+        for name, pattern in SIGNAL_PATTERNS.items()
+    }
+
+
+def _normalize_texts(texts: Iterable[Optional[str]]) -> List[str]:
+    return [text if isinstance(text, str) else "" for text in texts]
+
+
+def _batch_search(pattern: "re.Pattern[str]", texts: List[str]) -> np.ndarray:
+    """Deseni tüm metinlerin ayırıcıyla birleştirilmiş hali üzerinde tek geçişte arar.
+
+    Desenler ayırıcı karakteri eşleştirmediği için (\s ve [^)\x00] dahil)
+    eşleşmeler metin sınırını aşamaz;
+    eşleşme konumları ofsetler üzerinden ikili aramayla metin indekslerine çevrilir.
+    """
+    hits = np.zeros(len(texts), dtype=bool)
+    if not texts:
+        return hits
+    lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+    ends = np.cumsum(lengths)
+    starts = [match.start() for match in pattern.finditer(_SEPARATOR.join(texts))]
+    if starts:
+        hits[np.searchsorted(ends, np.asarray(starts, dtype=np.int64), side="right")] = True
+    return hits
+
+
+def classify_many(texts: Iterable[Optional[str]]) -> np.ndarray:
+    """Metin listesini toplu sınıflandırır; is_koklu_question ile aynı sonucu bool dizisi olarak verir."""
+    texts = _normalize_texts(texts)
+    valid = np.fromiter(
+        (len(text.strip()) >= MIN_TEXT_LENGTH for text in texts), dtype=bool, count=len(texts)
     )
+    lowered = [text.lower() for text in texts]
+    return valid & _batch_search(KOKLU_PATTERN, lowered)
+
+
+def signal_breakdown(texts: Iterable[Optional[str]]) -> Dict[str, np.ndarray]:
+    """Toplu sinyal dökümü: her sinyal için metin başına bool dizisi."""
+    texts = _normalize_texts(texts)
+    lowered = [text.lower() for text in texts]
+    return {
+        name: _batch_search(pattern, lowered if name in LOWERCASE_SIGNALS else texts)
+        for name, pattern in SIGNAL_PATTERNS.items()
+    }
+
+
+def classify_series(series, signal: Optional[str] = None):
+    """pandas Series için vektörel yol (apply(lambda ...) yerine .str yöntemleri).
+
+    signal verilirse yalnızca o sinyal (uzunluk koşulu olmadan) döndürülür.
+    """
+    text = series.fillna("").astype(str)
+    if signal is not None:
+        target = text.str.lower() if signal in LOWERCASE_SIGNALS else text
+        return target.str.contains(SIGNAL_PATTERNS[signal], regex=True)
+    valid = text.str.strip().str.len() >= MIN_TEXT_LENGTH
+    return valid & text.str.lower().str.contains(KOKLU_PATTERN, regex=True)
 
 
 def filter_koklu_questions(questions: List[dict]) -> List[dict]:
     """Soru listesinden sadece kareköklü ifadeler sorularını filtreler."""
-    filtered = []
-    
+    texts = []
     for q in questions:
         # Soru metnini birleştir
         question_text = q.get("raw_text", "") or q.get("question_text", "")
         options_text = " ".join(q.get("options", []))
-        full_text = f"{question_text} {options_text}"
-        
+        texts.append(f"{question_text} {options_text}")
+    
+    filtered = []
+    for q, is_koklu in zip(questions, classify_many(texts)):
         # Kareköklü ifadeler kontrolü
-        if is_koklu_question(full_text):
+        if is_koklu:
             q["is_koklu"] = True
             q["filter_reason"] = "kareköklü_ifadeler"
             filtered.append(q)
@@ -0,0 +1,94 @@
+"""Artımlı ingest manifest'i: değişmeyen ham dosyaların yeniden işlenmesini önler."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from rich import print
+
+from src.data.page_cache import file_sha256
+from src.utils.io import read_json, write_json
+
+
+# Çıkarma mantığı değiştiğinde artırılmalı; eski çıktılar böylece geçersiz sayılır
+EXTRACTOR_VERSION = "8"
+
+DEFAULT_MANIFEST_PATH = Path("data/interim/ingest_manifest.json")
+
+
+def config_hash(config: Any) -> str:
+    """Bir yapılandırma nesnesinin (dict/list/dataclass alanları) kararlı hash'i."""
+    blob = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class IngestManifest:
+    """Her ham dosya için içerik hash'i, çıkarıcı sürümü ve yapılandırma hash'ini tutar.
+
+    Kayıtlar `<araç>:<kaynak>:<dosya adı>` anahtarıyla saklanır; böylece aynı
+    PDF farklı araçlarda ya da kaynaklarda farklı ayarlarla işlenebilir.
+    """
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                data = read_json(self.path)
+                self.entries = data.get("files", {}) if isinstance(data, dict) else {}
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Manifest okunamadı, sıfırdan başlanıyor: {e}")
+
+    @staticmethod
+    def make_key(tool: str, source: str, file: Path) -> str:
+        return f"{tool}:{source}:{Path(file).name}"
+
+    def is_fresh(
+        self,
+        key: str,
+        file: Path,
+        cfg_hash: str,
+        extractor_version: str = EXTRACTOR_VERSION
+    ) -> bool:
+        """Dosya, sürüm ve yapılandırma değişmediyse ve çıktı hâlâ duruyorsa True."""
+        entry = self.entries.get(key)
+        if not entry:
+            return False
+        output = entry.get("output")
+        if not output or not Path(output).exists():
+            return False
+        return (
+            entry.get("extractor_version") == extractor_version
+            and entry.get("config_hash") == cfg_hash
+            and entry.get("sha256") == file_sha256(file)
+        )
+
+    def output_path(self, key: str) -> Optional[Path]:
+        entry = self.entries.get(key)
+        return Path(entry["output"]) if entry and entry.get("output") else None
+
+    def record(
+        self,
+        key: str,
+        file: Path,
+        cfg_hash: str,
+        output: Path,
+        extractor_version: str = EXTRACTOR_VERSION,
+        **extra: Any
+    ) -> None:
+        self.entries[key] = {
+            "file": str(file),
+            "sha256": file_sha256(file),
+            "extractor_version": extractor_version,
+            "config_hash": cfg_hash,
+            "output": str(output),
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **extra,
+        }
+
+    def save(self) -> None:
+        write_json({"files": self.entries}, self.path)
@@ -0,0 +1,359 @@
+"""OCR arka uçları: uzun ömürlü tesseract işçileri, toplu CLI ve pytesseract yedeği."""
+
+from __future__ import annotations
+
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+from rich import print
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+
+ImageLike = Union[Image.Image, np.ndarray]
+# Kelime düzeyi OCR kaydı: text, conf (0-100, -1 = bilinmiyor), left, top, width, height, line
+WordData = Dict[str, Any]
+
+PAGE_SEPARATOR = "\f"
+
+_ENGINE_VERSIONS: Dict[str, str] = {}
+
+
+def _to_pil(image: ImageLike) -> Image.Image:
+    return Image.fromarray(image) if isinstance(image, np.ndarray) else image
+
+
+def parse_tesseract_config(config: str) -> Tuple[Optional[int], Dict[str, str]]:
+    """'--psm 6 -c a=b' biçimindeki yapılandırmayı (psm, değişkenler) olarak ayrıştırır."""
+    psm = None
+    variables: Dict[str, str] = {}
+    tokens = shlex.split(config or "")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "--psm" and i + 1 < len(tokens):
+            psm = int(tokens[i + 1])
+            i += 2
+        elif token == "-c" and i + 1 < len(tokens) and "=" in tokens[i + 1]:
+            key, value = tokens[i + 1].split("=", 1)
+            variables[key] = value
+            i += 2
+        else:
+            i += 1
+    return psm, variables
+
+
+class OcrBackend(ABC):
+    """Tüm OCR arka uçlarının ortak arayüzü."""
+
+    name = "base"
+    # Toplu çağrı tekil çağrılardan belirgin biçimde ucuzsa (ör. süreç başlatma maliyeti) True
+    prefers_batch = False
+
+    def engine_version(self) -> str:
+        """Alttaki tesseract sürümü (bilinmiyorsa "")."""
+        return ""
+
+    @property
+    def cache_tag(self) -> str:
+        """OCR önbellek anahtarına giren arka uç adı ve tesseract sürümü.
+
+        Tesseract yükseltmesi ya da arka uç değişikliği farklı metin
+        üretebileceği için eski sonuçların yeniden kullanılmasını önler.
+        """
+        # Sürüm arka uç adı başına bir kez sorulur (pytesseract'ta bir süreç çağrısıdır)
+        if self.name not in _ENGINE_VERSIONS:
+            try:
+                _ENGINE_VERSIONS[self.name] = self.engine_version()
+            except Exception:
+                _ENGINE_VERSIONS[self.name] = ""
+        return f"{self.name}:{_ENGINE_VERSIONS[self.name]}"
+
+    @abstractmethod
+    def image_to_string(self, image: ImageLike, lang: str = "tur", config: str = "") -> str:
+        """Görselin metnini döndürür."""
+
+    def image_to_string_batch(
+        self, images: List[ImageLike], lang: str = "tur", config: str = ""
+    ) -> List[str]:
+        return [self.image_to_string(image, lang=lang, config=config) for image in images]
+
+    @abstractmethod
+    def image_to_data(
+        self, image: ImageLike, lang: str = "tur", config: str = ""
+    ) -> Tuple[str, List[WordData]]:
+        """Metni ve kelime düzeyi güven/konum bilgisini döndürür."""
+
+
+def mean_confidence(words: List[WordData]) -> float:
+    """Geçerli (conf >= 0, boş olmayan) kelimelerin ortalama güveni; kelime yoksa 0."""
+    confs = [float(w["conf"]) for w in words if float(w.get("conf", -1)) >= 0 and str(w.get("text", "")).strip()]
+    return sum(confs) / len(confs) if confs else 0.0
+
+
+class PytesseractBackend(OcrBackend):
+    """Her görsel için yeni bir tesseract süreci başlatan klasik yol (yedek)."""
+
+    name = "pytesseract"
+
+    def engine_version(self) -> str:
+        return str(pytesseract.get_tesseract_version())
+
+    def image_to_string(self, image: ImageLike, lang: str = "tur", config: str = "") -> str:
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def image_to_data(
+        self, image: ImageLike, lang: str = "tur", config: str = ""
+    ) -> Tuple[str, List[WordData]]:
+        data = pytesseract.image_to_data(
+            image, lang=lang, config=config, output_type=pytesseract.Output.DICT
+        )
+        words: List[WordData] = []
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        for i, text in enumerate(data["text"]):
+            if not str(text).strip():
+                continue
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(line_key, []).append(str(text))
+            words.append({
+                "text": str(text),
+                "conf": float(data["conf"][i]),
+                "left": int(data["left"][i]),
+                "top": int(data["top"][i]),
+                "width": int(data["width"][i]),
+                "height": int(data["height"][i]),
+                "line": list(line_key),
+            })
+        # Satırlar tesseract'ın okuma sırasıyla (dict ekleme sırası) birleştirilir
+        text = "\n".join(" ".join(line_words) for line_words in lines.values())
+        return text, words
+
+
+class TesseractBatchBackend(PytesseractBackend):
+    """Toplu çağrılarda görselleri liste dosyasıyla tek bir tesseract sürecine verir.
+
+    traineddata ve süreç başlatma maliyeti her görsel yerine her toplu çağrıda
+    bir kez ödenir. Tekil çağrılar pytesseract yoluyla yapılır; bu yüzden
+    sayfa OCR'ı (iter_ocr_pages), şekil kırpıntıları (ocr_images) ve görsel
+    dosyaları (extract_texts_from_images) toplu çağrıya yönlendirilir.
+    """
+
+    name = "tesseract-batch"
+    prefers_batch = True
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, batch_size: int = 32):
+        self.tesseract_cmd = tesseract_cmd or shutil.which("tesseract") or "tesseract"
+        self.batch_size = batch_size
+
+    def _run_batch(self, images: List[ImageLike], lang: str, config: str) -> List[str]:
+        with tempfile.TemporaryDirectory(prefix="ocr_batch_") as tmp_dir:
+            tmp = Path(tmp_dir)
+            paths = []
+            for idx, image in enumerate(images):
+                path = tmp / f"{idx:05d}.png"
+                _to_pil(image).save(path, "PNG", compress_level=1)
+                paths.append(str(path))
+            list_file = tmp / "images.txt"
+            list_file.write_text("\n".join(paths) + "\n", encoding="utf-8")
+
+            cmd = [
+                self.tesseract_cmd, str(list_file), "stdout", "-l", lang,
+                "-c", "page_separator=" + PAGE_SEPARATOR,
+            ] + shlex.split(config or "")
+            result = subprocess.run(cmd, capture_output=True, check=True)
+
+        pages = result.stdout.decode("utf-8", errors="replace").split(PAGE_SEPARATOR)
+        if len(pages) < len(images):
+            raise RuntimeError(
+                f"tesseract {len(images)} görsel için {len(pages)} sayfa çıktısı verdi"
+            )
+        return pages[:len(images)]
+
+    def image_to_string_batch(
+        self, images: List[ImageLike], lang: str = "tur", config: str = ""
+    ) -> List[str]:
+        texts: List[str] = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start:start + self.batch_size]
+            try:
+                texts.extend(self._run_batch(chunk, lang, config))
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Toplu OCR başarısız, tek tek işleniyor: {e}")
+                texts.extend(super().image_to_string_batch(chunk, lang=lang, config=config))
+        return texts
+
+
+class TesserocrPoolBackend(OcrBackend):
+    """tesserocr (C-API) ile dil modeli bir kez yüklenmiş, uzun ömürlü işçi havuzu.
+
+    Her işçi bir PyTessBaseAPI örneğidir; çağıran iş parçacıkları havuzdan
+    bir işçi ödünç alır, görseli doğrudan bellekten verir ve geri bırakır.
+    """
+
+    name = "tesserocr-pool"
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or max(1, min(8, os.cpu_count() or 1))
+        self._pools: Dict[Tuple[str, str], "queue.Queue"] = {}
+        self._created: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def _create_worker(self, lang: str, config: str) -> "tesserocr.PyTessBaseAPI":
+        psm, variables = parse_tesseract_config(config)
+        kwargs = {"lang": lang}
+        if psm is not None:
+            kwargs["psm"] = psm
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        for key, value in variables.items():
+            api.SetVariable(key, value)
+        return api
+
+    def engine_version(self) -> str:
+        # "tesseract 5.3.0\n leptonica-1.82.0 ..." -> "5.3.0"
+        return tesserocr.tesseract_version().split("\n", 1)[0].replace("tesseract", "").strip()
+
+    @contextmanager
+    def _worker(self, lang: str, config: str) -> Iterator["tesserocr.PyTessBaseAPI"]:
+        key = (lang, config)
+        with self._lock:
+            pool = self._pools.setdefault(key, queue.Queue())
+            can_create = pool.empty() and self._created.get(key, 0) < self.size
+            if can_create:
+                self._created[key] = self._created.get(key, 0) + 1
+        if can_create:
+            try:
+                api = self._create_worker(lang, config)
+            except Exception:
+                with self._lock:
+                    self._created[key] -= 1
+                raise
+        else:
+            api = pool.get()
+        try:
+            yield api
+        finally:
+            pool.put(api)
+
+    def image_to_string(self, image: ImageLike, lang: str = "tur", config: str = "") -> str:
+        try:
+            with self._worker(lang, config) as api:
+                api.SetImage(_to_pil(image))
+                return api.GetUTF8Text()
+        except Exception as e:
+            if not PYTESSERACT_AVAILABLE:
+                raise
+            # Dil modeli yüklenemezse vb. durumlarda pytesseract ile devam et
+            print(f"[yellow]Uyarı:[/yellow] tesserocr hatası, pytesseract kullanılıyor: {e}")
+            return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    @staticmethod
+    def _iter_words(api: "tesserocr.PyTessBaseAPI") -> List[WordData]:
+        """Tanınmış sayfanın kelimelerini pytesseract image_to_data ile aynı alanlarla döndürür.
+
+        Satır anahtarı (blok, paragraf, satır) tesseract TSV çıktısındaki gibi
+        numaralanır: paragraf blok içinde, satır paragraf içinde 1'den başlar.
+        """
+        words: List[WordData] = []
+        iterator = api.GetIterator()
+        if iterator is None:
+            return words
+        level = tesserocr.RIL.WORD
+        block = par = line = 0
+        for item in tesserocr.iterate_level(iterator, level):
+            if item.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block, par, line = block + 1, 0, 0
+            if item.IsAtBeginningOf(tesserocr.RIL.PARA):
+                par, line = par + 1, 0
+            if item.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line += 1
+            text = item.GetUTF8Text(level)
+            if not text or not text.strip():
+                continue
+            box = item.BoundingBox(level)
+            if box is None:
+                continue
+            x1, y1, x2, y2 = box
+            words.append({
+                "text": text,
+                "conf": float(item.Confidence(level)),
+                "left": int(x1),
+                "top": int(y1),
+                "width": int(x2 - x1),
+                "height": int(y2 - y1),
+                "line": [block, par, line],
+            })
+        return words
+
+    def image_to_data(
+        self, image: ImageLike, lang: str = "tur", config: str = ""
+    ) -> Tuple[str, List[WordData]]:
+        try:
+            with self._worker(lang, config) as api:
+                api.SetImage(_to_pil(image))
+                api.Recognize()
+                return api.GetUTF8Text(), self._iter_words(api)
+        except Exception as e:
+            if not PYTESSERACT_AVAILABLE:
+                raise
+            print(f"[yellow]Uyarı:[/yellow] tesserocr hatası, pytesseract kullanılıyor: {e}")
+            return PytesseractBackend().image_to_data(image, lang=lang, config=config)
+
+
+_BACKEND: Optional[OcrBackend] = None
+
+
+def get_ocr_backend(prefer: Optional[str] = None) -> Optional[OcrBackend]:
+    """Kullanılabilir en hızlı OCR arka ucunu döndürür.
+
+    Öncelik: tesserocr işçi havuzu > toplu tesseract CLI > pytesseract.
+    `prefer` ya da OCR_BACKEND ortam değişkeniyle belirli bir arka uç seçilebilir.
+    """
+    global _BACKEND
+    prefer = prefer or os.environ.get("OCR_BACKEND")
+    if _BACKEND is not None and (prefer is None or _BACKEND.name == prefer):
+        return _BACKEND
+
+    if TESSEROCR_AVAILABLE and prefer in (None, TesserocrPoolBackend.name):
+        try:
+            _BACKEND = TesserocrPoolBackend()
+            return _BACKEND
+        except Exception as e:
+            print(f"[yellow]Uyarı:[/yellow] tesserocr başlatılamadı, pytesseract kullanılacak: {e}")
+
+    if PYTESSERACT_AVAILABLE:
+        if prefer == PytesseractBackend.name:
+            _BACKEND = PytesseractBackend()
+        elif shutil.which("tesseract"):
+            _BACKEND = TesseractBatchBackend()
+        else:
+            _BACKEND = PytesseractBackend()
+        return _BACKEND
+
+    return None
+
+
+def ocr_engine_tag() -> str:
+    """Etkin arka ucun önbellek etiketi (arka uç yoksa "none")."""
+    backend = get_ocr_backend()
+    return backend.cache_tag if backend is not None else "none"
@@ -0,0 +1,211 @@
+"""İçerik adresli, kalıcı OCR sonuç önbelleği (SQLite)."""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+from rich import print
+
+from src.data.ocr_backend import ocr_engine_tag
+
+
+DEFAULT_CACHE_PATH = Path("data/interim/cache/ocr_cache.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+# Son erişim zamanları bu kadar isabette bir toplu yazılır
+ACCESS_FLUSH_EVERY = 64
+# Diğer süreçlerin yazdıkları da hesaba girsin diye toplam boyut bu kadar yazımda bir yeniden okunur
+SIZE_RESYNC_EVERY = 256
+
+OcrResult = Tuple[str, Optional[List[Dict[str, Any]]]]
+
+
+def image_digest(image: Image.Image) -> str:
+    """Görselin piksel içeriğinden hash üretir (mod ve boyut dahil)."""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    """Ham dosya içeriğinden hash üretir."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_cache_key(content_hash: str, **params: Any) -> str:
+    """İçerik hash'i ile OCR parametrelerini (lang, psm, config, ön işleme) birleştirir.
+
+    Etkin arka ucun adı ve tesseract sürümü de anahtara eklenir; tesseract
+    yükseltmesinden ya da arka uç değişikliğinden sonra eski metin dönmez.
+    """
+    params.setdefault("engine", ocr_engine_tag())
+    param_blob = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{content_hash}|{param_blob}".encode("utf-8")).hexdigest()
+
+
+class OcrCache:
+    """OCR metnini ve kelime düzeyindeki verileri saklayan SQLite önbelleği.
+
+    Toplam boyut `max_bytes` değerini aşınca en uzun süredir kullanılmayan
+    kayıtlar silinir. Aynı bağlantı iş parçacıkları arasında kilitle paylaşılır.
+
+    Toplam boyut bellekte tutulur (her yazımda SUM sorgusu yapılmaz) ve
+    SIZE_RESYNC_EVERY yazımda bir veritabanından tazelenir. İsabetlerin son
+    erişim zamanları ACCESS_FLUSH_EVERY isabette bir, yazımdan önce ya da
+    flush() ile toplu yazılır; yazılmadan kalanlar yalnızca LRU sırasını etkiler.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                words TEXT,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ocr_last_access ON ocr_results(last_access)"
+        )
+        self._conn.commit()
+        self._accessed: Dict[str, float] = {}
+        self._puts_since_resync = 0
+        self._total_bytes = self._sum_sizes()
+
+    def get(self, key: str) -> Optional[OcrResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, words FROM ocr_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                self._flush_accesses()
+                self._conn.commit()
+        self.hits += 1
+        text, words = row
+        return text, json.loads(words) if words else None
+
+    def put(self, key: str, text: str, words: Optional[List[Dict[str, Any]]] = None) -> None:
+        words_blob = json.dumps(words, ensure_ascii=False) if words is not None else None
+        size = len(text.encode("utf-8")) + (len(words_blob.encode("utf-8")) if words_blob else 0)
+        now = time.time()
+        with self._lock:
+            self._flush_accesses()
+            old = self._conn.execute(
+                "SELECT size FROM ocr_results WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, text, words, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, words_blob, size, now, now),
+            )
+            self._conn.commit()
+            self._total_bytes += size - (old[0] if old else 0)
+            self._puts_since_resync += 1
+            if self._puts_since_resync >= SIZE_RESYNC_EVERY:
+                self._total_bytes = self._sum_sizes()
+                self._puts_since_resync = 0
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def flush(self) -> None:
+        """Bekleyen son erişim zamanlarını veritabanına yazar."""
+        with self._lock:
+            self._flush_accesses()
+            self._conn.commit()
+
+    def _flush_accesses(self) -> None:
+        """Bekleyen son erişim zamanlarını tek executemany ile yazar (kilit tutulurken çağrılır)."""
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE ocr_results SET last_access = ? WHERE key = ?",
+            [(ts, key) for key, ts in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _sum_sizes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Boyut sınırı aşıldıysa en eski erişilen kayıtları siler (kilit tutulurken çağrılır)."""
+        # Diğer süreçlerin silmeleri bellekteki toplamı şişirmiş olabilir
+        total = self._total_bytes = self._sum_sizes()
+        self._puts_since_resync = 0
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        removed = 0
+        keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM ocr_results ORDER BY last_access ASC"
+        ):
+            keys.append((key,))
+            removed += size
+            if removed >= excess:
+                break
+        self._conn.executemany("DELETE FROM ocr_results WHERE key = ?", keys)
+        self._conn.commit()
+        self._total_bytes -= removed
+
+    def get_or_compute(self, key: str, compute: Callable[[], OcrResult]) -> OcrResult:
+        """Önbellekte varsa döndürür, yoksa hesaplayıp saklar."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        text, words = compute()
+        # Boş sonuçlar (ör. geçici tesseract hatası) önbelleğe yazılmaz
+        if text:
+            self.put(key, text, words)
+        return text, words
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._flush_accesses()
+            self._conn.commit()
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+
+_DEFAULT_CACHE: Optional[OcrCache] = None
+
+
+def get_ocr_cache(path: Optional[Path] = None) -> Optional[OcrCache]:
+    """Süreç genelinde paylaşılan OCR önbelleğini döndürür (açılamazsa None)."""
+    global _DEFAULT_CACHE
+    # fork ile oluşan alt süreçler üst sürecin SQLite bağlantısını kullanmamalı
+    stale = _DEFAULT_CACHE is not None and _DEFAULT_CACHE._pid != os.getpid()
+    if _DEFAULT_CACHE is None or stale or (path is not None and Path(path) != _DEFAULT_CACHE.path):
+        try:
+            _DEFAULT_CACHE = OcrCache(path or DEFAULT_CACHE_PATH)
+            atexit.register(_DEFAULT_CACHE.flush)
+        except sqlite3.Error as e:
+            print(f"[yellow]Uyarı:[/yellow] OCR önbelleği açılamadı, önbelleksiz devam ediliyor: {e}")
+            return None
+    return _DEFAULT_CACHE
@@ -0,0 +1,227 @@
+"""OCR ön işleme: her iki OCR modülünün paylaştığı, tampon yeniden kullanan yapılandırılabilir hat.
+
+Zincir: gri -> (küçültme) -> gürültü azaltma -> CLAHE -> Otsu eşikleme.
+"adaptive" modunda gürültü/kontrast tahminine göre ucuz ya da pahalı yol seçilir,
+"classic" modunda her adım her zaman uygulanır.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# Tahmin edilen gürültü (standart sapma, gri seviye) eşikleri
+NOISE_SIGMA_LOW = 2.0    # altında: gürültü azaltma yok
+NOISE_SIGMA_HIGH = 6.0   # üstünde: fastNlMeansDenoising, arası: medyan filtre
+# p95 - p5 gri seviye farkı bu değerin altındaysa CLAHE uygulanır
+CONTRAST_LOW = 140.0
+
+# Gürültü kestirimi için Laplace benzeri çekirdek (Immerkaer), L2 normu 6
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+@dataclass
+class PreprocessParams:
+    """Zincir parametreleri (gri -> denoise -> CLAHE -> Otsu)."""
+
+    denoise_h: float = 10
+    template_window: int = 7
+    search_window: int = 21
+    clahe_clip: float = 3.0
+    clahe_tile: int = 8
+
+    def tag(self) -> str:
+        """Önbellek anahtarlarında kullanılacak kısa parametre etiketi."""
+        return (
+            f"denoise{self.denoise_h:g}-{self.template_window}-{self.search_window}"
+            f"_clahe{self.clahe_clip:g}-{self.clahe_tile}_otsu"
+        )
+
+
+@dataclass
+class ImageStats:
+    noise_sigma: float
+    contrast: float
+
+
+def estimate_image_stats(gray: np.ndarray, sample_pixels: int = 400_000) -> ImageStats:
+    """Seyreltilmiş kopya üzerinde gürültü ve kontrastı tahmin eder.
+
+    Yeniden örnekleme gürültüyü ortalayıp gizleyeceği için adım atlamalı
+    (en yakın komşu) seyreltme kullanılır; piksel başı gürültü istatistiği korunur.
+    """
+    step = max(1, int(np.sqrt(gray.size / sample_pixels)))
+    sample = np.ascontiguousarray(gray[::step, ::step])
+
+    response = cv2.filter2D(sample.astype(np.float32), -1, _NOISE_KERNEL)
+    # Medyan tabanlı kestirim: metin kenarları değil arka plan belirleyici olur
+    noise_sigma = float(1.4826 * np.median(np.abs(response)) / 6.0)
+
+    low, high = np.percentile(sample, (5, 95))
+    return ImageStats(noise_sigma=noise_sigma, contrast=float(high - low))
+
+
+ImageInput = Union[Image.Image, np.ndarray, str, Path]
+
+
+class PreprocessPipeline:
+    """Ön tahsisli tamponlarla çalışan ön işleme hattı.
+
+    Her iş parçacığı kendi tampon çiftini kullanır; tamponlar görsel boyutu
+    değişmedikçe yeniden tahsis edilmez ve OpenCV adımları `dst=` ile bu
+    tamponlara yazar. `run(..., copy=False)` dönüşü bir sonraki çağrıda
+    üzerine yazılacak tampondur; sonucu saklamak gerekiyorsa copy=True kullanılmalı.
+    """
+
+    STEPS = ("to_gray", "resize", "stats", "denoise", "clahe", "threshold")
+
+    def __init__(
+        self,
+        params: PreprocessParams = PreprocessParams(),
+        mode: str = "adaptive",
+        max_width: Optional[int] = None,
+    ):
+        if mode not in ("adaptive", "classic"):
+            raise ValueError(f"Bilinmeyen ön işleme modu: {mode}")
+        self.params = params
+        self.mode = mode
+        self.max_width = max_width
+        self._local = threading.local()
+        self._timing_lock = threading.Lock()
+        self.timings: Dict[str, float] = {step: 0.0 for step in self.STEPS}
+        self.calls = 0
+        self.last_path = ""
+
+    @property
+    def version(self) -> str:
+        """Önbellek anahtarı için hat sürümü (mod ve parametreler dahil)."""
+        width = f"_w{self.max_width}" if self.max_width else ""
+        return f"{self.mode}1_{self.params.tag()}{width}"
+
+    # --- tamponlar -------------------------------------------------------
+
+    def _clahe(self):
+        clahe = getattr(self._local, "clahe", None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(
+                clipLimit=self.params.clahe_clip,
+                tileGridSize=(self.params.clahe_tile, self.params.clahe_tile),
+            )
+            self._local.clahe = clahe
+        return clahe
+
+    def _buffers(self, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or buffers[0].shape != shape:
+            buffers = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8))
+            self._local.buffers = buffers
+        return buffers
+
+    def _record(self, step: str, start: float) -> float:
+        now = time.perf_counter()
+        with self._timing_lock:
+            self.timings[step] += now - start
+        return now
+
+    # --- adımlar ---------------------------------------------------------
+
+    @staticmethod
+    def to_gray(image: ImageInput) -> np.ndarray:
+        """PIL/numpy/dosya yolunu doğrudan tek kanallı gri görsele çevirir.
+
+        PIL görseller RGB -> BGR ara kopyası olmadan `convert("L")` ile,
+        dosyalar `IMREAD_GRAYSCALE` ile okunur.
+        """
+        if isinstance(image, (str, Path)):
+            gray = cv2.imread(str(image), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                raise ValueError(f"Görsel yüklenemedi: {image}")
+            return gray
+        if isinstance(image, Image.Image):
+            return np.asarray(image if image.mode == "L" else image.convert("L"))
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def run(self, image: ImageInput, copy: bool = False) -> np.ndarray:
+        """Hattı çalıştırır ve eşiklenmiş görseli döndürür."""
+        start = time.perf_counter()
+        gray = self.to_gray(image)
+        start = self._record("to_gray", start)
+
+        # `current` salt okunur girdi olabilir; her adım diğer tampona yazar
+        if self.max_width and gray.shape[1] > self.max_width:
+            scale = self.max_width / gray.shape[1]
+            size = (self.max_width, max(1, int(round(gray.shape[0] * scale))))
+            buf_a, buf_b = self._buffers((size[1], size[0]))
+            cv2.resize(gray, size, dst=buf_a, interpolation=cv2.INTER_AREA)
+            current = buf_a
+            start = self._record("resize", start)
+        else:
+            buf_a, buf_b = self._buffers(gray.shape)
+            current = gray
+
+        path = []
+        if self.mode == "classic":
+            denoise, median, apply_clahe = True, False, True
+        else:
+            stats = estimate_image_stats(current)
+            start = self._record("stats", start)
+            denoise = stats.noise_sigma >= NOISE_SIGMA_HIGH
+            median = not denoise and stats.noise_sigma >= NOISE_SIGMA_LOW
+            apply_clahe = stats.contrast < CONTRAST_LOW
+
+        if denoise:
+            out = buf_b if current is buf_a else buf_a
+            cv2.fastNlMeansDenoising(
+                current, out, self.params.denoise_h, self.params.template_window, self.params.search_window
+            )
+            current = out
+            path.append("nlmeans")
+        elif median:
+            out = buf_b if current is buf_a else buf_a
+            cv2.medianBlur(current, 3, dst=out)
+            current = out
+            path.append("median")
+        start = self._record("denoise", start)
+
+        if apply_clahe:
+            out = buf_b if current is buf_a else buf_a
+            self._clahe().apply(current, dst=out)
+            current = out
+            path.append("clahe")
+        start = self._record("clahe", start)
+
+        out = buf_b if current is buf_a else buf_a
+        cv2.threshold(current, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=out)
+        path.append("otsu")
+        self._record("threshold", start)
+
+        with self._timing_lock:
+            self.calls += 1
+        self.last_path = "+".join(path)
+        return out.copy() if copy else out
+
+    def run_pil(self, image: ImageInput, copy: bool = False) -> Image.Image:
+        """Hattı çalıştırıp sonucu PIL görseli olarak döndürür."""
+        return Image.fromarray(self.run(image, copy=copy))
+
+    def timing_report(self) -> Dict[str, float]:
+        """Adım başına ortalama süre (ms)."""
+        calls = max(self.calls, 1)
+        with self._timing_lock:
+            return {step: 1000 * total / calls for step, total in self.timings.items()}
+
+    def reset_timings(self) -> None:
+        with self._timing_lock:
+            self.timings = {step: 0.0 for step in self.STEPS}
+            self.calls = 0
+
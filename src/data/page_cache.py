@@ -0,0 +1,357 @@
+"""PDF sayfa görselleri için paylaşılan önbellek (her sayfa bir kez render edilir)."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+from rich import print
+
+try:
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    PDF2IMAGE_AVAILABLE = False
+
+
+DEFAULT_CACHE_DIR = Path("data/interim/cache/page_images")
+# Disk katmanının bayt bütçesi; aşılınca en uzun süredir kullanılmayan sayfalar silinir (0 = disk katmanı kapalı)
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024  # 1 GB
+# Tahliye bütçenin bu oranına kadar siler; her yeni sayfada yeniden tahliye yapılmasın diye
+EVICT_TARGET_RATIO = 0.9
+
+# (yol, mtime, boyut) -> sha256; aynı süreçte PDF'i tekrar tekrar hash'lememek için
+_HASH_MEMO: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Dosyanın içerik hash'ini hesaplar (süreç içinde memoize edilir)."""
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _HASH_MEMO:
+        return _HASH_MEMO[memo_key]
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+
+    _HASH_MEMO[memo_key] = digest.hexdigest()
+    return _HASH_MEMO[memo_key]
+
+
+def get_page_count(pdf_path: Path) -> int:
+    """PDF'in sayfa sayısını render etmeden döndürür."""
+    if not PDF2IMAGE_AVAILABLE:
+        return 0
+    try:
+        return int(pdfinfo_from_path(str(pdf_path)).get("Pages", 0))
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] Sayfa sayısı okunamadı: {e}")
+        return 0
+
+
+def contiguous_ranges(page_numbers: Iterable[int]) -> List[Tuple[int, int]]:
+    """Sıralı sayfa numaralarını ardışık (ilk, son) aralıklarına böler: [1, 2, 3, 7] -> [(1, 3), (7, 7)]."""
+    ranges: List[Tuple[int, int]] = []
+    for page_num in page_numbers:
+        if ranges and ranges[-1][1] == page_num - 1:
+            ranges[-1] = (ranges[-1][0], page_num)
+        else:
+            ranges.append((page_num, page_num))
+    return ranges
+
+
+class PageImageCache:
+    """PDF hash'i, sayfa numarası ve DPI ile anahtarlanan sayfa görseli önbelleği.
+
+    İki katmanlıdır: son kullanılan sayfalar bellekte (LRU), sayfalar ayrıca
+    diskte PNG olarak tutulur. Böylece bir sayfa aynı çalıştırmada en fazla
+    bir kez, diskteki önbellek korunduğu sürece de yalnızca ilk seferde render edilir.
+
+    Disk katmanı `max_disk_bytes` ile sınırlıdır: bütçe aşılınca dosya mtime'ına
+    göre (okunan sayfaların mtime'ı yenilenir) en eski sayfalar silinir.
+    max_disk_bytes=0 disk katmanını kapatır.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_memory_pages: int = 8,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_pages = max_memory_pages
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[Tuple[str, int, int], Image.Image]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Disk kullanımı ilk yazımda bir kez taranır, sonra yazılan boyutlarla güncellenir
+        self._disk_bytes: Optional[int] = None
+
+    def _disk_path(self, pdf_hash: str, page_num: int, dpi: int) -> Path:
+        return self.cache_dir / pdf_hash[:2] / pdf_hash / f"p{page_num:04d}_{dpi}dpi.png"
+
+    def _remember(self, key: Tuple[str, int, int], image: Image.Image) -> None:
+        self._memory[key] = image
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_pages:
+            self._memory.popitem(last=False)
+
+    def _lookup(
+        self, pdf_hash: str, page_num: int, dpi: int, remember: bool = True
+    ) -> Optional[Image.Image]:
+        key = (pdf_hash, page_num, dpi)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        if not self.max_disk_bytes:
+            return None
+        disk_path = self._disk_path(pdf_hash, page_num, dpi)
+        if disk_path.exists():
+            try:
+                with Image.open(disk_path) as img:
+                    img.load()
+                    image = img.copy()
+                # Tahliye sırası için son kullanım zamanı
+                os.utime(disk_path)
+                if remember:
+                    self._remember(key, image)
+                return image
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Önbellek dosyası okunamadı ({disk_path.name}): {e}")
+        return None
+
+    def _store(
+        self, pdf_hash: str, page_num: int, dpi: int, image: Image.Image, remember: bool = True
+    ) -> None:
+        if self.max_disk_bytes:
+            disk_path = self._disk_path(pdf_hash, page_num, dpi)
+            try:
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = disk_path.with_suffix(f".{os.getpid()}.tmp")
+                image.save(tmp_path, "PNG", compress_level=1)
+                tmp_path.replace(disk_path)
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._scan_disk_bytes()
+                else:
+                    self._disk_bytes += disk_path.stat().st_size
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict()
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Sayfa önbelleğe yazılamadı: {e}")
+        if remember:
+            self._remember((pdf_hash, page_num, dpi), image)
+
+    def _disk_files(self) -> List[Tuple[float, int, Path]]:
+        files = []
+        for path in self.cache_dir.glob("*/*/*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                # Başka bir süreç bu arada silmiş olabilir
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._disk_files())
+
+    def _evict(self) -> None:
+        """Disk bütçesi aşıldıysa en eski kullanılan sayfaları siler.
+
+        Dizin yeniden taranır; böylece aynı klasörü paylaşan diğer süreçlerin
+        yazdıkları da hesaba katılır.
+        """
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_disk_bytes * EVICT_TARGET_RATIO)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+    def _render_range(
+        self, pdf_path: Path, pdf_hash: str, first_page: int, last_page: int, dpi: int
+    ) -> List[Image.Image]:
+        images = convert_from_path(
+            str(pdf_path), dpi=dpi, first_page=first_page, last_page=last_page
+        )
+        for offset, image in enumerate(images):
+            self._store(pdf_hash, first_page + offset, dpi, image)
+        return images
+
+    def get_page(self, pdf_path: Path, page_num: int, dpi: int = 400) -> Optional[Image.Image]:
+        """Tek bir sayfanın görselini döndürür (gerekirse render eder)."""
+        pdf_hash = file_sha256(pdf_path)
+        image = self._lookup(pdf_hash, page_num, dpi)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        if not PDF2IMAGE_AVAILABLE:
+            return None
+
+        self.misses += 1
+        try:
+            images = self._render_range(pdf_path, pdf_hash, page_num, page_num, dpi)
+            return images[0] if images else None
+        except Exception as e:
+            print(f"[yellow]Uyarı:[/yellow] Sayfa {page_num} görsel çıkarılamadı: {e}")
+            return None
+
+    def get_pages(self, pdf_path: Path, dpi: int = 300) -> List[Image.Image]:
+        """Tüm sayfaların görsellerini döndürür; eksik sayfalar ardışık aralıklarla render edilir."""
+        pdf_hash = file_sha256(pdf_path)
+        page_count = get_page_count(pdf_path)
+        if page_count == 0:
+            if not PDF2IMAGE_AVAILABLE:
+                return []
+            # Sayfa sayısı okunamadıysa tüm belgeyi bir kerede render et
+            images = convert_from_path(str(pdf_path), dpi=dpi)
+            for page_num, image in enumerate(images, 1):
+                self.misses += 1
+                self._store(pdf_hash, page_num, dpi, image)
+            return images
+
+        pages: Dict[int, Image.Image] = {}
+        missing: List[int] = []
+        for page_num in range(1, page_count + 1):
+            image = self._lookup(pdf_hash, page_num, dpi)
+            if image is None:
+                missing.append(page_num)
+            else:
+                self.hits += 1
+                pages[page_num] = image
+
+        # Eksik sayfaları ardışık aralıklar halinde tek çağrıda render et
+        for first_page, last_page in contiguous_ranges(missing):
+            self.misses += last_page - first_page + 1
+            rendered = self._render_range(pdf_path, pdf_hash, first_page, last_page, dpi)
+            for offset, image in enumerate(rendered):
+                pages[first_page + offset] = image
+
+        return [pages[num] for num in sorted(pages)]
+
+    def iter_pages(
+        self,
+        pdf_path: Path,
+        dpi: int = 300,
+        window: int = 2,
+        pages: Optional[Iterable[int]] = None
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """Sayfaları (sayfa_no, görsel) olarak tek tek üretir; bellek kullanımı sabit kalır.
+        
+        Eksik sayfalar `window` sayfalık pencerelerde, her ardışık aralık için
+        bir pdftoppm çağrısıyla geçici bir klasöre yazdırılır ve diskten birer
+        birer okunur. Sayfa sayısı okunamazsa tüm belge aynı yolla render
+        edilir. Üretilen görseller LRU belleğe alınmaz; tüketici bıraktığında
+        serbest kalır.
+        """
+        pdf_hash = file_sha256(pdf_path)
+        if pages is None:
+            page_count = get_page_count(pdf_path)
+            if page_count == 0:
+                # Sayfa sayısı okunamadıysa get_pages gibi tüm belgeyi bir kerede render et
+                yield from self._iter_whole_document(pdf_path, pdf_hash, dpi)
+                return
+            page_numbers = list(range(1, page_count + 1))
+        else:
+            page_numbers = sorted(set(pages))
+
+        window = max(1, window)
+        for start in range(0, len(page_numbers), window):
+            chunk = page_numbers[start:start + window]
+            cached = {num: self._lookup(pdf_hash, num, dpi, remember=False) for num in chunk}
+            missing = [num for num, image in cached.items() if image is None]
+            self.hits += len(chunk) - len(missing)
+
+            rendered_paths: Dict[int, Path] = {}
+            with tempfile.TemporaryDirectory(prefix="pages_") as tmp_dir:
+                if missing and PDF2IMAGE_AVAILABLE:
+                    self.misses += len(missing)
+                    # Aradaki önbellekli sayfalar yeniden render edilmesin diye her ardışık aralık ayrı çağrılır
+                    for first_page, last_page in contiguous_ranges(missing):
+                        try:
+                            paths = convert_from_path(
+                                str(pdf_path),
+                                dpi=dpi,
+                                first_page=first_page,
+                                last_page=last_page,
+                                output_folder=tmp_dir,
+                                fmt="png",
+                                paths_only=True,
+                            )
+                            for offset, path in enumerate(sorted(paths)):
+                                rendered_paths[first_page + offset] = Path(path)
+                        except Exception as e:
+                            print(f"[yellow]Uyarı:[/yellow] Sayfa {first_page}-{last_page} görsel çıkarılamadı: {e}")
+
+                for num in chunk:
+                    image = cached.pop(num)
+                    if image is None and num in rendered_paths:
+                        image = self._load_rendered(rendered_paths[num])
+                        self._store(pdf_hash, num, dpi, image, remember=False)
+                    if image is not None:
+                        yield num, image
+                    # Tüketici bıraktığında görsel serbest kalsın
+                    image = None
+
+    @staticmethod
+    def _load_rendered(path: Path) -> Image.Image:
+        with Image.open(path) as img:
+            img.load()
+            return img.copy()
+
+    def _iter_whole_document(
+        self, pdf_path: Path, pdf_hash: str, dpi: int
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """Sayfa sayısı bilinmezken belgeyi geçici klasöre render edip sayfaları birer birer üretir."""
+        if not PDF2IMAGE_AVAILABLE:
+            return
+        with tempfile.TemporaryDirectory(prefix="pages_") as tmp_dir:
+            try:
+                paths = convert_from_path(
+                    str(pdf_path), dpi=dpi, output_folder=tmp_dir, fmt="png", paths_only=True
+                )
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] {Path(pdf_path).name} görsellere çevrilemedi: {e}")
+                return
+            for page_num, path in enumerate(sorted(paths), 1):
+                self.misses += 1
+                image = self._load_rendered(Path(path))
+                self._store(pdf_hash, page_num, dpi, image, remember=False)
+                yield page_num, image
+                image = None
+
+
+_DEFAULT_CACHE: Optional[PageImageCache] = None
+_MAX_DISK_BYTES = DEFAULT_MAX_DISK_BYTES
+
+
+def set_page_cache_limit(max_disk_bytes: int) -> None:
+    """Paylaşılan önbelleğin disk bütçesini ayarlar (ör. ingest.page_cache_max_mb)."""
+    global _MAX_DISK_BYTES
+    _MAX_DISK_BYTES = max(0, int(max_disk_bytes))
+    if _DEFAULT_CACHE is not None:
+        _DEFAULT_CACHE.max_disk_bytes = _MAX_DISK_BYTES
+
+
+def get_page_cache(cache_dir: Optional[Path] = None) -> PageImageCache:
+    """Süreç genelinde paylaşılan sayfa önbelleğini döndürür."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None or (cache_dir is not None and Path(cache_dir) != _DEFAULT_CACHE.cache_dir):
+        _DEFAULT_CACHE = PageImageCache(cache_dir or DEFAULT_CACHE_DIR, max_disk_bytes=_MAX_DISK_BYTES)
+    return _DEFAULT_CACHE
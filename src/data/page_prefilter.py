@@ -0,0 +1,66 @@
+"""Konu ilgisi ön filtresi: tam kitapçıklarda yalnızca kareköklü ifadeler sayfalarını işlemek için."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+from rich import print
+
+from src.data.koklu_filter import KOKLU_PATTERN
+from src.data.page_triage import CID_PATTERN, MAX_CID_DENSITY, MIN_TEXT_LENGTH
+from src.data.parsed_pdf import get_parsed_pdf
+
+
+def page_is_relevant(text: str) -> bool:
+    """Sayfa metni kareköklü ifadeler konusuna ait görünüyor mu?
+
+    Soru filtresiyle (koklu_filter.KOKLU_PATTERN) aynı tanım kullanılır: ön
+    filtre, soru filtresinin kabul edebileceği hiçbir sayfayı atlamamalıdır.
+    """
+    return KOKLU_PATTERN.search(text.lower()) is not None
+
+
+def page_is_undecidable(text: str) -> bool:
+    """Metin katmanı boş ya da cid kodlarıyla bozuksa sayfa hakkında karar verilemez."""
+    if len(text.strip()) < MIN_TEXT_LENGTH:
+        return True
+    return len(CID_PATTERN.findall(text)) / max(len(text.split()), 1) > MAX_CID_DENSITY
+
+
+@dataclass
+class PrefilterResult:
+    """Ön filtre sonucu: işlenecek sayfalar ve atlanan sayfa sayısı."""
+
+    total_pages: int
+    kept_pages: List[int] = field(default_factory=list)
+
+    @property
+    def skipped_pages(self) -> int:
+        return self.total_pages - len(self.kept_pages)
+
+
+def prefilter_pages(pdf_path: Path, follow_pages: int = 1) -> PrefilterResult:
+    """Metin katmanında kareköklü ifadeler sinyali taşıyan sayfaları seçer.
+
+    Sinyaller sayfa metninin tamamına bir kez uygulanır; segmentasyon, render
+    ve OCR yalnızca tutulan sayfalarda yapılır. Sayfa sonunda başlayıp sonraki
+    sayfada devam eden sorular için ilgili sayfayı izleyen `follow_pages` sayfa
+    da tutulur. Metin katmanı boş ya da bozuk sayfalar atlanmaz.
+    """
+    try:
+        pdf = get_parsed_pdf(pdf_path)
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] Ön filtre uygulanamadı ({pdf_path.name}), tüm sayfalar işlenecek: {e}")
+        return PrefilterResult(total_pages=0)
+
+    kept = set()
+    for page in pdf.pages:
+        page.decode_cids()
+        text = page.extract_text() or ""
+        if page_is_undecidable(text) or page_is_relevant(text):
+            kept.update(range(page.page_number, page.page_number + follow_pages + 1))
+
+    total = len(pdf.pages)
+    return PrefilterResult(total_pages=total, kept_pages=sorted(p for p in kept if p <= total))
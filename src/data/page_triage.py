@@ -0,0 +1,138 @@
+"""Metin katmanı kalite triyajı: OCR'a yalnızca gerçekten ihtiyaç duyan sayfaları gönder."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from rich import print
+
+from src.data.parsed_pdf import get_parsed_pdf
+from src.data.question_segmenter import QUESTION_HEADER
+
+
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+OPTION_PATTERN = re.compile(r"(?:^|\s)([A-D])[\.\)]", re.MULTILINE)
+
+# Eşikler: cid oranı kelime başına, metin uzunluğu karakter cinsinden
+MAX_CID_DENSITY = 0.02
+MIN_TEXT_LENGTH = 50
+MIN_OPTIONS_PER_QUESTION = 2
+
+# Yalnızca bu gerekçelerle işaretlenen sayfalarda metin katmanı kullanılabilir;
+# tüm sayfa yerine şekil bölgelerini OCR'lamak yeterlidir. eksik_secenek burada
+# değildir: eksik seçenekler (options_ocr) yalnızca tüm sayfa OCR'ıyla kurtarılır.
+REGION_OCR_REASONS = frozenset({"gorsel_var"})
+
+
+@dataclass
+class PageTriage:
+    """Bir sayfanın metin katmanı değerlendirmesi."""
+
+    page: int
+    text_length: int = 0
+    cid_density: float = 0.0
+    question_numbers: List[int] = field(default_factory=list)
+    option_count: int = 0
+    image_count: int = 0
+    continuity_ok: bool = True
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def needs_ocr(self) -> bool:
+        return bool(self.reasons)
+
+
+def score_page_text(
+    page_num: int,
+    text: str,
+    image_count: int = 0,
+    previous_question: Optional[int] = None
+) -> PageTriage:
+    """Sayfa metnini puanlar; OCR gerektiren her durum için bir gerekçe ekler."""
+    text = text or ""
+    triage = PageTriage(page=page_num, text_length=len(text.strip()), image_count=image_count)
+
+    words = text.split()
+    cid_count = len(CID_PATTERN.findall(text))
+    triage.cid_density = cid_count / max(len(words), 1)
+    triage.question_numbers = [int(num) for num in QUESTION_HEADER.findall(text)]
+    triage.option_count = len(OPTION_PATTERN.findall(text))
+
+    if triage.text_length < MIN_TEXT_LENGTH:
+        triage.reasons.append("metin_katmani_bos")
+    if triage.cid_density > MAX_CID_DENSITY:
+        triage.reasons.append("cid_kodlari")
+    if image_count > 0:
+        # Şekilli sorular: şekil içindeki metin yalnızca OCR ile okunabilir
+        triage.reasons.append("gorsel_var")
+    if triage.question_numbers and triage.option_count < MIN_OPTIONS_PER_QUESTION * len(triage.question_numbers):
+        triage.reasons.append("eksik_secenek")
+
+    # Soru numaraları önceki sayfadan kesintisiz devam etmeli
+    if triage.question_numbers and previous_question is not None:
+        first = triage.question_numbers[0]
+        if first != previous_question + 1:
+            triage.continuity_ok = False
+            triage.reasons.append("numara_sureksizligi")
+
+    return triage
+
+
+def triage_pdf(pdf_path: Path) -> List[PageTriage]:
+    """PDF'in her sayfası için metin katmanı triyajı yapar."""
+    results: List[PageTriage] = []
+    previous_question: Optional[int] = None
+
+    try:
+        pdf = get_parsed_pdf(pdf_path)
+        for page_num, page in enumerate(pdf.pages, 1):
+            # Tabloyla çözülebilen cid'ler OCR gerekçesi sayılmaz
+            page.decode_cids()
+            text = page.extract_text() or ""
+            triage = score_page_text(
+                page_num, text, image_count=len(page.images), previous_question=previous_question
+            )
+            if triage.question_numbers:
+                previous_question = triage.question_numbers[-1]
+            results.append(triage)
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] Triyaj yapılamadı ({pdf_path.name}), tüm sayfalar OCR'lanacak: {e}")
+        return []
+
+    return results
+
+
+def pages_needing_ocr(triage: List[PageTriage]) -> List[int]:
+    """OCR'lanması gereken sayfa numaraları."""
+    return [t.page for t in triage if t.needs_ocr]
+
+
+def split_ocr_pages(triage: List[PageTriage]) -> Tuple[List[int], List[int]]:
+    """OCR gereken sayfaları (tüm sayfa OCR, yalnızca şekil bölgesi OCR) olarak ayırır."""
+    full_pages: List[int] = []
+    region_pages: List[int] = []
+    for t in triage:
+        if not t.needs_ocr:
+            continue
+        if set(t.reasons) <= REGION_OCR_REASONS:
+            region_pages.append(t.page)
+        else:
+            full_pages.append(t.page)
+    return full_pages, region_pages
+
+
+def summarize_triage(triage: List[PageTriage]) -> None:
+    """Triyaj sonucunu yazdırır."""
+    if not triage:
+        return
+    skipped = sum(1 for t in triage if not t.needs_ocr)
+    print(f"   [dim]Triyaj:[/dim] {len(triage)} sayfadan {skipped} sayfa temiz metin katmanı nedeniyle OCR'sız")
+    reason_counts = {}
+    for t in triage:
+        for reason in t.reasons:
+            reason_counts[reason] = reason_counts.get(reason, 0) + 1
+    for reason, count in sorted(reason_counts.items(), key=lambda x: -x[1]):
+        print(f"   [dim]  • {reason}: {count} sayfa[/dim]")
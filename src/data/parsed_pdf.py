@@ -0,0 +1,209 @@
+"""Tek seferlik pdfplumber ayrıştırması: tüm çıkarıcıların paylaştığı sayfa modeli.
+
+pdfminer düzen analizi (page.chars/images/rects) her PDF için bir kez yapılır;
+metin ve kelimeler gerektiğinde karakterlerden pdfplumber yardımcılarıyla
+türetilir. Model diske JSON olarak yazılır ve aynı süreçte bellekte tutulur.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pdfplumber
+from pdfplumber.utils import extract_text as chars_to_text
+from pdfplumber.utils import extract_words as chars_to_words
+from rich import print
+
+from src.data.cid_decoder import CidTable, decode_page_chars
+from src.data.page_cache import file_sha256
+
+
+# Saklanan alanlar ya da ayrıştırma mantığı değişirse artırılmalı
+PARSER_VERSION = "1"
+
+DEFAULT_PARSED_DIR = Path("data/interim/cache/parsed_pdf")
+
+_BOX_KEYS = ("x0", "top", "x1", "bottom", "width", "height")
+
+
+def _plain_object(obj: Dict[str, Any], keys: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """pdfplumber nesnesinden JSON'a yazılabilir alanları (sayı, metin, sayı demeti) alır."""
+    plain = {}
+    for key, value in obj.items():
+        if keys is not None and key not in keys:
+            continue
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            plain[key] = value
+        elif isinstance(value, (tuple, list)) and all(isinstance(v, (int, float)) for v in value):
+            plain[key] = tuple(value)
+    return plain
+
+
+@dataclass
+class ParsedPage:
+    """Ayrıştırılmış tek sayfa; pdfplumber sayfasının kullandığımız alt kümesiyle uyumlu.
+
+    `extract_text()`, `extract_words()`, `chars`, `images`, `rects`, `width`
+    ve `height` pdfplumber ile aynı biçimdedir; bu yüzden sayfa alan mevcut
+    fonksiyonlar (find_question_regions, detect_figure_regions vb.) değişmeden çalışır.
+    """
+
+    page_number: int
+    width: float
+    height: float
+    chars: List[Dict[str, Any]] = field(default_factory=list)
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    rects: List[Dict[str, Any]] = field(default_factory=list)
+    _text: Optional[str] = field(default=None, repr=False)
+    _words: Dict[Tuple, List[Dict[str, Any]]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_pdfplumber(cls, page, page_number: int) -> "ParsedPage":
+        return cls(
+            page_number=page_number,
+            width=float(page.width),
+            height=float(page.height),
+            chars=[_plain_object(c) for c in page.chars],
+            images=[_plain_object(img, _BOX_KEYS + ("name",)) for img in page.images],
+            rects=[_plain_object(rect, _BOX_KEYS) for rect in page.rects],
+        )
+
+    def extract_text(self) -> str:
+        if self._text is None:
+            self._text = chars_to_text(self.chars) if self.chars else ""
+        return self._text
+
+    def extract_words(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        key = tuple(sorted(kwargs.items()))
+        if key not in self._words:
+            self._words[key] = chars_to_words(self.chars, **kwargs) if self.chars else []
+        return self._words[key]
+
+    def decode_cids(self, table: Optional[CidTable] = None) -> int:
+        """Öğrenilmiş tabloyla cid karakterlerini çözer; türetilmiş metni geçersiz kılar."""
+        decoded = decode_page_chars(self, table)
+        if decoded:
+            self._text = None
+            self._words.clear()
+        return decoded
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page_number": self.page_number,
+            "width": self.width,
+            "height": self.height,
+            "chars": self.chars,
+            "images": self.images,
+            "rects": self.rects,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedPage":
+        # JSON listeleri pdfplumber'ın beklediği demetlere geri çevrilir
+        return cls(
+            page_number=data["page_number"],
+            width=data["width"],
+            height=data["height"],
+            chars=[_plain_object(c) for c in data.get("chars", [])],
+            images=data.get("images", []),
+            rects=data.get("rects", []),
+        )
+
+
+@dataclass
+class ParsedPdf:
+    """Bir PDF'in tüm sayfalarının ayrıştırılmış modeli."""
+
+    path: Path
+    sha256: str
+    pages: List[ParsedPage] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, pdf_path: Path) -> "ParsedPdf":
+        """pdfplumber ile ayrıştırır (pahalı adım; normalde get_parsed_pdf kullanılmalı)."""
+        with pdfplumber.open(pdf_path) as pdf:
+            pages = [ParsedPage.from_pdfplumber(page, num) for num, page in enumerate(pdf.pages, 1)]
+        return cls(path=Path(pdf_path), sha256=file_sha256(pdf_path), pages=pages)
+
+    def page(self, page_number: int) -> ParsedPage:
+        return self.pages[page_number - 1]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blob = {
+            "parser_version": PARSER_VERSION,
+            "sha256": self.sha256,
+            "pages": [page.to_dict() for page in self.pages],
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(blob, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, pdf_path: Path) -> Optional["ParsedPdf"]:
+        """Diskteki modeli yükler; sürüm ya da hash uyuşmazsa None döner."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            blob = json.load(f)
+        if blob.get("parser_version") != PARSER_VERSION or blob.get("sha256") != file_sha256(pdf_path):
+            return None
+        pages = [ParsedPage.from_dict(page) for page in blob.get("pages", [])]
+        return cls(path=Path(pdf_path), sha256=blob["sha256"], pages=pages)
+
+
+class ParsedPdfStore:
+    """PDF içerik hash'iyle anahtarlanan iki katmanlı (bellek LRU + disk) model deposu."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_PARSED_DIR, max_memory_pdfs: int = 4):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_pdfs = max_memory_pdfs
+        self._memory: "OrderedDict[str, ParsedPdf]" = OrderedDict()
+        self.parses = 0
+
+    def _disk_path(self, pdf_hash: str) -> Path:
+        return self.cache_dir / f"{pdf_hash}.json.gz"
+
+    def get(self, pdf_path: Path) -> ParsedPdf:
+        pdf_hash = file_sha256(pdf_path)
+        if pdf_hash in self._memory:
+            self._memory.move_to_end(pdf_hash)
+            return self._memory[pdf_hash]
+
+        parsed = None
+        disk_path = self._disk_path(pdf_hash)
+        if disk_path.exists():
+            try:
+                parsed = ParsedPdf.load(disk_path, pdf_path)
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Ayrıştırma önbelleği okunamadı ({pdf_path.name}): {e}")
+
+        if parsed is None:
+            parsed = ParsedPdf.parse(pdf_path)
+            self.parses += 1
+            try:
+                # cid çözümü bellekteki kopyaya uygulanır; diske ham karakterler yazılır
+                parsed.save(disk_path)
+            except Exception as e:
+                print(f"[yellow]Uyarı:[/yellow] Ayrıştırma önbelleğe yazılamadı: {e}")
+
+        self._memory[pdf_hash] = parsed
+        while len(self._memory) > self.max_memory_pdfs:
+            self._memory.popitem(last=False)
+        return parsed
+
+
+_DEFAULT_STORE: Optional[ParsedPdfStore] = None
+
+
+def get_parsed_pdf(pdf_path: Path) -> ParsedPdf:
+    """PDF'in paylaşılan ayrıştırılmış modelini döndürür (gerekirse bir kez ayrıştırır)."""
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        _DEFAULT_STORE = ParsedPdfStore()
+    return _DEFAULT_STORE.get(Path(pdf_path))
@@ -2,37 +2,53 @@
 
 from __future__ import annotations
 
-import re
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from PIL import Image
 from rich import print
 
-try:
-    from pdf2image import convert_from_path
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
+from src.data.ocr_backend import (
+    PYTESSERACT_AVAILABLE,
+    TESSEROCR_AVAILABLE,
+    get_ocr_backend,
+    mean_confidence,
+)
+from src.data.ocr_cache import get_ocr_cache, image_digest, make_cache_key
+from src.data.page_cache import PDF2IMAGE_AVAILABLE, get_page_cache
+from src.data.question_segmenter import iter_page_lines, iter_questions
+
+if not PDF2IMAGE_AVAILABLE:
     print("[yellow]Uyarı:[/yellow] pdf2image bulunamadı. Görsel çıkarma devre dışı.")
 
+TESSERACT_AVAILABLE = PYTESSERACT_AVAILABLE or TESSEROCR_AVAILABLE
+if not TESSERACT_AVAILABLE:
+    print("[yellow]Uyarı:[/yellow] pytesseract bulunamadı. OCR devre dışı.")
+
 try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
+    from src.data.ocr_preprocess import PreprocessParams, PreprocessPipeline
+    # Sayfa görselleri için paylaşılan ön işleme hattı (tamponlar iş parçacığı başına)
+    PAGE_PIPELINE: Optional[PreprocessPipeline] = PreprocessPipeline(PreprocessParams(clahe_clip=3.0))
 except ImportError:
-    TESSERACT_AVAILABLE = False
-    print("[yellow]Uyarı:[/yellow] pytesseract bulunamadı. OCR devre dışı.")
+    PAGE_PIPELINE = None
 
-from src.data.koklu_filter import is_koklu_question
+OCR_CONFIG = "--psm 6 -c preserve_interword_spaces=1"
+# Ön işleme parametreleri değişirse önbellek anahtarı da değişsin diye sürüm etiketi
+PREPROCESS_VERSION = PAGE_PIPELINE.version if PAGE_PIPELINE else "none"
+# Kelime kayıtlarının alanları değişirse artırılmalı (2: tesserocr kelimeleri de kutu/satır içerir)
+OCR_DATA_VERSION = 2
 
 
 def extract_pages_as_images(pdf_path: Path, dpi: int = 300) -> List[Image.Image]:
-    """PDF sayfalarını görsel olarak çıkarır."""
+    """PDF sayfalarını görsel olarak çıkarır (paylaşılan sayfa önbelleği üzerinden)."""
     if not PDF2IMAGE_AVAILABLE:
         return []
     
     try:
-        images = convert_from_path(str(pdf_path), dpi=dpi)
+        images = get_page_cache().get_pages(pdf_path, dpi=dpi)
         print(f"[green]✓[/green] {len(images)} sayfa görsel olarak çıkarıldı")
         return images
     except Exception as e:
@@ -40,46 +56,59 @@ def extract_pages_as_images(pdf_path: Path, dpi: int = 300) -> List[Image.Image]
         return []
 
 
-def preprocess_image_for_ocr(image: Image.Image) -> Image.Image:
-    """Görseli OCR için ön işleme (kalite artırma)."""
-    try:
-        import cv2
-        import numpy as np
-        
-        # PIL Image'ı numpy array'e çevir
-        img_array = np.array(image.convert('RGB'))
-        img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-        
-        # Gri tonlamaya çevir
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # Gürültü azaltma (daha agresif)
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-        
-        # Kontrast artırma (CLAHE)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(denoised)
-        
-        # Eşikleme (thresholding) - daha iyi okuma için
-        _, thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Numpy array'i PIL Image'a çevir
-        processed = Image.fromarray(thresh)
-        return processed
-    except ImportError:
+def iter_pages_as_images(
+    pdf_path: Path,
+    dpi: int = 300,
+    window: int = 2,
+    pages: Optional[Iterable[int]] = None
+) -> Iterator[Tuple[int, Image.Image]]:
+    """PDF sayfalarını (sayfa_no, görsel) olarak tek tek üretir.
+    
+    extract_pages_as_images'tan farklı olarak tüm belgeyi belleğe almaz;
+    en fazla `window` sayfa aynı anda render edilir.
+    """
+    if not PDF2IMAGE_AVAILABLE:
+        return
+    yield from get_page_cache().iter_pages(pdf_path, dpi=dpi, window=window, pages=pages)
+
+
+def preprocess_image_for_ocr(
+    image: Image.Image,
+    mode: str = "adaptive",
+    reuse_buffers: bool = True
+) -> Image.Image:
+    """Görseli OCR için ön işleme (kalite artırma).
+    
+    mode="adaptive": gürültü/kontrast tahminine göre ucuz ya da pahalı yol seçilir.
+    mode="classic": her zaman tam zincir (denoise -> CLAHE -> Otsu).
+    reuse_buffers=True iken dönen görsel hattın tamponunu paylaşır ve aynı iş
+    parçacığındaki bir sonraki çağrıda değişir; sonuç saklanacaksa False verilmeli.
+    """
+    if PAGE_PIPELINE is None:
         # cv2 yoksa orijinal görseli döndür
         return image
+    
+    try:
+        pipeline = PAGE_PIPELINE
+        if mode != pipeline.mode:
+            pipeline = PreprocessPipeline(pipeline.params, mode=mode)
+        return pipeline.run_pil(image, copy=not reuse_buffers)
     except Exception as e:
         print(f"[yellow]Uyarı:[/yellow] Görsel preprocessing hatası: {e}")
         return image
 
 
-def ocr_page_image(image: Image.Image, lang: str = "tur", use_preprocessing: bool = True) -> str:
-    """Bir sayfa görselinden OCR ile metin çıkarır."""
+def ocr_page_image(
+    image: Image.Image,
+    lang: str = "tur",
+    use_preprocessing: bool = True,
+    use_cache: bool = True
+) -> str:
+    """Bir sayfa görselinden OCR ile metin çıkarır (sonuçlar içerik hash'iyle önbelleklenir)."""
     if not TESSERACT_AVAILABLE:
         return ""
     
-    try:
+    def _run_ocr():
         # Görsel preprocessing (kalite artırma)
         if use_preprocessing:
             processed_image = preprocess_image_for_ocr(image)
@@ -89,39 +118,304 @@ def ocr_page_image(image: Image.Image, lang: str = "tur", use_preprocessing: boo
         # OCR ile metin çıkar (Türkçe + İngilizce - matematik sembolleri için)
         # PSM 6: Tek blok metin (soru formatı için ideal)
         # Daha yüksek kalite için whitelist kaldırıldı (tüm karakterleri tanıyabilir)
-        text = pytesseract.image_to_string(
+        text = get_ocr_backend().image_to_string(
             processed_image,
             lang=lang,
-            config="--psm 6 -c preserve_interword_spaces=1"
+            config=OCR_CONFIG
         )
-        return text.strip()
+        return text.strip(), None
+    
+    try:
+        cache = get_ocr_cache() if use_cache else None
+        if cache is None:
+            return _run_ocr()[0]
+        
+        key = make_cache_key(
+            image_digest(image),
+            lang=lang,
+            config=OCR_CONFIG,
+            preprocess=PREPROCESS_VERSION if use_preprocessing else None
+        )
+        text, _ = cache.get_or_compute(key, _run_ocr)
+        return text
     except Exception as e:
         print(f"[yellow]Uyarı:[/yellow] OCR hatası: {e}")
         return ""
 
 
-def extract_questions_with_ocr(pdf_path: Path, filter_koklu: bool = True) -> List[dict]:
-    """PDF'den sayfaları görsel olarak çıkarıp OCR ile soruları bulur."""
+def ocr_page_data(
+    image: Image.Image,
+    lang: str = "tur",
+    use_preprocessing: bool = True,
+    use_cache: bool = True
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """OCR metnini kelime düzeyi güven değerleriyle birlikte döndürür (önbellekli)."""
+    if not TESSERACT_AVAILABLE:
+        return "", []
+    
+    def _run_ocr():
+        processed_image = preprocess_image_for_ocr(image) if use_preprocessing else image
+        text, words = get_ocr_backend().image_to_data(processed_image, lang=lang, config=OCR_CONFIG)
+        return text.strip(), words
+    
+    try:
+        cache = get_ocr_cache() if use_cache else None
+        if cache is None:
+            return _run_ocr()
+        
+        key = make_cache_key(
+            image_digest(image),
+            lang=lang,
+            config=OCR_CONFIG,
+            preprocess=PREPROCESS_VERSION if use_preprocessing else None,
+            output="data",
+            data_version=OCR_DATA_VERSION
+        )
+        text, words = cache.get_or_compute(key, _run_ocr)
+        return text, words or []
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] OCR hatası: {e}")
+        return "", []
+
+
+def ocr_images(
+    images: List[Image.Image],
+    lang: str = "tur",
+    use_preprocessing: bool = True,
+    config: str = OCR_CONFIG,
+    use_cache: bool = True
+) -> List[str]:
+    """Çok sayıda küçük görseli (ör. soru kırpıntıları) toplu OCR'lar.
+    
+    Önbellekte olmayan görseller tek bir arka uç çağrısında işlenir; böylece
+    tesseract başlatma maliyeti görsel başına değil toplu çağrı başına ödenir.
+    """
+    if not TESSERACT_AVAILABLE or not images:
+        return [""] * len(images)
+    
+    preprocess_tag = PREPROCESS_VERSION if use_preprocessing else None
+    cache = get_ocr_cache() if use_cache else None
+    texts: List[Optional[str]] = [None] * len(images)
+    keys: List[Optional[str]] = [None] * len(images)
+    
+    if cache is not None:
+        for idx, image in enumerate(images):
+            keys[idx] = make_cache_key(image_digest(image), lang=lang, config=config, preprocess=preprocess_tag)
+            cached = cache.get(keys[idx])
+            if cached is not None:
+                texts[idx] = cached[0]
+    
+    missing = [idx for idx, text in enumerate(texts) if text is None]
+    if missing:
+        batch = [
+            preprocess_image_for_ocr(images[idx], reuse_buffers=False) if use_preprocessing else images[idx]
+            for idx in missing
+        ]
+        try:
+            results = get_ocr_backend().image_to_string_batch(batch, lang=lang, config=config)
+        except Exception as e:
+            print(f"[yellow]Uyarı:[/yellow] Toplu OCR hatası: {e}")
+            results = [""] * len(missing)
+        for idx, text in zip(missing, results):
+            texts[idx] = text.strip()
+            if cache is not None and texts[idx]:
+                cache.put(keys[idx], texts[idx])
+    
+    return [text or "" for text in texts]
+
+
+# Toplu çağrıyı tercih eden arka uçlarda tek tesseract sürecine verilen sayfa sayısı.
+# Küçük tutulur: işçi başına 2 sayfa, bellek sınırını (2 * işçi sayfa) ve paralelliği korur.
+PAGE_BATCH_SIZE = 2
+
+
+def default_ocr_workers() -> int:
+    """Varsayılan OCR işçi sayısı (çekirdek sayısı, en fazla 8)."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _chunked(pages: Iterable[Tuple[int, Image.Image]], size: int) -> Iterator[List[Tuple[int, Image.Image]]]:
+    chunk: List[Tuple[int, Image.Image]] = []
+    for item in pages:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ocr_pages(
+    pages: Iterable[Tuple[int, Image.Image]],
+    lang: str = "tur",
+    max_workers: Optional[int] = None,
+    use_preprocessing: bool = True,
+    ocr_fn: Optional[Callable[..., Any]] = None,
+    use_cache: bool = True
+) -> Iterator[Tuple[int, Any]]:
+    """(sayfa_no, görsel) akışını paralel OCR'lar; (sayfa_no, sonuç) sırayla üretilir.
+    
+    Sonuç varsayılan olarak ocr_page_image metnidir; ocr_fn ile (ör. ocr_page_data)
+    değiştirilebilir; use_cache=False OCR önbelleğini atlar. Arka uç toplu
+    çağrıyı tercih ediyorsa (tesseract CLI) ve ocr_fn verilmemişse sayfalar
+    PAGE_BATCH_SIZE'lık gruplarla ocr_images'a verilir, böylece her sayfa için
+    ayrı tesseract süreci başlatılmaz. tesseract ayrı süreçte, cv2 ise GIL
+    dışında çalıştığı için iş parçacığı havuzu yeterlidir. Aynı anda en fazla
+    2 * işçi sayfa bellekte tutulur, böylece tembel sayfa üreticisiyle birlikte
+    bellek kullanımı sabit kalır.
+    """
+    workers = max_workers or default_ocr_workers()
+    backend = get_ocr_backend() if ocr_fn is None and TESSERACT_AVAILABLE else None
+    batched = backend is not None and backend.prefers_batch
+    ocr_fn = ocr_fn or ocr_page_image
+    
+    def _ocr(chunk: List[Tuple[int, Image.Image]]) -> List[Any]:
+        if batched:
+            results = ocr_images(
+                [image for _, image in chunk],
+                lang=lang,
+                use_preprocessing=use_preprocessing,
+                use_cache=use_cache
+            )
+        else:
+            results = [
+                ocr_fn(image, lang=lang, use_preprocessing=use_preprocessing, use_cache=use_cache)
+                for _, image in chunk
+            ]
+        print(f"[dim]Sayfa {chunk[-1][0]} OCR işlendi[/dim]", end="\r")
+        return results
+    
+    chunk_size = PAGE_BATCH_SIZE if batched else 1
+    chunks = _chunked(pages, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from zip((page_num for page_num, _ in chunk), _ocr(chunk))
+        return
+    
+    # Bellekteki sayfa sayısı sınırı grup boyutundan bağımsız kalsın
+    max_in_flight = max(1, 2 * workers // chunk_size)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(([page_num for page_num, _ in chunk], executor.submit(_ocr, chunk)))
+            # Bekleyen iş sayısını sınırla; en eski grup bitince sırayla üret
+            if len(in_flight) >= max_in_flight:
+                done_nums, future = in_flight.popleft()
+                yield from zip(done_nums, future.result())
+        while in_flight:
+            done_nums, future = in_flight.popleft()
+            yield from zip(done_nums, future.result())
+
+
+def ocr_pages(
+    page_images: List[Image.Image],
+    lang: str = "tur",
+    max_workers: Optional[int] = None,
+    use_preprocessing: bool = True,
+    use_cache: bool = True
+) -> List[str]:
+    """Sayfa görsellerini paralel OCR ile işler; sonuçlar sayfa sırasıyla döner."""
+    return [
+        text for _, text in iter_ocr_pages(
+            enumerate(page_images, 1),
+            lang=lang,
+            max_workers=max_workers,
+            use_preprocessing=use_preprocessing,
+            use_cache=use_cache
+        )
+    ]
+
+
+# Uyarlamalı DPI modunda düşük çözünürlüklü geçişin kabul eşiği (tesseract güveni, 0-100)
+MIN_PAGE_CONFIDENCE = 70.0
+
+
+def page_structure_ok(text: str, page_num: int) -> bool:
+    """OCR metnindeki her sorunun en az iki seçeneği okunabilmiş mi?"""
+    questions = find_questions_in_text(text, page_num)
+    return all(len(q.get("options", [])) >= 2 for q in questions)
+
+
+def iter_ocr_texts_adaptive_dpi(
+    pdf_path: Path,
+    pages: Optional[List[int]] = None,
+    low_dpi: int = 200,
+    high_dpi: int = 400,
+    min_confidence: float = MIN_PAGE_CONFIDENCE,
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[int, str]]:
+    """Sayfaları önce düşük DPI'da OCR'lar, yalnızca zayıf sayfaları yüksek DPI'da tekrarlar.
+    
+    Piksel sayısı DPI'ın karesiyle büyüdüğü için 200 DPI geçişi 400 DPI'a göre
+    yaklaşık 4 kat ucuzdur. Ortalama kelime güveni eşiğin altında kalan ya da
+    soru yapısı (seçenekler) bozuk okunan sayfalar yeniden render edilir.
+    (sayfa_no, metin) sayfa sırasıyla üretilir.
+    """
+    texts: Dict[int, str] = {}
+    retry: List[int] = []
+    
+    low_stream = iter_pages_as_images(pdf_path, dpi=low_dpi, pages=pages)
+    for page_num, (text, words) in iter_ocr_pages(
+        low_stream, lang="tur", max_workers=max_workers, ocr_fn=ocr_page_data
+    ):
+        confidence = mean_confidence(words)
+        if text and confidence >= min_confidence and page_structure_ok(text, page_num):
+            texts[page_num] = text
+        else:
+            retry.append(page_num)
+    
+    print(
+        f"\n[dim]Uyarlamalı DPI:[/dim] {len(texts)} sayfa {low_dpi} DPI'da kabul edildi, "
+        f"{len(retry)} sayfa {high_dpi} DPI'da yeniden OCR'lanıyor"
+    )
+    
+    if retry:
+        high_stream = iter_pages_as_images(pdf_path, dpi=high_dpi, pages=retry)
+        for page_num, text in iter_ocr_pages(high_stream, lang="tur", max_workers=max_workers):
+            texts[page_num] = text
+    
+    for page_num in sorted(texts):
+        yield page_num, texts[page_num]
+
+
+def extract_questions_with_ocr(
+    pdf_path: Path,
+    filter_koklu: bool = True,
+    max_workers: Optional[int] = None,
+    pages: Optional[List[int]] = None,
+    adaptive_dpi: bool = False,
+    min_confidence: float = MIN_PAGE_CONFIDENCE
+) -> List[dict]:
+    """PDF'den sayfaları görsel olarak çıkarıp OCR ile soruları bulur.
+    
+    max_workers aynı anda OCR'lanacak sayfa sayısını sınırlar (varsayılan: çekirdek sayısı).
+    pages verilirse yalnızca o sayfalar OCR'lanır (None = tüm sayfalar).
+    adaptive_dpi=True iken sayfalar önce 200 DPI'da okunur, güveni min_confidence
+    altında kalanlar 400 DPI'da tekrar OCR'lanır.
+    """
     print(f"[bold cyan]PDF OCR işleme:[/bold cyan] {pdf_path.name}")
     
     if not PDF2IMAGE_AVAILABLE or not TESSERACT_AVAILABLE:
         print("[red]Hata:[/red] pdf2image veya pytesseract yüklü değil.")
         return []
     
-    # Sayfaları görsel olarak çıkar (daha yüksek DPI = daha iyi kalite)
-    page_images = extract_pages_as_images(pdf_path, dpi=400)
-    if not page_images:
+    if pages is not None and not pages:
+        print("[dim]OCR gerektiren sayfa yok.[/dim]")
         return []
     
     all_questions = []
     
-    # Her sayfayı OCR ile işle
-    for page_num, image in enumerate(page_images, 1):
-        print(f"[dim]Sayfa {page_num}/{len(page_images)} OCR işleniyor...[/dim]", end="\r")
-        
-        # OCR ile metin çıkar
-        page_text = ocr_page_image(image, lang="tur")
-        
+    # Sayfalar tembel olarak render edilir (daha yüksek DPI = daha iyi kalite),
+    # paralel OCR'lanır ve sayfa sırasıyla tüketilir
+    if adaptive_dpi:
+        page_texts = iter_ocr_texts_adaptive_dpi(
+            pdf_path, pages=pages, min_confidence=min_confidence, max_workers=max_workers
+        )
+    else:
+        page_stream = iter_pages_as_images(pdf_path, dpi=400, pages=pages)
+        page_texts = iter_ocr_pages(page_stream, lang="tur", max_workers=max_workers)
+    
+    for page_num, page_text in page_texts:
         if not page_text:
             continue
         
@@ -158,55 +452,6 @@ def extract_questions_with_ocr(pdf_path: Path, filter_koklu: bool = True) -> Lis
 
 
 def find_questions_in_text(text: str, page_num: int) -> List[dict]:
-    """Metin içinde soruları bulur."""
-    questions = []
-    lines = text.split("\n")
-    
-    current_question = None
-    question_number = None
-    
-    for line in lines:
-        line_stripped = line.strip()
-        if not line_stripped or len(line_stripped) < 3:
-            continue
-        
-        # Soru numarası ara (örn: "15.", "15)", "15-", "Soru 15")
-        question_match = re.match(r"^\s*(\d+)[\.\)\-\s]+", line_stripped)
-        if question_match:
-            # Önceki soruyu kaydet
-            if current_question and current_question.get("raw_text"):
-                questions.append(current_question)
-            
-            # Yeni soru başlat
-            question_number = question_match.group(1)
-            question_text = re.sub(r"^\s*\d+[\.\)\-\s]+", "", line_stripped)
-            current_question = {
-                "question_number": question_number,
-                "raw_text": question_text,
-                "options": [],
-                "full_text": question_text,
-                "page": page_num
-            }
-            continue
-        
-        # Seçenekleri bul (A), B), C), D))
-        option_match = re.match(r"^\s*([A-D])[\.\)]\s*(.+)", line_stripped)
-        if option_match and current_question:
-            option_letter = option_match.group(1)
-            option_text = option_match.group(2)
-            current_question["options"].append(f"{option_letter}) {option_text}")
-            current_question["full_text"] += " " + line_stripped
-            continue
-        
-        # Soru metnini genişlet
-        if current_question:
-            if not re.match(r"^\s*[A-D][\.\)]", line_stripped):
-                current_question["raw_text"] += " " + line_stripped
-                current_question["full_text"] += " " + line_stripped
-    
-    # Son soruyu ekle
-    if current_question and current_question.get("raw_text"):
-        questions.append(current_question)
-    
-    return questions
+    """Metin içinde soruları bulur (3 karakterden kısa OCR gürültüsü satırları atlanır)."""
+    return list(iter_questions(iter_page_lines(text, page_num), min_line_length=3))
 
@@ -7,6 +7,7 @@ import pathlib
 import pandas as pd
 from rich import print
 
+from src.data.koklu_filter import classify_series
 from src.utils.io import ensure_dir
 
 
@@ -117,10 +118,7 @@ def preprocess(input_path: pathlib.Path, output_path: pathlib.Path) -> None:
     
     # Kareköklü ifadeler filtresi (opsiyonel - eğer zaten filtrelenmişse atla)
     if "has_keyword" not in df.columns:
-        keywords = ["kök", "√", "kareköklü", "irrasyonel", "karekök"]
-        df["has_keyword"] = df["question_text"].str.lower().apply(
-            lambda x: any(kw in x for kw in keywords)
-        )
+        df["has_keyword"] = classify_series(df["question_text"], signal="keyword")
         # Filtreleme yapılabilir ama şimdilik tümünü tutuyoruz
     
     print(f"[green]Temizlenmiş kayıt sayısı:[/green] {len(df)}")
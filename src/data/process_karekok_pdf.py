@@ -4,13 +4,17 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Optional
 
 from rich import print
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from src.data.pdf_extractor import extract_questions_from_pdf
+from src.data.cid_decoder import CID_TOKEN, decode_cid_text, learn_cid_table
+from src.data.figure_regions import extract_figure_texts, figure_texts_by_question
 from src.data.pdf_ocr_extractor import extract_questions_with_ocr
 from src.data.koklu_filter import is_koklu_question
+from src.data.page_triage import pages_needing_ocr, split_ocr_pages, summarize_triage, triage_pdf
 from src.utils.io import ensure_dir, write_json
 
 
@@ -19,16 +23,35 @@ def process_karekok_pdf(
     output_path: Path,
     use_ocr: bool = True,
     use_text_extraction: bool = True,
-    strict_filter: bool = False
+    strict_filter: bool = False,
+    ocr_workers: Optional[int] = None,
+    triage_pages: bool = True,
+    adaptive_dpi: bool = False,
+    figure_regions: bool = True
 ) -> None:
-    """karekokcikmis.pdf dosyasını işler (hibrit yaklaşım: metin + OCR)."""
+    """karekokcikmis.pdf dosyasını işler (hibrit yaklaşım: metin + OCR).
+    
+    triage_pages=True iken OCR yalnızca metin katmanı yetersiz sayfalarda çalışır.
+    adaptive_dpi=True iken sayfalar önce düşük DPI'da OCR'lanır (bkz. extract_questions_with_ocr).
+    figure_regions=True iken metin katmanı sağlam ama şekil içeren sayfalarda
+    tüm sayfa yerine yalnızca şekil/tablo bölgeleri OCR'lanır ve sonuç
+    metin katmanındaki soruya eklenir.
+    """
     print(f"[bold cyan]Kareköklü İfadeler PDF İşleniyor:[/bold cyan] {pdf_path.name}\n")
     
     if not pdf_path.exists():
         print(f"[red]Hata:[/red] Dosya bulunamadı: {pdf_path}")
         return
     
+    if use_text_extraction and use_ocr:
+        # Bozuk fontların cid tablosunu birkaç sayfadan öğren; metin çıkarma
+        # ve triyaj bu tabloyla çözülebilen sayfaları OCR'a göndermez
+        learn_cid_table(pdf_path)
+    
     all_questions = []
+    ocr_page_total = 0
+    ocr_pages_skipped = 0
+    region_page_count = 0
     
     # Yöntem 1: Metin çıkarma (hızlı, ama şekilli soruları kaçırabilir)
     if use_text_extraction:
@@ -105,7 +128,63 @@ def process_karekok_pdf(
     # Yöntem 2: OCR (yavaş ama şekilli soruları yakalar)
     if use_ocr:
         print("[bold]2. OCR Yöntemi (Şekilli Sorular):[/bold]")
-        ocr_questions = extract_questions_with_ocr(pdf_path, filter_koklu=True)
+        ocr_page_list = None
+        region_page_list = []
+        if triage_pages and use_text_extraction:
+            # Metin katmanı temiz sayfaları OCR'dan muaf tut
+            triage = triage_pdf(pdf_path)
+            if triage:
+                summarize_triage(triage)
+                if figure_regions:
+                    ocr_page_list, region_page_list = split_ocr_pages(triage)
+                else:
+                    ocr_page_list = pages_needing_ocr(triage)
+                ocr_page_total = len(triage)
+                ocr_pages_skipped = ocr_page_total - len(ocr_page_list) - len(region_page_list)
+                region_page_count = len(region_page_list)
+        
+        if region_page_list:
+            # Şekil bölgelerinin OCR metnini aynı sayfadaki aynı numaralı metin katmanı sorusuna ekle
+            regions = extract_figure_texts(pdf_path, pages=region_page_list)
+            by_question = figure_texts_by_question(regions)
+            merged = 0
+            matched_keys = set()
+            for q in all_questions:
+                key = (q.get("page"), q.get("question_number", ""))
+                q_regions = by_question.get(key)
+                if not q_regions:
+                    continue
+                matched_keys.add(key)
+                q["figure_text_ocr"] = "\n".join(region.text for region in q_regions)
+                q["figure_regions"] = [
+                    {"page": region.page, "bbox": list(region.bbox), "kinds": region.kinds}
+                    for region in q_regions
+                ]
+                q["extraction_method"] = "hybrid"
+                merged += 1
+            print(f"   [green]Şekil metni eklenen soru:[/green] {merged}")
+            
+            # Metin katmanında karşılığı olmayan bölgeler (ör. metin katmanının
+            # kaçırdığı şekilli soru) atılmasın: sayfaları tüm sayfa OCR'ına geri gönder
+            unmatched = [r for r in regions if (r.page, r.question_number or "") not in matched_keys]
+            if unmatched:
+                fallback_pages = sorted({r.page for r in unmatched})
+                ocr_page_list = sorted(set(ocr_page_list or []) | set(fallback_pages))
+                region_page_count -= len(fallback_pages)
+                print(
+                    f"   [yellow]Eşleşmeyen şekil bölgesi:[/yellow] {len(unmatched)} "
+                    f"({len(fallback_pages)} sayfa tüm sayfa OCR'ına gönderildi)"
+                )
+        
+        ocr_questions = []
+        if ocr_page_list is None or ocr_page_list:
+            ocr_questions = extract_questions_with_ocr(
+                pdf_path,
+                filter_koklu=True,
+                max_workers=ocr_workers,
+                pages=ocr_page_list,
+                adaptive_dpi=adaptive_dpi
+            )
         print(f"   [green]Bulundu:[/green] {len(ocr_questions)} soru\n")
         
         # OCR sorularını ekle (duplikasyon kontrolü yap)
@@ -151,7 +230,8 @@ def process_karekok_pdf(
         
         # Yeni nesil soru formatı için ek alanlar
         q["question_type"] = "yeni_nesil"  # Varsayılan olarak yeni nesil
-        q["has_image"] = q.get("extraction_method") == "ocr"  # OCR ile çıkarıldıysa görsel var
+        # OCR ile çıkarıldıysa ya da şekil bölgesi bulunduysa görsel var
+        q["has_image"] = q.get("extraction_method") == "ocr" or bool(q.get("figure_regions"))
         q["has_table"] = "tablo" in q.get("full_text", "").lower() or "tablo" in q.get("raw_text", "").lower()
         q["has_graph"] = "grafik" in q.get("full_text", "").lower() or "grafik" in q.get("raw_text", "").lower()
         
@@ -159,10 +239,9 @@ def process_karekok_pdf(
         raw_text = q.get("raw_text", "")
         full_text = q.get("full_text", "")
         
-        # (cid:...) karakter kodlarını temizle (mümkünse)
+        # (cid:...) karakter kodlarını önce öğrenilmiş tabloyla çöz, kalanları temizle
         # Bu kodlar PDF font encoding sorunlarından kaynaklanıyor
-        import re
-        cleaned_text = re.sub(r'\(cid:\d+\)', '', raw_text)
+        cleaned_text = CID_TOKEN.sub('', decode_cid_text(raw_text))
         if cleaned_text != raw_text:
             q["raw_text_cleaned"] = cleaned_text
             q["has_encoding_issues"] = True
@@ -195,6 +274,10 @@ def process_karekok_pdf(
     print(f"  • OCR: {ocr_count} soru")
     if hybrid_count > 0:
         print(f"  • Hybrid: {hybrid_count} soru")
+    if ocr_page_total:
+        print(f"  • OCR atlanan sayfa: {ocr_pages_skipped}/{ocr_page_total} (temiz metin katmanı)")
+        if region_page_count:
+            print(f"  • Yalnızca şekil bölgesi OCR'lanan sayfa: {region_page_count}/{ocr_page_total}")
     
     # Doğrulama önerisi
     print(f"\n[bold yellow]💡 Sonraki Adım:[/bold yellow]")
@@ -0,0 +1,142 @@
+"""Metin ve OCR yollarının paylaştığı akışlı soru bölücü.
+
+(sayfa_no, satır) akışını tüketir ve soru kayıtlarını tembel olarak üretir.
+Düzenli ifadeler modül yüklenirken derlenir; soru metni satır satır `+=`
+ile büyütülmek yerine parçalar listesinde toplanıp soru bitince birleştirilir.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+QUESTION_START = re.compile(r"^\s*(\d+)[\.\)\-\s]+")
+# QUESTION_START'ın katı biçimi (sayım için): en çok üç haneli numara, ardından
+# "." + boşluk ya da ")" ve aynı satırda metin. "2 + 3 = 5", "2.5" ve "2019"
+# gibi matematik/yıl satırları soru başı sayılmaz
+QUESTION_HEADER = re.compile(r"^[ \t]*(\d{1,3})(?:\.[ \t]+|\)[ \t]*)(?=\S)", re.MULTILINE)
+OPTION_LINE = re.compile(r"^\s*([A-D])[\.\)]\s*(.+)")
+OPTION_PREFIX = re.compile(r"^\s*[A-D][\.\)]")
+# extract_text_from_pdf'in sayfa ayırıcıları: "--- Sayfa 3 ---"
+PAGE_MARKER = re.compile(r"^--- Sayfa (\d+) ---$")
+
+PageLine = Tuple[Optional[int], str]
+
+
+def iter_page_lines(text: str, page_num: Optional[int] = None) -> Iterator[PageLine]:
+    """Metni (sayfa_no, satır) çiftlerine böler.
+
+    page_num verilmezse sayfa numarası "--- Sayfa N ---" ayırıcılarından izlenir.
+    Ayırıcı satırlar da akışa dahildir; soru metnine eklenip eklenmeyeceği tüketiciye kalır.
+    """
+    page = page_num
+    for line in text.split("\n"):
+        if page_num is None and line.startswith("--- Sayfa"):
+            marker = PAGE_MARKER.match(line.strip())
+            if marker:
+                page = int(marker.group(1))
+        yield page, line
+
+
+@dataclass
+class QuestionSegment:
+    """Bir sorunun ham satırları (improved_pdf_extractor'ın sonradan ayrıştırması için)."""
+
+    number: str
+    page: Optional[int]
+    lines: List[str] = field(default_factory=list)
+
+
+def iter_question_segments(page_lines: Iterable[PageLine]) -> Iterator[QuestionSegment]:
+    """Soru numarasıyla başlayan satırdan bir sonrakine kadar olan ham satırları üretir.
+
+    Satırlar değiştirilmeden (boş satırlar dahil) aktarılır; numaradan önceki satırlar atlanır.
+    """
+    current: Optional[QuestionSegment] = None
+    for page, line in page_lines:
+        # Rakamla (ya da boşlukla) başlamayan satırlarda regex çalıştırılmaz
+        first = line[:1]
+        match = QUESTION_START.match(line) if first.isdigit() or first.isspace() else None
+        if match:
+            if current is not None:
+                yield current
+            current = QuestionSegment(number=match.group(1), page=page, lines=[line])
+        elif current is not None:
+            current.lines.append(line)
+    if current is not None:
+        yield current
+
+
+def _finish(
+    number: str,
+    page: Optional[int],
+    raw_parts: List[str],
+    full_parts: List[str],
+    options: List[str],
+    with_page: bool
+) -> Optional[Dict]:
+    raw_text = " ".join(raw_parts)
+    if not raw_text:
+        return None
+    record = {
+        "question_number": number,
+        "raw_text": raw_text,
+        "options": options,
+        "full_text": " ".join(full_parts),
+    }
+    if with_page and page is not None:
+        record["page"] = page
+    return record
+
+
+def iter_questions(
+    page_lines: Iterable[PageLine],
+    min_line_length: int = 1,
+    with_page: bool = True
+) -> Iterator[Dict]:
+    """Satır akışından soru kayıtlarını (question_number, raw_text, options, full_text, page) üretir.
+
+    - Numarayla başlayan satır yeni soru açar ("15.", "15)", "15-", "15 ").
+    - "A) ..." biçimindeki satırlar seçenek olarak eklenir ve full_text'e girer.
+    - Diğer satırlar hem raw_text'e hem full_text'e eklenir; içeriksiz "A)" satırları atlanır.
+    - Boşluk atıldıktan sonra `min_line_length` karakterden kısa satırlar yok sayılır.
+    """
+    number: Optional[str] = None
+    page: Optional[int] = None
+    raw_parts: List[str] = []
+    full_parts: List[str] = []
+    options: List[str] = []
+
+    for line_page, line in page_lines:
+        stripped = line.strip()
+        if not stripped or len(stripped) < min_line_length:
+            continue
+
+        match = QUESTION_START.match(stripped) if stripped[0].isdigit() else None
+        if match:
+            if number is not None:
+                record = _finish(number, page, raw_parts, full_parts, options, with_page)
+                if record is not None:
+                    yield record
+            question_text = stripped[match.end():]
+            number, page = match.group(1), line_page
+            raw_parts, full_parts, options = [question_text], [question_text], []
+            continue
+
+        if number is None:
+            continue
+
+        option = OPTION_LINE.match(stripped)
+        if option:
+            options.append(f"{option.group(1)}) {option.group(2)}")
+            full_parts.append(stripped)
+        elif not OPTION_PREFIX.match(stripped):
+            raw_parts.append(stripped)
+            full_parts.append(stripped)
+
+    if number is not None:
+        record = _finish(number, page, raw_parts, full_parts, options, with_page)
+        if record is not None:
+            yield record
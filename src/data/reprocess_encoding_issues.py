@@ -6,13 +6,14 @@ import argparse
 import json
 import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Set, Tuple
 
 from rich import print
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from src.data.pdf_ocr_extractor import extract_pages_as_images, ocr_page_image
+from src.data.parsed_pdf import get_parsed_pdf
+from src.data.pdf_ocr_extractor import iter_ocr_pages, iter_pages_as_images
 from src.data.pdf_extractor import find_math_questions
 from src.utils.io import read_json, write_json
 
@@ -44,6 +45,63 @@ def find_question_in_ocr_text(ocr_text: str, question_number: str) -> str:
     return '\n'.join(question_lines)
 
 
+QUESTION_LINE_PATTERN = re.compile(r'^\s*(\d+)[\.\)\-\s]+')
+
+
+def build_ocr_question_index(
+    ocr_texts: Iterable[Tuple[int, str]]
+) -> Dict[str, List[Tuple[int, str]]]:
+    """OCR metinlerinden soru numarası -> [(sayfa, soru metni)] dizini kurar.
+    
+    Her sayfa tek geçişte taranır; find_question_in_ocr_text ile aynı sınırları
+    (soru numarasından bir sonraki farklı numaraya kadar) kullanır.
+    """
+    index: Dict[str, List[Tuple[int, str]]] = {}
+    
+    for page_num, ocr_text in ocr_texts:
+        current_num = None
+        current_lines: List[str] = []
+        
+        def _close():
+            if current_num is not None and current_lines:
+                index.setdefault(current_num, []).append((page_num, '\n'.join(current_lines)))
+        
+        for line in ocr_text.split('\n'):
+            line_stripped = line.strip()
+            if not line_stripped:
+                continue
+            match = QUESTION_LINE_PATTERN.match(line_stripped)
+            if match:
+                _close()
+                current_num = match.group(1)
+                current_lines = [line_stripped]
+            elif current_num is not None:
+                current_lines.append(line_stripped)
+        _close()
+    
+    return index
+
+
+def map_questions_to_pages(pdf_path: Path, question_numbers: Set[str]) -> Dict[str, Set[int]]:
+    """Metin katmanından soru numaralarının geçtiği sayfaları bulur (page alanı yoksa)."""
+    pages: Dict[str, Set[int]] = {}
+    if not question_numbers:
+        return pages
+    
+    try:
+        pdf = get_parsed_pdf(pdf_path)
+        for page_num, page in enumerate(pdf.pages, 1):
+            text = page.extract_text() or ""
+            for line in text.split('\n'):
+                match = QUESTION_LINE_PATTERN.match(line.strip())
+                if match and match.group(1) in question_numbers:
+                    pages.setdefault(match.group(1), set()).add(page_num)
+    except Exception as e:
+        print(f"[yellow]Uyarı:[/yellow] Metin katmanından sayfa eşlemesi yapılamadı: {e}")
+    
+    return pages
+
+
 def reprocess_encoding_issues(
     questions_path: Path,
     pdf_path: Path,
@@ -72,18 +130,25 @@ def reprocess_encoding_issues(
         print("[yellow]⚠️  Encoding sorunlu soru bulunamadı.[/yellow]")
         return
     
-    # PDF sayfalarını yüksek kaliteli görsel olarak çıkar
-    print(f"\n[dim]PDF sayfaları yüksek kalitede çıkarılıyor (DPI: 400)...[/dim]")
-    page_images = extract_pages_as_images(pdf_path, dpi=400)
-    
-    if not page_images:
-        print("[red]Hata:[/red] PDF sayfaları çıkarılamadı.")
+    # Yalnızca sorunlu soruların bulunduğu sayfaları belirle
+    target_pages: Set[int] = set()
+    unmapped: Set[str] = set()
+    for q in encoding_issues:
+        page = q.get("page")
+        if isinstance(page, int) or (isinstance(page, str) and page.isdigit()):
+            target_pages.add(int(page))
+        elif q.get("question_number"):
+            unmapped.add(str(q["question_number"]))
+    
+    if unmapped:
+        for pages in map_questions_to_pages(pdf_path, unmapped).values():
+            target_pages.update(pages)
+    
+    if not target_pages:
+        print("[red]Hata:[/red] Sorunlu soruların sayfaları belirlenemedi.")
         return
     
-    print(f"[green]✓[/green] {len(page_images)} sayfa çıkarıldı")
-    
-    # Her sayfayı OCR ile işle
-    print(f"\n[dim]Sayfalar OCR ile işleniyor...[/dim]")
+    print(f"\n[dim]Hedef {len(target_pages)} sayfa yüksek kalitede (DPI: 400) çıkarılıp OCR ile işleniyor...[/dim]")
     all_ocr_texts = []
     
     with Progress(
@@ -91,35 +156,33 @@ def reprocess_encoding_issues(
         TextColumn("[progress.description]{task.description}"),
         console=console
     ) as progress:
-        task = progress.add_task("OCR işleme...", total=len(page_images))
+        task = progress.add_task("OCR işleme...", total=len(target_pages))
         
-        for page_num, image in enumerate(page_images, 1):
-            ocr_text = ocr_page_image(image, lang="tur", use_preprocessing=True)
+        page_stream = iter_pages_as_images(pdf_path, dpi=400, pages=sorted(target_pages))
+        for page_num, ocr_text in iter_ocr_pages(page_stream, lang="tur", use_preprocessing=True):
             if ocr_text:
                 all_ocr_texts.append((page_num, ocr_text))
             progress.update(task, advance=1)
     
     print(f"[green]✓[/green] {len(all_ocr_texts)} sayfa OCR ile işlendi")
     
+    # Soru numarası -> (sayfa, metin) dizinini bir kez kur
+    ocr_index = build_ocr_question_index(all_ocr_texts)
+    
     # Her encoding sorunlu soruyu yeniden işle
     print(f"\n[dim]Encoding sorunlu sorular yeniden işleniyor...[/dim]")
     improved_count = 0
     
-    question_map = {q.get("question_number"): q for q in questions}
-    
     for q in encoding_issues:
         q_num = q.get("question_number", "")
         if not q_num:
             continue
         
-        # OCR metinlerinde bu soruyu ara
+        # Dizindeki adaylardan en iyisini seç
         best_ocr_text = None
         best_length = 0
         
-        for page_num, ocr_text in all_ocr_texts:
-            # Soru numarasını ara
-            question_text = find_question_in_ocr_text(ocr_text, q_num)
-            
+        for page_num, question_text in ocr_index.get(str(q_num), []):
             if question_text and len(question_text) > best_length:
                 # Encoding sorunu yoksa ve yeterince uzunsa kullan
                 if "(cid:" not in question_text and len(question_text) > 50:
@@ -0,0 +1,247 @@
+"""Ingest planlama aşaması: kaynak kalıplarını iş başlamadan önce çözer.
+
+Tüm kaynakların glob kalıpları önce birlikte genişletilir; `exclude` ve
+`year_range` uygulanır ve birden fazla kaynağa uyan her dosya tek bir kaynağa
+atanır (en özgül kalıp kazanır, eşitlikte yapılandırmadaki sıra). Böylece aynı
+PDF bir çalıştırmada yalnızca bir kez işlenir. Plan, tahmini maliyetiyle
+birlikte iş başlamadan yazdırılır.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import pathlib
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from rich import print
+from rich.console import Console
+from rich.table import Table
+
+from src.data.manifest import IngestManifest, config_hash
+from src.data.page_cache import get_page_count
+
+if TYPE_CHECKING:
+    from src.data.ingest import SourceSpec
+
+
+# Kaba maliyet tahminleri (saniye); yalnızca planı sıralamak ve raporlamak içindir
+OCR_SECONDS_PER_PAGE = 4.0
+TEXT_SECONDS_PER_PAGE = 0.2
+IMAGE_SECONDS_PER_FILE = 3.0
+JSON_SECONDS_PER_FILE = 0.05
+
+YEAR_PATTERN = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+_BRACES = re.compile(r"\{([^{}]*)\}")
+_WILDCARDS = re.compile(r"[*?\[\]]")
+
+console = Console()
+
+
+def expand_braces(pattern: str) -> List[str]:
+    """"images/*.{jpg,png}" -> ["images/*.jpg", "images/*.png"] (pathlib.glob süslü parantez desteklemez)."""
+    match = _BRACES.search(pattern)
+    if not match:
+        return [pattern]
+    expanded = []
+    for option in match.group(1).split(","):
+        expanded.extend(expand_braces(pattern[:match.start()] + option + pattern[match.end():]))
+    return expanded
+
+
+def pattern_specificity(pattern: str) -> Tuple[bool, int]:
+    """Kalıbın özgüllüğü: joker içermeyen kalıplar önce, sonra sabit karakter sayısı."""
+    return (not _WILDCARDS.search(pattern), len(_WILDCARDS.sub("", pattern)))
+
+
+def file_year(file: pathlib.Path) -> Optional[int]:
+    """Dosya adındaki sınav yılı (ör. "2019_lgs_sayisal.pdf" -> 2019)."""
+    match = YEAR_PATTERN.search(file.stem)
+    return int(match.group(1)) if match else None
+
+
+def source_config_hash(source: "SourceSpec") -> str:
+    """Manifest'te kaynak ayarlarını temsil eden hash."""
+    return config_hash({"type": source.type, "metadata": source.metadata})
+
+
+def uses_ocr(source: "SourceSpec", file: pathlib.Path) -> bool:
+    """ingest_file'ın OCR destekli özel işleme yoluna girip girmeyeceği."""
+    return source.type == "pdf" and "karekok" in file.name.lower() and bool(source.metadata.get("use_ocr", False))
+
+
+def _skip_reason(source: "SourceSpec", file: pathlib.Path) -> Optional[str]:
+    """Dosya kaynağın exclude/year_range koşullarına takılıyorsa nedeni döndürür.
+
+    year_range yalnızca adında yıl geçen dosyalara uygulanır; adında yıl
+    olmayanlar metadata.require_year true değilse tutulur.
+    """
+    for excluded in source.metadata.get("exclude", []) or []:
+        if fnmatch.fnmatch(file.name, excluded):
+            return "exclude"
+    year_range = source.metadata.get("year_range")
+    if year_range:
+        year = file_year(file)
+        if year is None:
+            # Tarihsiz dosyalar (ör. deneme kitapçıkları) yalnızca açıkça istenirse atlanır
+            return "yıl yok" if source.metadata.get("require_year", False) else None
+        if not year_range[0] <= year <= year_range[1]:
+            return f"yıl {year}"
+    return None
+
+
+@dataclass
+class PlannedFile:
+    """Plana alınan tek dosya: atanmış kaynak, işleme modu ve tahmini maliyet."""
+
+    source: "SourceSpec"
+    file: pathlib.Path
+    mode: str
+    pages: Optional[int] = None
+    estimated_seconds: float = 0.0
+    also_matched: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestPlan:
+    """Çözülmüş iş planı ve plan dışı bırakılan dosyalar."""
+
+    files: List[PlannedFile] = field(default_factory=list)
+    # (kaynak, dosya, neden)
+    skipped: List[Tuple[str, pathlib.Path, str]] = field(default_factory=list)
+    unmatched_patterns: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def estimated_seconds(self) -> float:
+        return sum(item.estimated_seconds for item in self.files)
+
+    @property
+    def duplicates_removed(self) -> int:
+        return sum(len(item.also_matched) for item in self.files)
+
+    def tasks(self, interim_dir: pathlib.Path) -> List[Tuple["SourceSpec", pathlib.Path, pathlib.Path]]:
+        """run_tasks'ın beklediği (kaynak, dosya, interim_dir) görev listesi."""
+        return [(item.source, item.file, interim_dir) for item in self.files]
+
+
+def _estimate(
+    source: "SourceSpec",
+    file: pathlib.Path,
+    manifest: Optional[IngestManifest]
+) -> Tuple[str, Optional[int], float]:
+    if manifest is not None:
+        key = IngestManifest.make_key("ingest", source.name, file)
+        if manifest.is_fresh(key, file, source_config_hash(source)):
+            return "önbellek", None, 0.0
+
+    if source.type == "json":
+        return "json", None, JSON_SECONDS_PER_FILE
+    if source.type == "image":
+        return "görsel OCR", None, IMAGE_SECONDS_PER_FILE
+
+    pages = get_page_count(file) or None
+    if uses_ocr(source, file):
+        mode, per_page = "OCR", OCR_SECONDS_PER_PAGE
+    elif source.metadata.get("topic_filter") and source.metadata.get("page_prefilter", True):
+        mode, per_page = "metin + ön filtre", TEXT_SECONDS_PER_PAGE
+    else:
+        mode, per_page = "metin", TEXT_SECONDS_PER_PAGE
+    return mode, pages, (pages or 0) * per_page
+
+
+def plan_sources(
+    sources: List["SourceSpec"],
+    raw_dir: pathlib.Path,
+    manifest: Optional[IngestManifest] = None
+) -> IngestPlan:
+    """Kaynak kalıplarını çözer ve her dosyayı tek bir kaynağa atar.
+
+    manifest verilirse değişmemiş dosyalar plana sıfır maliyetle "önbellek" modunda girer.
+    Dosyalar yapılandırmadaki ilk geçtikleri kaynağın sırasıyla listelenir.
+    """
+    plan = IngestPlan()
+    # dosya -> [(özgüllük, -kaynak sırası, kaynak)]
+    candidates: Dict[pathlib.Path, List[Tuple[Tuple[bool, int], int, "SourceSpec"]]] = {}
+    first_seen: Dict[pathlib.Path, Tuple[int, int]] = {}
+
+    for order, source in enumerate(sources):
+        matched = 0
+        for pattern in expand_braces(source.pattern):
+            for file in sorted(raw_dir.glob(pattern)):
+                if not file.is_file():
+                    continue
+                matched += 1
+                reason = _skip_reason(source, file)
+                if reason is not None:
+                    plan.skipped.append((source.name, file, reason))
+                    continue
+                candidates.setdefault(file, []).append((pattern_specificity(pattern), -order, source))
+                first_seen.setdefault(file, (order, len(first_seen)))
+        if not matched:
+            plan.unmatched_patterns.append((source.name, source.pattern))
+
+    for file in sorted(candidates, key=lambda f: first_seen[f]):
+        matches = candidates[file]
+        _, _, winner = max(matches, key=lambda m: (m[0], m[1]))
+        others = sorted({m[2].name for m in matches if m[2] is not winner})
+        mode, pages, seconds = _estimate(winner, file, manifest)
+        plan.files.append(PlannedFile(winner, file, mode, pages, seconds, others))
+
+    # Başka bir kaynağa atanmış dosyalar için "exclude/yıl" atlamaları bilgi değildir
+    plan.skipped = [entry for entry in plan.skipped if entry[1] not in candidates]
+    return plan
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} sa"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} dk"
+    return f"{seconds:.0f} sn"
+
+
+def print_plan(plan: IngestPlan, workers: int = 1) -> None:
+    """İş planını kaynak başına özetler; çakışmaları ve atlanan dosyaları listeler."""
+    print("\n[bold]🗂️  Ingest planı:[/bold]")
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Kaynak", style="cyan")
+    table.add_column("Dosya", justify="right")
+    table.add_column("Sayfa", justify="right")
+    table.add_column("Mod")
+    table.add_column("Tahmini süre", justify="right", style="green")
+
+    by_source: Dict[str, List[PlannedFile]] = {}
+    for item in plan.files:
+        by_source.setdefault(item.source.name, []).append(item)
+    for name, items in by_source.items():
+        pages = sum(item.pages or 0 for item in items)
+        modes = sorted({item.mode for item in items})
+        table.add_row(
+            name,
+            str(len(items)),
+            str(pages) if pages else "-",
+            ", ".join(modes),
+            _format_seconds(sum(item.estimated_seconds for item in items)),
+        )
+    console.print(table)
+
+    for item in plan.files:
+        if item.also_matched:
+            print(
+                f"  [dim]Çakışma:[/dim] {item.file.name} -> {item.source.name} "
+                f"(ayrıca eşleşti: {', '.join(item.also_matched)})"
+            )
+    for source_name, file, reason in plan.skipped:
+        print(f"  [dim]Atlandı:[/dim] {file.name} ({source_name}: {reason})")
+    for source_name, pattern in plan.unmatched_patterns:
+        print(f"[yellow]Uyarı:[/yellow] {source_name}: {pattern} kalıbı için dosya bulunamadı.")
+
+    total = plan.estimated_seconds
+    print(
+        f"[bold cyan]Plan:[/bold cyan] {len(plan.files)} dosya, "
+        f"{plan.duplicates_removed} yinelenen eşleşme elendi, {len(plan.skipped)} dosya atlandı; "
+        f"tahmini süre {_format_seconds(total)}"
+        + (f" (~{_format_seconds(total / workers)} / {workers} işçi)" if workers > 1 and total else "")
+    )
@@ -0,0 +1,155 @@
+"""Büyük soru havuzları için yaklaşık en yakın komşu (ANN) indeksi.
+
+TF-IDF vektörleri TruncatedSVD (LSA) ile düşük boyutlu yoğun uzaya
+izdüşürülür ve k-means merkezleriyle ters listelere (IVF) bölünür. Sorgu en
+yakın `n_probe` listenin sorularını aday olarak alır; adaylar çağıranın
+kesin TF-IDF puanıyla yeniden sıralanır. `n_probe` arttıkça geri çağırma
+(recall) tam aramaya yaklaşır, maliyet de taranan liste oranında artar.
+"""
+
+from __future__ import annotations
+
+import math
+import pathlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from src.utils.io import ensure_dir, read_json, save_npy, write_json
+
+
+ANN_DIR = "ann_index"
+ANN_META_FILE = "meta.json"
+
+# Dizin biçimi değişirse artırılmalı
+ANN_FORMAT_VERSION = 1
+
+# Bu boyuttan küçük korpuslarda ANN kurulmaz; tam arama zaten hızlıdır
+DEFAULT_MIN_CORPUS = 5000
+DEFAULT_COMPONENTS = 128
+DEFAULT_N_PROBE = 8
+
+
+def fit_lsa_components(matrix, n_components: int = DEFAULT_COMPONENTS, seed: int = 42) -> np.ndarray:
+    """TruncatedSVD bileşenlerini (boyut x kelime, float32) öğrenir."""
+    n_components = max(1, min(n_components, min(matrix.shape) - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=seed)
+    svd.fit(matrix)
+    return svd.components_.astype(np.float32)
+
+
+def project(matrix, components: np.ndarray) -> np.ndarray:
+    """Seyrek TF-IDF satırlarını LSA uzayına izdüşürür ve L2-normalize eder (float32)."""
+    dense = np.asarray(matrix @ components.T, dtype=np.float32)
+    return normalize(dense, norm="l2", copy=False)
+
+
+@dataclass
+class AnnIndex:
+    """LSA izdüşümü + IVF ters listeleri.
+
+    `list_rows` korpus satırlarını liste sırasına göre dizer; `list_offsets`
+    CSR indptr gibi her listenin `list_rows` içindeki aralığını verir.
+    """
+
+    components: np.ndarray
+    centroids: np.ndarray
+    list_rows: np.ndarray
+    list_offsets: np.ndarray
+    n_probe: int = DEFAULT_N_PROBE
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        matrix,
+        n_components: int = DEFAULT_COMPONENTS,
+        n_lists: Optional[int] = None,
+        n_probe: int = DEFAULT_N_PROBE,
+        seed: int = 42,
+        components: Optional[np.ndarray] = None
+    ) -> "AnnIndex":
+        """Korpus matrisinden indeksi kurar (n_lists verilmezse ~sqrt(N) liste).
+
+        components verilirse (ör. LSA yoğun modunda zaten öğrenilmişse) SVD yeniden yapılmaz.
+        """
+        if components is None:
+            components = fit_lsa_components(matrix, n_components, seed=seed)
+        dense = project(matrix, components)
+        n_rows = dense.shape[0]
+        n_lists = max(1, min(n_lists or int(math.sqrt(n_rows)), n_rows))
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_lists,
+            random_state=seed,
+            n_init=3,
+            batch_size=max(1024, 4 * n_lists),
+        )
+        labels = kmeans.fit_predict(dense)
+        centroids = normalize(kmeans.cluster_centers_.astype(np.float32), norm="l2", copy=False)
+
+        list_rows = np.argsort(labels, kind="stable").astype(np.int64)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=list_offsets[1:])
+        return cls(components, centroids, list_rows, list_offsets, n_probe=n_probe)
+
+    def project(self, matrix) -> np.ndarray:
+        return project(matrix, self.components)
+
+    def candidates(self, dense_queries: np.ndarray, n_probe: Optional[int] = None) -> List[np.ndarray]:
+        """Her sorgu için en yakın `n_probe` listedeki korpus satırları."""
+        # Döngüsel içe aktarmayı önlemek için burada
+        from src.models.similarity_index import top_k_indices
+
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = top_k_indices(dense_queries @ self.centroids.T, n_probe)
+        offsets, rows = self.list_offsets, self.list_rows
+        return [
+            np.concatenate([rows[offsets[p]:offsets[p + 1]] for p in query_probes])
+            for query_probes in probes
+        ]
+
+    def save(self, ann_dir: pathlib.Path) -> pathlib.Path:
+        """Dizileri .npy olarak yazar; meta.json en son yazılır."""
+        ann_dir = ensure_dir(pathlib.Path(ann_dir))
+        meta_path = ann_dir / ANN_META_FILE
+        if meta_path.exists():
+            meta_path.unlink()
+        save_npy(ann_dir / "components.npy", self.components)
+        save_npy(ann_dir / "centroids.npy", self.centroids)
+        save_npy(ann_dir / "list_rows.npy", self.list_rows)
+        save_npy(ann_dir / "list_offsets.npy", self.list_offsets)
+        write_json(
+            {
+                "format_version": ANN_FORMAT_VERSION,
+                "n_components": int(self.components.shape[0]),
+                "n_lists": self.n_lists,
+                "n_rows": int(self.list_rows.shape[0]),
+                "n_probe": self.n_probe,
+            },
+            meta_path,
+            atomic=True,
+        )
+        return ann_dir
+
+    @classmethod
+    def load(cls, ann_dir: pathlib.Path, mmap: bool = True) -> "AnnIndex":
+        ann_dir = pathlib.Path(ann_dir)
+        meta = read_json(ann_dir / ANN_META_FILE)
+        if meta.get("format_version") != ANN_FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen ANN indeks biçimi: {meta.get('format_version')} ({ann_dir})")
+        mmap_mode = "r" if mmap else None
+        return cls(
+            components=np.load(ann_dir / "components.npy", mmap_mode=mmap_mode),
+            centroids=np.load(ann_dir / "centroids.npy", mmap_mode=mmap_mode),
+            list_rows=np.load(ann_dir / "list_rows.npy", mmap_mode=mmap_mode),
+            list_offsets=np.load(ann_dir / "list_offsets.npy", mmap_mode=mmap_mode),
+            n_probe=int(meta.get("n_probe", DEFAULT_N_PROBE)),
+        )
@@ -0,0 +1,139 @@
+"""LSA yoğun vektör modu: TF-IDF vektörlerinin float32/int8 saklanan TruncatedSVD izdüşümü.
+
+Seyrek TF-IDF matrisi kelime dağarcığıyla büyür; 128-256 boyutlu LSA
+vektörleri hem daha küçüktür hem de puanlama BLAS matris çarpımıyla yapılır.
+int8 modunda her vektör kendi ölçeğiyle simetrik nicemlenir (v ≈ q * scale);
+puanlama sırasında satır blokları float32'ye açılır, böylece geçici bellek
+sınırlı kalır.
+"""
+
+from __future__ import annotations
+
+import pathlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.models.ann_index import DEFAULT_COMPONENTS, fit_lsa_components, project
+from src.utils.io import ensure_dir, read_json, save_npy, write_json
+
+
+DENSE_DIR = "dense_index"
+DENSE_META_FILE = "meta.json"
+
+# Dizin biçimi değişirse artırılmalı
+DENSE_FORMAT_VERSION = 1
+DENSE_DTYPES = ("float32", "int8")
+
+# int8 puanlamada bir seferde float32'ye açılan satır sayısı
+DEQUANTIZE_BLOCK_ROWS = 1 << 16
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Satır başına simetrik int8 nicemleme: (int8 vektörler, float32 ölçekler)."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+@dataclass
+class DenseIndex:
+    """LSA bileşenleri ve korpusun (float32 ya da int8 + ölçek) yoğun vektörleri."""
+
+    components: np.ndarray
+    vectors: np.ndarray
+    scales: Optional[np.ndarray] = None
+
+    @property
+    def dtype(self) -> str:
+        return "int8" if self.scales is not None else "float32"
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        matrix,
+        n_components: int = DEFAULT_COMPONENTS,
+        dtype: str = "float32",
+        seed: int = 42,
+        components: Optional[np.ndarray] = None
+    ) -> "DenseIndex":
+        """Korpus TF-IDF matrisinden yoğun indeksi kurar."""
+        if dtype not in DENSE_DTYPES:
+            raise ValueError(f"Desteklenmeyen yoğun indeks veri tipi: {dtype} (seçenekler: {', '.join(DENSE_DTYPES)})")
+        if components is None:
+            components = fit_lsa_components(matrix, n_components, seed=seed)
+        vectors = project(matrix, components)
+        if dtype == "int8":
+            quantized, scales = quantize_int8(vectors)
+            return cls(components, quantized, scales)
+        return cls(components, vectors)
+
+    def project(self, matrix) -> np.ndarray:
+        return project(matrix, self.components)
+
+    def _rows(self, rows) -> np.ndarray:
+        block = self.vectors[rows]
+        if self.scales is None:
+            return block
+        return block.astype(np.float32) * self.scales[rows, None]
+
+    def scores(self, dense_queries: np.ndarray) -> np.ndarray:
+        """Sorgu x korpus benzerlik matrisi (float32, BLAS matris çarpımı)."""
+        if self.scales is None:
+            return dense_queries @ self.vectors.T
+        out = np.empty((dense_queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), DEQUANTIZE_BLOCK_ROWS):
+            rows = slice(start, start + DEQUANTIZE_BLOCK_ROWS)
+            out[:, rows] = dense_queries @ self._rows(rows).T
+        return out
+
+    def candidate_scores(self, dense_query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Tek sorgunun verilen korpus satırlarına benzerlikleri (ANN adayları için)."""
+        return self._rows(candidates) @ dense_query
+
+    def save(self, dense_dir: pathlib.Path) -> pathlib.Path:
+        """Dizileri .npy olarak yazar; meta.json en son yazılır."""
+        dense_dir = ensure_dir(pathlib.Path(dense_dir))
+        meta_path = dense_dir / DENSE_META_FILE
+        if meta_path.exists():
+            meta_path.unlink()
+        save_npy(dense_dir / "components.npy", self.components)
+        save_npy(dense_dir / "vectors.npy", self.vectors)
+        if self.scales is not None:
+            save_npy(dense_dir / "scales.npy", self.scales)
+        write_json(
+            {
+                "format_version": DENSE_FORMAT_VERSION,
+                "dtype": self.dtype,
+                "n_components": int(self.components.shape[0]),
+                "n_rows": len(self),
+            },
+            meta_path,
+            atomic=True,
+        )
+        return dense_dir
+
+    @classmethod
+    def load(cls, dense_dir: pathlib.Path, mmap: bool = True) -> "DenseIndex":
+        dense_dir = pathlib.Path(dense_dir)
+        meta = read_json(dense_dir / DENSE_META_FILE)
+        if meta.get("format_version") != DENSE_FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen yoğun indeks biçimi: {meta.get('format_version')} ({dense_dir})")
+        mmap_mode = "r" if mmap else None
+        scales = None
+        if meta.get("dtype") == "int8":
+            scales = np.load(dense_dir / "scales.npy", mmap_mode=mmap_mode)
+        return cls(
+            components=np.load(dense_dir / "components.npy", mmap_mode=mmap_mode),
+            vectors=np.load(dense_dir / "vectors.npy", mmap_mode=mmap_mode),
+            scales=scales,
+        )
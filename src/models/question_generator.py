@@ -16,6 +16,8 @@ from rich.table import Table
 from transformers import GPT2LMHeadModel, GPT2Tokenizer
 import torch
 
+from src.data.cid_decoder import decode_cid_text
+
 
 class QuestionGenerator:
     """Kareköklü ifadeler soruları üreten model."""
@@ -54,8 +56,8 @@ class QuestionGenerator:
             if not text or len(text) < 30:
                 continue
             
-            # Temizlik: Encoding sorunlarını temizle
-            text = re.sub(r'\(cid:\d+\)', '', text)
+            # Temizlik: Encoding sorunlarını temizle (çözülebilen cid'ler korunur)
+            text = re.sub(r'\(cid:\d+\)', '', decode_cid_text(text))
             text = re.sub(r'\s+', ' ', text).strip()
             
             # Çok kısa veya çok uzun soruları atla
@@ -215,8 +217,8 @@ class QuestionGenerator:
         if not text:
             return ""
         
-        # Encoding sorunlarını temizle
-        text = re.sub(r'\(cid:\d+\)', '', text)
+        # Encoding sorunlarını temizle (çözülebilen cid'ler korunur)
+        text = re.sub(r'\(cid:\d+\)', '', decode_cid_text(text))
         
         # Anlamsız tek karakterli kelimeleri temizle (J I gibi)
         text = re.sub(r'\b[A-Z]\s+[A-Z]\b', '', text)  # "J I" gibi
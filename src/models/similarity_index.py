@@ -0,0 +1,490 @@
+"""Bellekte kalıcı soru benzerliği indeksi (TF-IDF vektörleri + soru kayıtları).
+
+Model dosyaları (vectorizer, soru vektörleri, questions.json) bir kez yüklenir;
+sonraki aramalar yalnızca sorgunun vektörleştirilmesi ve bir seyrek
+matris-vektör çarpımıdır. Vektörler L2-normalize tutulduğu için kosinüs
+benzerliği düz iç çarpımdır; en iyi k sonuç tam sıralama yerine
+`np.argpartition` ile seçilir.
+
+Vektörler `question_index/` dizininde ham CSR dizileri (data/indices/indptr
+.npy) olarak saklanır ve `mmap_mode="r"` ile açılır; böylece aynı makinedeki
+Streamlit/CLI süreçleri işletim sisteminin sayfa önbelleğindeki tek kopyayı
+paylaşır. Eski `question_vectors.joblib` dosyaları da okunabilir.
+
+Model dizininde `ann_index/` varsa (büyük korpuslar) aramalar önce ANN
+adaylarını alır ve yalnızca onları kesin puanlar; `exact=True` ile tam arama
+her zaman seçilebilir. `dense_index/` varsa (LSA yoğun modu) puanlama seyrek
+TF-IDF yerine float32/int8 LSA vektörleriyle yapılır.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from scipy import sparse
+from rich import print
+from rich.table import Table
+from sklearn.preprocessing import normalize
+
+from src.models.ann_index import ANN_DIR, ANN_META_FILE, AnnIndex
+from src.models.dense_index import DENSE_DIR, DENSE_META_FILE, DenseIndex
+from src.utils.io import ensure_dir, read_json, save_npy, write_json
+
+
+VECTORIZER_FILE = "vectorizer.joblib"
+VECTORS_FILE = "question_vectors.joblib"
+QUESTIONS_FILE = "questions.json"
+INDEX_DIR = "question_index"
+INDEX_META_FILE = "meta.json"
+
+# Dizin biçimi değişirse artırılmalı
+INDEX_FORMAT_VERSION = 1
+INDEX_DTYPES = ("float64", "float32", "float16")
+
+# Puanlama modları: auto = yoğun indeks varsa yoğun, yoksa seyrek
+SEARCH_MODES = ("auto", "sparse", "dense")
+
+# Toplu sorgularda bir parçada üretilecek yoğun puan hücresi sınırı
+# (sorgu x korpus; 2^24 float64 hücre ~128 MB)
+MAX_CHUNK_CELLS = 1 << 24
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Puan dizisinin (1B ya da satır başına 2B) en yüksek k indeksini azalan sırayla döndürür.
+
+    Önce `argpartition` ile O(n) seçim yapılır, yalnızca seçilen k eleman sıralanır.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def save_csr_index(matrix, index_dir: pathlib.Path, dtype: str = "float32") -> pathlib.Path:
+    """CSR matrisini ham .npy dizileri ve meta.json olarak yazar.
+
+    meta.json en son yazılır; yarım kalmış bir dizin yüklenmez. Diziler
+    yerinde değil geçici dosya + os.replace ile yazılır: indeksi mmap ile
+    açmış çalışan süreçler (Streamlit/CLI) eski dosyaları okumaya devam eder.
+    """
+    if dtype not in INDEX_DTYPES:
+        raise ValueError(f"Desteklenmeyen indeks veri tipi: {dtype} (seçenekler: {', '.join(INDEX_DTYPES)})")
+    index_dir = ensure_dir(pathlib.Path(index_dir))
+    meta_path = index_dir / INDEX_META_FILE
+    if meta_path.exists():
+        meta_path.unlink()
+
+    matrix = sparse.csr_matrix(matrix)
+    matrix.sort_indices()
+    save_npy(index_dir / "data.npy", matrix.data.astype(dtype, copy=False))
+    save_npy(index_dir / "indices.npy", matrix.indices)
+    save_npy(index_dir / "indptr.npy", matrix.indptr)
+    write_json(
+        {
+            "format_version": INDEX_FORMAT_VERSION,
+            "shape": list(matrix.shape),
+            "nnz": int(matrix.nnz),
+            "dtype": dtype,
+        },
+        meta_path,
+        atomic=True,
+    )
+    return index_dir
+
+
+def load_csr_index(index_dir: pathlib.Path, mmap: bool = True) -> sparse.csr_matrix:
+    """save_csr_index çıktısını (varsayılan olarak bellek eşlemeli) CSR matrisi olarak açar.
+
+    scipy'nin seyrek çarpımları float16 desteklemediği için float16 veri
+    dizisi float32'ye açılır (süreç başına kopya); indices/indptr yine paylaşılır.
+    """
+    index_dir = pathlib.Path(index_dir)
+    meta = read_json(index_dir / INDEX_META_FILE)
+    if meta.get("format_version") != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen indeks biçimi: {meta.get('format_version')} ({index_dir})")
+
+    mmap_mode = "r" if mmap else None
+    data = np.load(index_dir / "data.npy", mmap_mode=mmap_mode)
+    indices = np.load(index_dir / "indices.npy", mmap_mode=mmap_mode)
+    indptr = np.load(index_dir / "indptr.npy", mmap_mode=mmap_mode)
+    if data.dtype == np.float16:
+        data = data.astype(np.float32)
+    if len(data) != meta["nnz"] or len(indptr) != meta["shape"][0] + 1:
+        raise ValueError(f"İndeks dizileri meta bilgisiyle uyuşmuyor: {index_dir}")
+    return sparse.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+
+
+@dataclass(frozen=True)
+class SimilarityHit:
+    """Tek bir arama sonucu."""
+
+    index: int
+    score: float
+    question: Dict[str, Any]
+
+
+class SimilarityIndex:
+    """Salt okunur benzerlik indeksi: `search(text, k)` ve `search_many(texts, k)`.
+
+    Durum yükleme sonrasında değiştirilmez (vektör dizileri yazmaya kapatılır),
+    bu yüzden tek örnek Streamlit oturumları ve iş parçacıkları arasında paylaşılabilir.
+    Satırları normalize edilmemiş eski vektör dosyaları yüklemede bir kez normalize edilir.
+    `dense` verilirse puanlama onunla yapılır; bu durumda seyrek `vectors` gerekmez.
+    """
+
+    def __init__(
+        self,
+        vectorizer,
+        vectors,
+        questions: Sequence[Dict[str, Any]],
+        ann: Optional[AnnIndex] = None,
+        dense: Optional[DenseIndex] = None
+    ):
+        if vectors is None and dense is None:
+            raise ValueError("Seyrek ya da yoğun soru vektörlerinden biri gerekli")
+        self.vectorizer = vectorizer
+        self.questions: Tuple[Dict[str, Any], ...] = tuple(questions)
+        for name, rows in (
+            ("Vektör", None if vectors is None else vectors.shape[0]),
+            ("Yoğun vektör", None if dense is None else len(dense)),
+            ("ANN indeksi", None if ann is None else ann.list_rows.shape[0]),
+        ):
+            if rows is not None and rows != len(self.questions):
+                raise ValueError(f"{name} sayısı ({rows}) soru sayısıyla ({len(self.questions)}) uyuşmuyor")
+
+        if vectors is not None:
+            vectors = vectors.tocsr()
+            if getattr(vectorizer, "norm", None) != "l2":
+                vectors = normalize(vectors, norm="l2", copy=True)
+            for array in (vectors.data, vectors.indices, vectors.indptr):
+                array.setflags(write=False)
+        self.vectors = vectors
+        self.dense = dense
+        self.ann = ann
+
+    @property
+    def mode(self) -> str:
+        return "dense" if self.dense is not None else "sparse"
+
+    @staticmethod
+    def missing_files(model_dir: pathlib.Path) -> List[pathlib.Path]:
+        """İndeks için gerekli olup model dizininde bulunmayan dosyalar."""
+        model_dir = pathlib.Path(model_dir)
+        missing = [
+            model_dir / name
+            for name in (VECTORIZER_FILE, QUESTIONS_FILE)
+            if not (model_dir / name).exists()
+        ]
+        if not any(
+            path.exists()
+            for path in (model_dir / INDEX_DIR / INDEX_META_FILE, model_dir / VECTORS_FILE, model_dir / DENSE_DIR / DENSE_META_FILE)
+        ):
+            missing.append(model_dir / INDEX_DIR)
+        return missing
+
+    @staticmethod
+    def version(model_dir: pathlib.Path) -> Tuple[int, ...]:
+        """Model dizininin sürüm anahtarı: meta.json ve soru dosyalarının mtime değerleri.
+
+        Yeniden eğitim meta dosyalarını en son yazdığı için önbellekli yükleyiciler
+        (ör. Streamlit) bu anahtar değişince indeksi yeniden açabilir.
+        """
+        model_dir = pathlib.Path(model_dir)
+        paths = (
+            model_dir / INDEX_DIR / INDEX_META_FILE,
+            model_dir / DENSE_DIR / DENSE_META_FILE,
+            model_dir / ANN_DIR / ANN_META_FILE,
+            model_dir / VECTORIZER_FILE,
+            model_dir / QUESTIONS_FILE,
+        )
+        return tuple(path.stat().st_mtime_ns if path.exists() else 0 for path in paths)
+
+    @classmethod
+    def load(
+        cls,
+        model_dir: pathlib.Path,
+        mmap: bool = True,
+        use_ann: bool = True,
+        mode: str = "auto"
+    ) -> "SimilarityIndex":
+        """train_similarity çıktılarından indeksi yükler (bellek eşlemeli CSR/yoğun dizinler ve ANN indeksi).
+
+        mode="auto" yoğun indeks varsa onu kullanır ve seyrek vektörleri hiç yüklemez.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Geçersiz arama modu: {mode} (seçenekler: {', '.join(SEARCH_MODES)})")
+        model_dir = pathlib.Path(model_dir)
+        missing = cls.missing_files(model_dir)
+        if missing:
+            raise FileNotFoundError(f"Benzerlik modeli dosyası bulunamadı: {missing[0]}")
+
+        vectorizer = joblib.load(model_dir / VECTORIZER_FILE)
+        dense = None
+        has_dense = (model_dir / DENSE_DIR / DENSE_META_FILE).exists()
+        if mode == "dense" and not has_dense:
+            raise FileNotFoundError(f"Yoğun (LSA) indeks bulunamadı: {model_dir / DENSE_DIR}")
+        if has_dense and mode != "sparse":
+            dense = DenseIndex.load(model_dir / DENSE_DIR, mmap=mmap)
+
+        vectors = None
+        if dense is None:
+            if (model_dir / INDEX_DIR / INDEX_META_FILE).exists():
+                vectors = load_csr_index(model_dir / INDEX_DIR, mmap=mmap)
+            elif (model_dir / VECTORS_FILE).exists():
+                vectors = joblib.load(model_dir / VECTORS_FILE)
+            else:
+                raise FileNotFoundError(f"Seyrek vektör indeksi bulunamadı: {model_dir / INDEX_DIR}")
+        with (model_dir / QUESTIONS_FILE).open("r", encoding="utf-8") as f:
+            questions = json.load(f)
+        ann = None
+        if use_ann and (model_dir / ANN_DIR / ANN_META_FILE).exists():
+            ann = AnnIndex.load(model_dir / ANN_DIR, mmap=mmap)
+        return cls(vectorizer, vectors, questions, ann=ann, dense=dense)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def transform(self, texts: Sequence[str]):
+        """Metinleri indeksle aynı uzayda L2-normalize seyrek vektörlere çevirir."""
+        vectors = self.vectorizer.transform(list(texts))
+        if getattr(self.vectorizer, "norm", None) != "l2":
+            vectors = normalize(vectors, norm="l2", copy=False)
+        return vectors
+
+    def chunk_size(self, chunk_size: Optional[int] = None) -> int:
+        """Bir parçadaki sorgu sayısı: verilmezse yoğun puan matrisi MAX_CHUNK_CELLS ile sınırlanır."""
+        if chunk_size is not None:
+            return max(1, chunk_size)
+        return max(1, MAX_CHUNK_CELLS // max(len(self), 1))
+
+    def iter_scores(
+        self,
+        texts: Sequence[str],
+        chunk_size: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """(başlangıç, puanlar) parçaları üretir; her parça tek bir seyrek matris çarpımıdır."""
+        step = self.chunk_size(chunk_size)
+        for start in range(0, len(texts), step):
+            yield start, self._score_block(self.transform(texts[start:start + step]))
+
+    def _score_block(self, queries) -> np.ndarray:
+        """L2-normalize seyrek sorgular x korpus benzerlik matrisi."""
+        if self.dense is not None:
+            return self.dense.scores(self.dense.project(queries))
+        # V @ Q^T: yalnızca küçük sorgu matrisi dönüştürülür, korpus CSR olarak kalır
+        return (self.vectors @ queries.T).T.toarray()
+
+    def _iter_ann_top_k(
+        self,
+        texts: Sequence[str],
+        k: int,
+        chunk_size: Optional[int],
+        n_probe: Optional[int]
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """ANN adaylarını indeksin kesin puanıyla (seyrek ya da yoğun) sıralar; aday sayısı k'dan azsa -1 ile doldurur."""
+        step = self.chunk_size(chunk_size)
+        for start in range(0, len(texts), step):
+            queries = self.transform(texts[start:start + step])
+            candidate_lists = self.ann.candidates(self.ann.project(queries), n_probe)
+            dense_queries = self.dense.project(queries) if self.dense is not None else None
+            indices = np.full((queries.shape[0], k), -1, dtype=np.intp)
+            scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float64)
+            for row, candidates in enumerate(candidate_lists):
+                if not len(candidates):
+                    continue
+                if dense_queries is not None:
+                    candidate_scores = self.dense.candidate_scores(dense_queries[row], candidates)
+                else:
+                    candidate_scores = (self.vectors[candidates] @ queries[row].T).toarray().ravel()
+                top = top_k_indices(candidate_scores, k)
+                indices[row, :len(top)] = candidates[top]
+                scores[row, :len(top)] = candidate_scores[top]
+            yield start, indices, scores
+
+    def iter_top_k(
+        self,
+        texts: Sequence[str],
+        k: int,
+        chunk_size: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """(başlangıç, indeksler, puanlar) parçaları; ANN indeksi yoksa ya da exact=True ise tam arama."""
+        if self.ann is not None and not exact:
+            yield from self._iter_ann_top_k(texts, k, chunk_size, n_probe)
+            return
+        for start, scores in self.iter_scores(texts, chunk_size):
+            top = top_k_indices(scores, k)
+            yield start, top, np.take_along_axis(scores, top, axis=1)
+
+    def search_many(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        chunk_size: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[List[SimilarityHit]]:
+        """Sorguları parça parça toplu puanlar; sorgu başına en benzer `k` sonucu döndürür."""
+        results: List[List[SimilarityHit]] = []
+        for _, indices, scores in self.iter_top_k(texts, k, chunk_size, n_probe, exact):
+            for row_indices, row_scores in zip(indices, scores):
+                results.append([
+                    SimilarityHit(int(idx), float(score), self.questions[idx])
+                    for idx, score in zip(row_indices, row_scores)
+                    if idx >= 0
+                ])
+        return results
+
+    def nearest(
+        self,
+        texts: Sequence[str],
+        chunk_size: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Her sorgu için korpustaki en yakın sorunun (indeks, benzerlik) dizileri.
+
+        Büyük üretilmiş soru kümelerini korpusa karşı tekrar ayıklamak içindir;
+        soru kayıtları oluşturulmaz. Aday bulunamayan sorgular için indeks -1'dir.
+        """
+        indices = np.full(len(texts), -1, dtype=np.intp)
+        best = np.zeros(len(texts), dtype=np.float64)
+        if not len(self):
+            return indices, best
+        for start, top, scores in self.iter_top_k(texts, 1, chunk_size, n_probe, exact):
+            stop = start + top.shape[0]
+            indices[start:stop] = top[:, 0]
+            best[start:stop] = np.where(top[:, 0] >= 0, scores[:, 0], 0.0)
+        return indices, best
+
+    def find_duplicates(
+        self,
+        texts: Sequence[str],
+        threshold: float = 0.9,
+        chunk_size: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> np.ndarray:
+        """Korpustaki bir soruya `threshold` ve üzeri benzeyen sorguların bool maskesi."""
+        _, best = self.nearest(texts, chunk_size, n_probe, exact)
+        return best >= threshold
+
+    def search(
+        self,
+        text: str,
+        k: int = 5,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[SimilarityHit]:
+        """Verilen metne en benzer `k` soruyu azalan benzerlikle döndürür."""
+        return self.search_many([text], k, n_probe=n_probe, exact=exact)[0]
+
+
+def ann_report(
+    index: SimilarityIndex,
+    texts: Sequence[str],
+    k: int = 5,
+    n_probes: Sequence[int] = (1, 2, 4, 8, 16)
+) -> List[Dict[str, float]]:
+    """ANN aramasını tam arama tabanına karşı ölçer: n_probe başına recall@k ve sorgu başına gecikme.
+
+    recall@k, tam aramanın ilk k sonucundan ANN'in de bulduklarının oranıdır.
+    Gecikmeler sorguların tek tek (search) çalıştırılmasıyla ölçülür.
+    """
+    if index.ann is None or not texts:
+        return []
+
+    def timed(**kwargs) -> Tuple[List[set], float]:
+        start = time.perf_counter()
+        found = [{hit.index for hit in index.search(text, k, **kwargs)} for text in texts]
+        return found, 1000 * (time.perf_counter() - start) / len(texts)
+
+    exact_sets, exact_ms = timed(exact=True)
+    rows = [{"n_probe": 0, "recall": 1.0, "latency_ms": exact_ms, "speedup": 1.0}]
+    for n_probe in n_probes:
+        if n_probe > index.ann.n_lists:
+            break
+        ann_sets, ann_ms = timed(n_probe=n_probe)
+        recall = np.mean([
+            len(found & truth) / len(truth) for found, truth in zip(ann_sets, exact_sets) if truth
+        ])
+        rows.append({
+            "n_probe": n_probe,
+            "recall": float(recall),
+            "latency_ms": ann_ms,
+            "speedup": exact_ms / ann_ms if ann_ms else 0.0,
+        })
+    return rows
+
+
+def compare_indexes(
+    reference: SimilarityIndex,
+    candidate: SimilarityIndex,
+    texts: Sequence[str],
+    k: int = 5
+) -> Dict[str, float]:
+    """İki indeksin (ör. seyrek TF-IDF ve LSA yoğun modu) tam arama sonuçlarını karşılaştırır.
+
+    recall@k referansın ilk k sonucundan adayın da bulduklarının oranıdır;
+    gecikmeler sorgu başına toplu (search_many) puanlamayla ölçülür.
+    """
+    def timed(index: SimilarityIndex) -> Tuple[List[set], float]:
+        start = time.perf_counter()
+        hits = index.search_many(texts, k, exact=True)
+        return [{hit.index for hit in row} for row in hits], 1000 * (time.perf_counter() - start) / max(len(texts), 1)
+
+    reference_sets, reference_ms = timed(reference)
+    candidate_sets, candidate_ms = timed(candidate)
+    recalls = [len(found & truth) / len(truth) for found, truth in zip(candidate_sets, reference_sets) if truth]
+    return {
+        "recall": float(np.mean(recalls)) if recalls else 0.0,
+        "reference_ms": reference_ms,
+        "candidate_ms": candidate_ms,
+    }
+
+
+def print_ann_report(rows: List[Dict[str, float]], k: int = 5) -> None:
+    """ann_report çıktısını tablo olarak yazdırır (n_probe 0 = tam arama)."""
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("n_probe", justify="right")
+    table.add_column(f"recall@{k}", justify="right")
+    table.add_column("Gecikme (ms/sorgu)", justify="right")
+    table.add_column("Hızlanma", justify="right")
+    for row in rows:
+        table.add_row(
+            "tam" if row["n_probe"] == 0 else str(row["n_probe"]),
+            f"{row['recall']:.3f}",
+            f"{row['latency_ms']:.2f}",
+            f"{row['speedup']:.1f}x",
+        )
+    print(table)
+
+
+_DEFAULT_INDEXES: Dict[str, SimilarityIndex] = {}
+
+
+def get_similarity_index(
+    model_dir: pathlib.Path,
+    reload: bool = False,
+    mode: str = "auto"
+) -> SimilarityIndex:
+    """Model dizini (ve arama modu) başına süreç içinde paylaşılan indeksi döndürür (ilk çağrıda yükler)."""
+    key = f"{pathlib.Path(model_dir).resolve()}:{mode}"
+    index: Optional[SimilarityIndex] = None if reload else _DEFAULT_INDEXES.get(key)
+    if index is None:
+        index = SimilarityIndex.load(pathlib.Path(model_dir), mode=mode)
+        _DEFAULT_INDEXES[key] = index
+    return index
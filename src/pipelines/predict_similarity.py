@@ -3,55 +3,36 @@
 from __future__ import annotations
 
 import argparse
-import json
 import pathlib
 
-import joblib
-import pandas as pd
 from rich import print
 from rich.table import Table
-from sklearn.metrics.pairwise import cosine_similarity
+
+from src.models.similarity_index import SEARCH_MODES, SimilarityIndex, get_similarity_index
 
 
 def find_similar_questions(
     question: str,
     model_dir: pathlib.Path,
-    top_k: int = 5
+    top_k: int = 5,
+    exact: bool = False,
+    mode: str = "auto"
 ) -> None:
-    """Verilen soruya en benzer soruları bulur."""
-    
-    # Model dosyalarını yükle
-    vectorizer_path = model_dir / "vectorizer.joblib"
-    vectors_path = model_dir / "question_vectors.joblib"
-    questions_path = model_dir / "questions.json"
-    
-    if not vectorizer_path.exists():
-        print(f"[red]Hata:[/red] Vectorizer bulunamadı: {vectorizer_path}")
-        return
-    
-    if not vectors_path.exists():
-        print(f"[red]Hata:[/red] Vektörler bulunamadı: {vectors_path}")
-        return
+    """Verilen soruya en benzer soruları bulur.
+
+    ANN indeksi varsa exact=False iken kullanılır; mode ile seyrek TF-IDF ya da
+    LSA yoğun puanlama seçilir (auto: yoğun indeks varsa yoğun).
+    """
     
-    if not questions_path.exists():
-        print(f"[red]Hata:[/red] Sorular bulunamadı: {questions_path}")
+    missing = SimilarityIndex.missing_files(model_dir)
+    if missing:
+        print(f"[red]Hata:[/red] Benzerlik modeli dosyası bulunamadı: {missing[0]}")
         return
     
+    # İndeks süreç başına bir kez yüklenir; sonraki aramalar yalnızca puanlamadır
     print("[bold cyan]Model yükleniyor...[/bold cyan]")
-    vectorizer = joblib.load(vectorizer_path)
-    question_vectors = joblib.load(vectors_path)
-    
-    with questions_path.open("r", encoding="utf-8") as f:
-        questions = json.load(f)
-    
-    # Soruyu vektörleştir
-    question_vector = vectorizer.transform([question])
-    
-    # Benzerlik hesapla
-    similarities = cosine_similarity(question_vector, question_vectors).flatten()
-    
-    # En benzer soruları bul
-    top_indices = similarities.argsort()[-top_k:][::-1]
+    index = get_similarity_index(model_dir, mode=mode)
+    hits = index.search(question, k=top_k, exact=exact)
     
     # Sonuçları göster
     print(f"\n[bold green]Soru:[/bold green] {question[:200]}...")
@@ -63,9 +44,9 @@ def find_similar_questions(
     table.add_column("Soru Metni", width=80)
     table.add_column("Kaynak", width=20)
     
-    for i, idx in enumerate(top_indices, 1):
-        sim_score = similarities[idx]
-        q = questions[idx]
+    for i, hit in enumerate(hits, 1):
+        sim_score = hit.score
+        q = hit.question
         question_text = q.get("full_text", q.get("raw_text", ""))[:150]
         source = q.get("source_file", "unknown")
         
@@ -79,10 +60,9 @@ def find_similar_questions(
     print(table)
     
     # En benzer soruyu detaylı göster
-    if len(top_indices) > 0:
-        best_idx = top_indices[0]
-        best_q = questions[best_idx]
-        print(f"\n[bold green]En benzer soru (Benzerlik: {similarities[best_idx]:.3f}):[/bold green]")
+    if hits:
+        best_q = hits[0].question
+        print(f"\n[bold green]En benzer soru (Benzerlik: {hits[0].score:.3f}):[/bold green]")
         print(f"[cyan]Kaynak:[/cyan] {best_q.get('source_file', 'unknown')}")
         print(f"[cyan]Soru numarası:[/cyan] {best_q.get('question_number', 'N/A')}")
         print(f"[cyan]Metin:[/cyan] {best_q.get('full_text', best_q.get('raw_text', ''))[:500]}")
@@ -106,6 +86,17 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="Gösterilecek en benzer soru sayısı (varsayılan: 5)"
     )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="ANN indeksi olsa bile tam arama yap"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=SEARCH_MODES,
+        default="auto",
+        help="Puanlama modu: seyrek TF-IDF, LSA yoğun ya da auto (varsayılan)"
+    )
     return parser.parse_args()
 
 
@@ -120,7 +111,9 @@ def main() -> None:
     find_similar_questions(
         question=args.question,
         model_dir=model_dir,
-        top_k=args.top_k
+        top_k=args.top_k,
+        exact=args.exact,
+        mode=args.mode
     )
 
 
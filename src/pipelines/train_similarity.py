@@ -4,16 +4,139 @@ from __future__ import annotations
 
 import argparse
 import pathlib
+import shutil
+from typing import Optional
 
 import joblib
 import pandas as pd
 from rich import print
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from src.models.ann_index import (
+    ANN_DIR,
+    DEFAULT_COMPONENTS,
+    DEFAULT_MIN_CORPUS,
+    DEFAULT_N_PROBE,
+    AnnIndex,
+)
+from src.models.dense_index import DENSE_DIR, DenseIndex
+from src.models.similarity_index import (
+    INDEX_DIR,
+    SimilarityIndex,
+    ann_report,
+    compare_indexes,
+    print_ann_report,
+    save_csr_index,
+    top_k_indices,
+)
 from src.utils.io import ensure_dir, read_yaml
 
 
+def build_dense_index(
+    dense_cfg: dict,
+    vectorizer,
+    X,
+    df: pd.DataFrame,
+    texts: pd.Series,
+    output_dir: pathlib.Path,
+    seed: int = 42
+) -> Optional[DenseIndex]:
+    """İsteğe bağlı LSA yoğun modunu kurar, kaydeder ve seyrek TF-IDF aramasıyla karşılaştırır.
+
+    Mod kapalıysa eski yoğun indeks silinir (aksi halde arama "auto" modunda onu seçerdi).
+    """
+    dense_dir = output_dir / DENSE_DIR
+    if not dense_cfg.get("enabled", False):
+        if dense_dir.exists():
+            shutil.rmtree(dense_dir)
+        return None
+
+    dtype = dense_cfg.get("dtype", "int8")
+    print(f"[bold]LSA yoğun indeksi oluşturuluyor ({dtype})...[/bold]")
+    dense = DenseIndex.build(
+        X,
+        n_components=int(dense_cfg.get("n_components", DEFAULT_COMPONENTS)),
+        dtype=dtype,
+        seed=seed,
+    )
+    dense.save(dense_dir)
+    sparse_bytes = sum(path.stat().st_size for path in (output_dir / INDEX_DIR).glob("*.npy"))
+    print(
+        f"[green]✓ Yoğun indeks kaydedildi:[/green] {dense_dir} "
+        f"({dense.components.shape[0]} boyut, vektörler {dense.nbytes / 1024:.0f} KB, "
+        f"seyrek indeks {sparse_bytes / 1024:.0f} KB)"
+    )
+
+    # LSA kayıplı bir izdüşüm: seyrek TF-IDF sonuçlarına ne kadar yakın?
+    report_queries = int(dense_cfg.get("report_queries", 200))
+    k = int(dense_cfg.get("report_k", 5))
+    if report_queries > 0 and len(texts) > k:
+        sample = texts.sample(n=min(report_queries, len(texts)), random_state=seed).tolist()
+        records = df.to_dict(orient="records")
+        comparison = compare_indexes(
+            SimilarityIndex(vectorizer, X, records),
+            SimilarityIndex(vectorizer, None, records, dense=dense),
+            sample,
+            k=k,
+        )
+        print(
+            f"[bold cyan]Yoğun mod:[/bold cyan] seyreğe göre recall@{k} {comparison['recall']:.3f}, "
+            f"{comparison['reference_ms']:.3f} ms -> {comparison['candidate_ms']:.3f} ms / sorgu"
+        )
+    return dense
+
+
+def build_ann_index(
+    ann_cfg: dict,
+    vectorizer,
+    X,
+    df: pd.DataFrame,
+    texts: pd.Series,
+    output_dir: pathlib.Path,
+    seed: int = 42,
+    dense: Optional[DenseIndex] = None
+) -> None:
+    """Korpus yeterince büyükse LSA + IVF ANN indeksini kurar, kaydeder ve tam aramayla karşılaştırır.
+
+    Küçük korpuslarda indeks kurulmaz (eski indeks silinir); arama tam yapılır.
+    Yoğun mod açıksa onun LSA bileşenleri yeniden kullanılır ve rapor yoğun puanlamayla yapılır.
+    """
+    ann_dir = output_dir / ANN_DIR
+    min_corpus = int(ann_cfg.get("min_corpus", DEFAULT_MIN_CORPUS))
+    if not ann_cfg.get("enabled", True) or X.shape[0] < min_corpus:
+        if ann_dir.exists():
+            shutil.rmtree(ann_dir)
+        print(
+            f"[dim]ANN indeksi kurulmadı ({X.shape[0]} soru < {min_corpus}); "
+            f"benzerlik araması tam yapılacak.[/dim]"
+        )
+        return
+
+    print("[bold]ANN indeksi (LSA + IVF) oluşturuluyor...[/bold]")
+    ann = AnnIndex.build(
+        X,
+        n_components=int(ann_cfg.get("n_components", DEFAULT_COMPONENTS)),
+        n_lists=ann_cfg.get("n_lists"),
+        n_probe=int(ann_cfg.get("n_probe", DEFAULT_N_PROBE)),
+        seed=seed,
+        components=dense.components if dense is not None else None,
+    )
+    ann.save(ann_dir)
+    print(
+        f"[green]✓ ANN indeksi kaydedildi:[/green] {ann_dir} "
+        f"({ann.components.shape[0]} boyut, {ann.n_lists} liste, n_probe={ann.n_probe})"
+    )
+
+    # Recall@k ve gecikme raporu: korpustan örneklenen sorgular, tam aramaya karşı
+    report_queries = int(ann_cfg.get("report_queries", 200))
+    k = int(ann_cfg.get("report_k", 5))
+    if report_queries > 0:
+        sample = texts.sample(n=min(report_queries, len(texts)), random_state=seed).tolist()
+        index = SimilarityIndex(vectorizer, X, df.to_dict(orient="records"), ann=ann, dense=dense)
+        print(f"\n[bold cyan]ANN raporu:[/bold cyan] {len(sample)} sorgu, k={k}")
+        print_ann_report(ann_report(index, sample, k=k), k=k)
+
+
 def train_similarity_model(config_path: str) -> None:
     """Soru benzerliği için TF-IDF modeli eğitir."""
     cfg = read_yaml(config_path)
@@ -45,12 +168,13 @@ def train_similarity_model(config_path: str) -> None:
     
     print(f"[green]Geçerli soru:[/green] {len(texts)}")
     
-    # TF-IDF vektörleştirici
+    # TF-IDF vektörleştirici (satırlar L2-normalize: kosinüs benzerliği = iç çarpım)
     vectorizer = TfidfVectorizer(
         max_features=cfg["model"]["params"]["max_features"],
         ngram_range=tuple(cfg["model"]["params"]["ngram_range"]),
         min_df=2,
-        analyzer="word"
+        analyzer="word",
+        norm="l2"
     )
     
     print("[bold]TF-IDF vektörleri oluşturuluyor...[/bold]")
@@ -67,22 +191,28 @@ def train_similarity_model(config_path: str) -> None:
     joblib.dump(vectorizer, vectorizer_path)
     print(f"[green]✓ Vectorizer kaydedildi:[/green] {vectorizer_path}")
     
-    # Vektörleri kaydet (benzerlik hesaplama için)
-    vectors_path = output_dir / "question_vectors.joblib"
-    joblib.dump(X, vectors_path)
-    print(f"[green]✓ Vektörler kaydedildi:[/green] {vectors_path}")
+    # Vektörleri bellek eşlemeli CSR dizini olarak kaydet (süreçler arasında paylaşılır)
+    index_dtype = cfg["artifacts"].get("index_dtype", "float32")
+    index_dir = save_csr_index(X, output_dir / INDEX_DIR, dtype=index_dtype)
+    index_bytes = sum(path.stat().st_size for path in index_dir.glob("*.npy"))
+    print(f"[green]✓ Vektör indeksi kaydedildi:[/green] {index_dir} ({index_dtype}, {index_bytes / 1024:.0f} KB)")
     
     # Soru metinlerini kaydet (referans için)
     questions_path = output_dir / "questions.json"
     df_filtered.to_json(questions_path, orient="records", force_ascii=False, indent=2)
     print(f"[green]✓ Sorular kaydedildi:[/green] {questions_path}")
     
+    # İsteğe bağlı LSA yoğun modu ve büyük korpuslar için yaklaşık en yakın komşu indeksi
+    seed = int(cfg.get("seed", 42))
+    texts = texts.reset_index(drop=True)
+    dense = build_dense_index(cfg.get("dense", {}), vectorizer, X, df_filtered, texts, output_dir, seed=seed)
+    build_ann_index(cfg.get("ann", {}), vectorizer, X, df_filtered, texts, output_dir, seed=seed, dense=dense)
+    
     # Test: İlk soruya en benzer 5 soruyu bul
     print("\n[bold cyan]Test: İlk soruya en benzer 5 soru[/bold cyan]")
     if len(texts) > 5:
-        first_vector = X[0:1]
-        similarities = cosine_similarity(first_vector, X).flatten()
-        top_indices = similarities.argsort()[-6:-1][::-1]  # En benzer 5 (kendisi hariç)
+        similarities = (X @ X[0].T).toarray().ravel()
+        top_indices = [idx for idx in top_k_indices(similarities, 6) if idx != 0][:5]  # En benzer 5 (kendisi hariç)
         
         print(f"\n[bold]Referans soru:[/bold]")
         print(f"{texts.iloc[0][:200]}...")
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
+import os
 import pathlib
-from typing import Any, Dict
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator
 
 import yaml
 
@@ -13,13 +15,44 @@ def read_yaml(path: str | pathlib.Path) -> Dict[str, Any]:
         return yaml.safe_load(handle)
 
 
-def write_json(data: Dict[str, Any] | list, path: str | pathlib.Path) -> None:
+@contextmanager
+def atomic_write(path: str | pathlib.Path, mode: str = "wb", encoding: str | None = None) -> Iterator[IO]:
+    """Hedefin yanındaki geçici dosyaya yazar; blok hatasız biterse os.replace ile taşır.
+
+    Hedefi açık tutan (ör. mmap ile) süreçler eski dosyayı görmeye devam eder
+    ve yarım yazılmış dosya hiçbir zaman hedef adıyla görünmez.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open(mode, encoding=encoding) as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_json(data: Dict[str, Any] | list, path: str | pathlib.Path, atomic: bool = False) -> None:
     path = pathlib.Path(path)
+    if atomic:
+        with atomic_write(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False, indent=2)
+        return
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as handle:
         json.dump(data, handle, ensure_ascii=False, indent=2)
 
 
+def save_npy(path: str | pathlib.Path, array: Any) -> None:
+    """np.save gibi yazar, ama atomik: dosyayı bellek eşlemeli açmış okuyucular eski diziyi görür."""
+    import numpy as np
+
+    with atomic_write(path, "wb") as handle:
+        np.save(handle, array)
+
+
 def read_json(path: str | pathlib.Path) -> Dict[str, Any] | list:
     path = pathlib.Path(path)
     with path.open("r", encoding="utf-8") as handle: